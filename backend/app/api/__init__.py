@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from . import analyses, auth, account, contracts, deadlines, feedback
+from . import analyses, auth, account, batches, contracts, deadlines, feedback
 
 api_router = APIRouter()
 
@@ -8,6 +8,7 @@ api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(account.router, prefix="/account", tags=["account"])
 api_router.include_router(contracts.router, prefix="/contracts", tags=["contracts"])
 api_router.include_router(analyses.router, prefix="/analyses", tags=["analyses"])
+api_router.include_router(batches.router, prefix="/batches", tags=["batches"])
 api_router.include_router(deadlines.router, prefix="/deadlines", tags=["deadlines"])
 api_router.include_router(feedback.router, prefix="/feedback", tags=["feedback"])
 
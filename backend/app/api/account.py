@@ -15,15 +15,15 @@ from ..models.user import User
 from ..models.contract import Contract
 from ..models.analysis import Analysis
 from ..schemas.user import AccountDetails, AccountUpdate, AccountExportData, UserResponse
-from ..core.deps import get_current_user
-from ..core.security import verify_password, get_password_hash
+from ..core.deps import get_current_user_sync
+from ..core.security import verify_password_async, get_password_hash_async
 
 router = APIRouter()
 
 
 @router.get("", response_model=AccountDetails)
 async def get_account_details(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -70,7 +70,7 @@ async def get_account_details(
 @router.patch("", response_model=UserResponse)
 async def update_account(
     update_data: AccountUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -111,14 +111,14 @@ async def update_account(
             )
 
         # Verify current password
-        if not verify_password(update_data.current_password, current_user.hashed_password):
+        if not await verify_password_async(update_data.current_password, current_user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
 
         # Update password
-        current_user.hashed_password = get_password_hash(update_data.new_password)
+        current_user.hashed_password = await get_password_hash_async(update_data.new_password)
 
     # Commit changes
     db.commit()
@@ -129,7 +129,7 @@ async def update_account(
 
 @router.get("/export", response_model=AccountExportData)
 async def export_account_data(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -223,7 +223,7 @@ async def export_account_data(
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_account(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """
@@ -1,20 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from pydantic import BaseModel, Field
 from typing import Optional, AsyncGenerator, Any, Dict, List
 import uuid
 from datetime import datetime, timedelta
 import asyncio
 import json
+import time
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_async_db, AsyncSessionLocal
 from ..models import Contract, Analysis, AnalysisEvent
 from ..models.user import User
-from ..core.deps import get_current_user
-from ..tasks.analyze_contract import analyze_contract_task
-from ..services.llm_analysis.eli5_service import simplify_full_analysis
-from ..services.llm_analysis.llm_router import LLMRouter
+from ..core.deps import get_current_user, parse_fields, select_fields
+from ..tasks.dispatch import dispatch_analysis, revoke_analysis
+from ..tasks.eli5 import ELI5_EVENT_TYPE, dispatch_simplification
+from ..services.analysis_cancellation import request_cancel
+from ..services import eli5_generation
 
 router = APIRouter()
 
@@ -36,6 +42,14 @@ class CreateAnalysisRequest(BaseModel):
         }
 
 
+class SimplifyJobResponse(BaseModel):
+    analysis_id: str
+    job_id: str
+    status: str = Field(..., description="queued, or running when attached to a job in flight")
+    attached: bool = Field(..., description="Whether a job for this analysis was already in flight")
+    stream_url: str
+
+
 class AnalysisResponse(BaseModel):
     id: str
     contract_id: str
@@ -55,13 +69,52 @@ class AnalysisResponse(BaseModel):
         from_attributes = True
 
 
+# Large result columns (deferred on the model); only loaded when requested
+HEAVY_FIELDS = ("preparation_result", "analysis_result", "formatted_output", "formatted_output_eli5")
+
+
+def build_analysis_response(analysis: Analysis, heavy_fields=HEAVY_FIELDS) -> AnalysisResponse:
+    """
+    Build the API response for an analysis
+
+    Args:
+        analysis: Analysis record (heavy_fields must already be loaded)
+        heavy_fields: Large result fields to include; the rest are left unset
+
+    Returns:
+        AnalysisResponse
+    """
+    # Convert quality_score (0-100 int) to confidence_score (0-1 float) for frontend
+    confidence_score = None
+    if analysis.quality_score is not None:
+        confidence_score = analysis.quality_score / 100.0
+
+    data = {
+        "id": str(analysis.id),
+        "contract_id": str(analysis.contract_id),
+        "status": analysis.status,
+        "output_language": analysis.output_language,
+        "confidence_score": confidence_score,
+        "screening_result": analysis.screening_result,
+        "created_at": analysis.created_at,
+        "started_at": analysis.started_at,
+        "completed_at": analysis.completed_at,
+    }
+
+    # JSONB columns always come back as dicts (migration 011 unwrapped legacy string values)
+    for name in heavy_fields:
+        data[name] = getattr(analysis, name)
+
+    return AnalysisResponse(**data)
+
+
 # ===== API Endpoints =====
 
 @router.post("", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
 async def create_analysis(
     data: CreateAnalysisRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new analysis for a contract and dispatch Celery task.
@@ -78,10 +131,12 @@ async def create_analysis(
             detail="Invalid contract_id format"
         )
 
-    contract = db.query(Contract).filter(
-        Contract.id == contract_uuid,
-        Contract.user_id == current_user.id
-    ).first()
+    contract = await db.scalar(
+        select(Contract).where(
+            Contract.id == contract_uuid,
+            Contract.user_id == current_user.id
+        )
+    )
     if not contract:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,59 +152,33 @@ async def create_analysis(
         created_at=datetime.utcnow()
     )
     db.add(analysis)
-    db.commit()
-    db.refresh(analysis)
+    await db.commit()
+    await db.refresh(analysis)
 
-    # ✅ BUG FIX: Dispatch Celery task with analysis_id to avoid duplicate creation
-    # Before: analyze_contract_task.delay(contract_id=str(contract.id), ...)
-    # After: analyze_contract_task.delay(analysis_id=str(analysis.id), ...)
-    analyze_contract_task.delay(
+    # ✅ BUG FIX: Dispatch Celery tasks with analysis_id to avoid duplicate creation
+    # Routed to the cpu/llm queues, prioritised by tier and document size
+    dispatch_analysis(
         analysis_id=str(analysis.id),  # ✅ Pass analysis_id instead of contract_id
-        output_language=data.output_language
+        output_language=data.output_language,
+        tier=current_user.tier,
+        page_count=contract.page_count,
+        file_size=contract.file_size
     )
 
-    # Handle formatted_output conversion (TEXT to JSON)
-    formatted_output = analysis.formatted_output
-    if formatted_output and isinstance(formatted_output, str):
-        try:
-            formatted_output = json.loads(formatted_output)
-        except json.JSONDecodeError:
-            formatted_output = None
+    # A new analysis has no results yet, so the deferred columns stay unloaded
+    return build_analysis_response(analysis, heavy_fields=())
 
-    # Convert quality_score (0-100 int) to confidence_score (0-1 float) for frontend
-    confidence_score = None
-    if analysis.quality_score is not None:
-        confidence_score = analysis.quality_score / 100.0
-
-    # Handle formatted_output_eli5 conversion (TEXT to JSON)
-    formatted_output_eli5 = analysis.formatted_output_eli5
-    if formatted_output_eli5 and isinstance(formatted_output_eli5, str):
-        try:
-            formatted_output_eli5 = json.loads(formatted_output_eli5)
-        except json.JSONDecodeError:
-            formatted_output_eli5 = None
-
-    return AnalysisResponse(
-        id=str(analysis.id),
-        contract_id=str(analysis.contract_id),
-        status=analysis.status,
-        output_language=analysis.output_language,
-        formatted_output=formatted_output,
-        formatted_output_eli5=formatted_output_eli5,
-        confidence_score=confidence_score,
-        screening_result=analysis.screening_result,
-        preparation_result=analysis.preparation_result,
-        analysis_result=analysis.analysis_result,
-        created_at=analysis.created_at,
-        started_at=analysis.started_at,
-        completed_at=analysis.completed_at
-    )
 
-
-@router.get("/{analysis_id}", response_model=AnalysisResponse)
-def get_analysis(
+@router.get("/{analysis_id}", response_model=AnalysisResponse, response_model_exclude_unset=True)
+async def get_analysis(
     analysis_id: str,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return (`id` is always included); large "
+                    "result fields (preparation_result, analysis_result, formatted_output, "
+                    "formatted_output_eli5) are only loaded when listed (default: all)"
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get analysis by ID"""
     try:
@@ -160,61 +189,36 @@ def get_analysis(
             detail="Invalid analysis_id format"
         )
 
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
+    selected = parse_fields(fields, AnalysisResponse.model_fields)
+    heavy_fields = [name for name in HEAVY_FIELDS if selected is None or name in selected]
+
+    analysis = await db.scalar(
+        select(Analysis)
+        .where(Analysis.id == analysis_uuid)
+        .options(*[undefer(getattr(Analysis, name)) for name in heavy_fields])
+    )
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Analysis {analysis_id} not found"
         )
 
-    # Handle formatted_output conversion (TEXT to JSON)
-    formatted_output = analysis.formatted_output
-    if formatted_output and isinstance(formatted_output, str):
-        try:
-            formatted_output = json.loads(formatted_output)
-        except json.JSONDecodeError:
-            formatted_output = None
-
-    # Convert quality_score (0-100 int) to confidence_score (0-1 float) for frontend
-    confidence_score = None
-    if analysis.quality_score is not None:
-        confidence_score = analysis.quality_score / 100.0
-
-    # Handle formatted_output_eli5 conversion (TEXT to JSON)
-    formatted_output_eli5 = analysis.formatted_output_eli5
-    if formatted_output_eli5 and isinstance(formatted_output_eli5, str):
-        try:
-            formatted_output_eli5 = json.loads(formatted_output_eli5)
-        except json.JSONDecodeError:
-            formatted_output_eli5 = None
-
-    return AnalysisResponse(
-        id=str(analysis.id),
-        contract_id=str(analysis.contract_id),
-        status=analysis.status,
-        output_language=analysis.output_language,
-        formatted_output=formatted_output,
-        formatted_output_eli5=formatted_output_eli5,
-        confidence_score=confidence_score,
-        screening_result=analysis.screening_result,
-        preparation_result=analysis.preparation_result,
-        analysis_result=analysis.analysis_result,
-        created_at=analysis.created_at,
-        started_at=analysis.started_at,
-        completed_at=analysis.completed_at
-    )
+    return select_fields(build_analysis_response(analysis, heavy_fields), selected)
 
 
 @router.get("/{analysis_id}/stream")
 async def stream_analysis_events(
-    analysis_id: str,
-    db: Session = Depends(get_db)
+    analysis_id: str
 ):
     """
     Server-Sent Events (SSE) endpoint for real-time analysis progress.
 
     The frontend polls this endpoint to receive status updates, progress messages,
     and results as the Celery worker processes the contract analysis.
+
+    Uses the async engine with a short-lived session per poll, so an open
+    stream neither blocks the event loop nor holds a pooled connection
+    between polls.
     """
     # Validate analysis exists
     try:
@@ -225,7 +229,8 @@ async def stream_analysis_events(
             detail="Invalid analysis_id format"
         )
 
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
+    async with AsyncSessionLocal() as db:
+        analysis = await db.get(Analysis, analysis_uuid)
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -245,20 +250,31 @@ async def stream_analysis_events(
         max_iterations = 400  # 10 minutes max (400 * 1.5 seconds)
         iteration = 0
         last_event_id = None  # Track last event ID to avoid duplicates
+        analysis_status = analysis.status
 
         while iteration < max_iterations:
-            # Get new events since last check
-            # Use >= to include events with same timestamp, then filter by ID to avoid duplicates
-            query = db.query(AnalysisEvent).filter(
-                AnalysisEvent.analysis_id == analysis_uuid,
-                AnalysisEvent.created_at >= last_event_time
-            )
-
-            # Exclude already-sent events by ID
-            if last_event_id:
-                query = query.filter(AnalysisEvent.id != last_event_id)
-
-            events = query.order_by(AnalysisEvent.created_at).all()
+            async with AsyncSessionLocal() as db:
+                # Get new events since last check
+                # Use >= to include events with same timestamp, then filter by ID to avoid duplicates
+                # Simplification jobs have a stream of their own
+                query = select(AnalysisEvent).where(
+                    AnalysisEvent.analysis_id == analysis_uuid,
+                    AnalysisEvent.event_type != ELI5_EVENT_TYPE,
+                    AnalysisEvent.created_at >= last_event_time
+                )
+
+                # Exclude already-sent events by ID
+                if last_event_id:
+                    query = query.where(AnalysisEvent.id != last_event_id)
+
+                result = await db.execute(query.order_by(AnalysisEvent.created_at))
+                events = result.scalars().all()
+
+                # Check if analysis is complete (only re-read if we had new events or every 5 iterations)
+                if events or iteration % 5 == 0:
+                    analysis_status = await db.scalar(
+                        select(Analysis.status).where(Analysis.id == analysis_uuid)
+                    )
 
             # Send events to client
             for event in events:
@@ -279,17 +295,13 @@ async def stream_analysis_events(
                 last_event_time = event.created_at
                 last_event_id = event.id
 
-            # Check if analysis is complete (only refresh if we had new events or every 5 iterations)
-            if events or iteration % 5 == 0:
-                db.refresh(analysis)
-
-            if analysis.status in ["succeeded", "failed"]:
+            if analysis_status in ["succeeded", "failed", "cancelled"]:
                 # Send final status event
                 final_event = {
                     "kind": "status_change",
                     "payload": {
-                        "message": f"Analysis {analysis.status}",
-                        "status": analysis.status
+                        "message": f"Analysis {analysis_status}",
+                        "status": analysis_status
                     },
                     "timestamp": datetime.utcnow().isoformat()
                 }
@@ -323,10 +335,75 @@ async def stream_analysis_events(
     )
 
 
+@router.post("/{analysis_id}/cancel", response_model=AnalysisResponse, response_model_exclude_unset=True)
+async def cancel_analysis(
+    analysis_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Cancel a queued or running analysis.
+
+    Marks the analysis cancelled, revokes its Celery tasks if they are still
+    queued and sets the cancellation flag that running tasks check between
+    stages (the LLM call in flight is aborted).
+    """
+    try:
+        analysis_uuid = uuid.UUID(analysis_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid analysis_id format"
+        )
+
+    analysis = await db.scalar(
+        select(Analysis)
+        .join(Contract, Contract.id == Analysis.contract_id)
+        .where(Analysis.id == analysis_uuid, Contract.user_id == current_user.id)
+    )
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Analysis {analysis_id} not found"
+        )
+
+    # Conditional update: the worker may finish the analysis meanwhile
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(Analysis)
+        .where(Analysis.id == analysis_uuid, Analysis.status.in_(["queued", "running"]))
+        .values(status="cancelled", completed_at=now, error_message="Cancelled by user")
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        await db.refresh(analysis)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Analysis already finished (status: {analysis.status})"
+        )
+
+    db.add(AnalysisEvent(
+        analysis_id=analysis_uuid,
+        event_type="status_change",
+        message="Analysis cancelled",
+        data={"status": "cancelled"},
+        created_at=now
+    ))
+    await db.commit()
+
+    # Running tasks stop at their next check, queued ones are dropped
+    request_cancel(analysis_uuid)
+    revoke_analysis(str(analysis_uuid))
+
+    await db.refresh(analysis)
+    return build_analysis_response(analysis, heavy_fields=())
+
+
 @router.delete("/{analysis_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_analysis(
+async def delete_analysis(
     analysis_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete analysis by ID"""
     try:
@@ -337,24 +414,26 @@ def delete_analysis(
             detail="Invalid analysis_id format"
         )
 
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
+    analysis = await db.get(Analysis, analysis_uuid)
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Analysis {analysis_id} not found"
         )
 
-    db.delete(analysis)
-    db.commit()
+    await db.delete(analysis)
+    await db.commit()
 
     return None
 
 
 @router.post("/{analysis_id}/simplify")
-def simplify_analysis(
+async def simplify_analysis(
     analysis_id: str,
+    request: Request,
+    response: Response,
     sections: Optional[List[str]] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Simplify analysis results using ELI5 (Explain Like I'm 5) mode.
@@ -362,13 +441,18 @@ def simplify_analysis(
     This endpoint takes a completed analysis and simplifies legal language
     into everyday terms that anyone can understand.
 
+    A cached simplification is returned right away (200). Otherwise the
+    simplification runs as a Celery job on the "llm" queue and the response
+    is 202 with a job handle; follow it with GET /simplify/stream. A request
+    arriving while a job for the analysis is in flight attaches to that job.
+
     Args:
         analysis_id: UUID of the analysis to simplify
         sections: Optional list of sections to simplify (default: all)
                  Valid values: 'obligations', 'rights', 'risks'
 
     Returns:
-        Simplified analysis with *_simplified fields added
+        Simplified analysis with *_simplified fields added (200), or a job handle (202)
     """
     try:
         analysis_uuid = uuid.UUID(analysis_id)
@@ -378,7 +462,11 @@ def simplify_analysis(
             detail="Invalid analysis_id format"
         )
 
-    analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
+    analysis = await db.scalar(
+        select(Analysis)
+        .options(undefer(Analysis.formatted_output), undefer(Analysis.formatted_output_eli5))
+        .where(Analysis.id == analysis_uuid)
+    )
     if not analysis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -391,18 +479,7 @@ def simplify_analysis(
             detail=f"Analysis must be completed before simplification (current status: {analysis.status})"
         )
 
-    # Parse formatted_output
-    formatted_output = analysis.formatted_output
-    if isinstance(formatted_output, str):
-        try:
-            formatted_output = json.loads(formatted_output)
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to parse analysis results"
-            )
-
-    if not formatted_output:
+    if not analysis.formatted_output:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No analysis results to simplify"
@@ -410,42 +487,124 @@ def simplify_analysis(
 
     # Check if ELI5 is already cached
     if analysis.formatted_output_eli5:
-        # Parse if it's a string
-        cached_eli5 = analysis.formatted_output_eli5
-        if isinstance(cached_eli5, str):
-            try:
-                cached_eli5 = json.loads(cached_eli5)
-            except json.JSONDecodeError:
-                cached_eli5 = None
-
-        if cached_eli5:
-            return {
-                "analysis_id": str(analysis.id),
-                "status": "success",
-                "simplified_analysis": cached_eli5,
-                "cached": True
-            }
-
-    # Simplify the analysis (using batch processing for speed)
-    try:
-        simplified_analysis = simplify_full_analysis(
-            analysis_result=formatted_output,
-            sections_to_simplify=sections,
-            use_batch=True  # Use batch processing (10-15x faster)
-        )
-
-        # Cache the result in database for future requests
-        analysis.formatted_output_eli5 = simplified_analysis
-        db.commit()
-
         return {
             "analysis_id": str(analysis.id),
             "status": "success",
-            "simplified_analysis": simplified_analysis,
-            "cached": False
+            "simplified_analysis": analysis.formatted_output_eli5,
+            "cached": True
         }
-    except Exception as e:
+
+    # Claims the analysis in Redis and queues the job: off the event loop
+    job_id, attached = await run_in_threadpool(dispatch_simplification, str(analysis.id), sections)
+
+    response.status_code = status.HTTP_202_ACCEPTED
+    return SimplifyJobResponse(
+        analysis_id=str(analysis.id),
+        job_id=job_id,
+        status="running" if attached else "queued",
+        attached=attached,
+        stream_url=f"{request.url_for('stream_simplification', analysis_id=str(analysis.id))}?job_id={job_id}"
+    )
+
+
+@router.get("/{analysis_id}/simplify/stream")
+async def stream_simplification(
+    analysis_id: str,
+    job_id: Optional[str] = Query(None, description="Job ID from POST /simplify (default: the job in flight)")
+):
+    """
+    Server-Sent Events (SSE) endpoint for a simplification job.
+
+    Relays the job's "eli5" analysis events: a "section" event per simplified
+    section as soon as it is ready, then a "status_change" event with the
+    whole simplified analysis (or an "error" event). Events the job sent
+    before the client connected are replayed first. Without a job, a cached
+    simplification is sent right away.
+    """
+    try:
+        analysis_uuid = uuid.UUID(analysis_id)
+    except ValueError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Simplification failed: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid analysis_id format"
+        )
+
+    async with AsyncSessionLocal() as db:
+        analysis = await db.scalar(
+            select(Analysis)
+            .options(undefer(Analysis.formatted_output_eli5))
+            .where(Analysis.id == analysis_uuid)
         )
+    if not analysis:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Analysis {analysis_id} not found"
+        )
+
+    if job_id is None:
+        job_id = await run_in_threadpool(eli5_generation.claimed_by, analysis_uuid)
+
+    def sse(kind: str, payload: Dict[str, Any], timestamp: Optional[datetime] = None) -> str:
+        event = {"kind": kind, "payload": payload, "timestamp": (timestamp or datetime.utcnow()).isoformat()}
+        return f"data: {json.dumps(event)}\n\n"
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        if job_id is None:
+            if analysis.formatted_output_eli5:
+                yield sse("status_change", {
+                    "message": "Simplified version ready",
+                    "status": "success",
+                    "cached": True,
+                    "simplified_analysis": analysis.formatted_output_eli5
+                })
+            else:
+                yield sse("error", {"message": "No simplification in progress", "status": "not_found"})
+            return
+
+        last_event_time = analysis.created_at - timedelta(seconds=1)
+        sent_ids = set()
+        # The job's claim lives ELI5_CLAIM_TTL seconds between its steps (queue
+        # wait included): wait as long for each of its events
+        idle_timeout = settings.ELI5_CLAIM_TTL
+        idle_since = time.monotonic()
+
+        while time.monotonic() - idle_since < idle_timeout:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(AnalysisEvent)
+                    .where(
+                        AnalysisEvent.analysis_id == analysis_uuid,
+                        AnalysisEvent.event_type == ELI5_EVENT_TYPE,
+                        AnalysisEvent.created_at >= last_event_time
+                    )
+                    .order_by(AnalysisEvent.created_at)
+                )
+                events = result.scalars().all()
+
+            for event in events:
+                if event.id in sent_ids:
+                    continue
+                sent_ids.add(event.id)
+                last_event_time = event.created_at
+                data = dict(event.data or {})
+                if data.pop("job_id", None) != job_id:
+                    continue
+                kind = data.pop("kind", "progress")
+                idle_since = time.monotonic()
+                yield sse(kind, {"message": event.message, **data}, event.created_at)
+                if kind in ("status_change", "error"):
+                    return
+
+            await asyncio.sleep(1.0)
+
+        yield sse("error", {"message": "Stream timeout reached", "status": "timeout"})
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+    )
@@ -4,26 +4,28 @@ Endpoints for user registration, login, and profile management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import uuid
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.user import User
 from ..schemas.user import UserCreate, UserLogin, UserResponse, TokenResponse
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.security import verify_password_async, get_password_hash_async, create_access_token
 from ..core.deps import get_current_user
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user
 
     Args:
         user_data: User registration data
-        db: Database session
+        db: Async database session
 
     Returns:
         JWT token and user data
@@ -31,8 +33,11 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If email already exists
     """
+    # Hash before touching the database, so no connection is held while bcrypt runs
+    hashed_password = await get_password_hash_async(user_data.password)
+
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,7 +48,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     new_user = User(
         id=uuid.uuid4(),
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=hashed_password,
         is_active=True,
         is_verified=False,
         is_superuser=False,
@@ -52,8 +57,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     # Create access token
     access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -78,13 +83,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login with email and password
 
     Args:
         credentials: Login credentials
-        db: Database session
+        db: Async database session
 
     Returns:
         JWT token and user data
@@ -92,8 +97,9 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If credentials are invalid
     """
-    # Get user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    # Get user by email, then release the connection before the password check
+    user = await db.scalar(select(User).where(User.email == credentials.email))
+    await db.commit()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,7 +107,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         )
 
     # Verify password
-    if not verify_password(credentials.password, user.hashed_password):
+    if not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -229,7 +235,7 @@ async def reset_password(
     Raises:
         HTTPException: If token is invalid or expired
     """
-    from ..core.security import verify_token, get_password_hash
+    from ..core.security import verify_token
 
     token = request_body.get("token")
     password = request_body.get("password")
@@ -249,6 +255,9 @@ async def reset_password(
             detail="Invalid or expired reset token"
         )
 
+    # Hash before the lookup, so no connection is held while bcrypt runs
+    hashed_password = await get_password_hash_async(password)
+
     # Get user by email
     user = db.query(User).filter(User.email == email).first()
 
@@ -259,7 +268,7 @@ async def reset_password(
         )
 
     # Update password
-    user.hashed_password = get_password_hash(password)
+    user.hashed_password = hashed_password
     db.commit()
 
     return {"message": "Password reset successful"}
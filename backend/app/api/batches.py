@@ -0,0 +1,495 @@
+"""
+Batches API
+Multi-document submissions: many files (or zip archives) in one request,
+one analysis per document, with a batch-level progress stream
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional, AsyncGenerator, Dict, List, Tuple, BinaryIO
+from pathlib import Path, PurePosixPath
+from datetime import datetime, timedelta
+import asyncio
+import aiofiles
+import json
+import uuid
+import zipfile
+import zlib
+
+from ..database import get_async_db, AsyncSessionLocal
+from ..models import Contract, Analysis, AnalysisEvent, AnalysisBatch
+from ..models.user import User
+from ..core.deps import get_current_user, get_current_user_from_token, check_analysis_limit
+from ..config import settings
+from ..services.audit_logger import get_audit_logger
+from ..tasks.dispatch import dispatch_batch
+
+router = APIRouter()
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Uploads are copied to storage in chunks of this size
+CHUNK_SIZE = 1024 * 1024
+
+# Raised while reading a corrupt zip member
+ZIP_ERRORS = (zipfile.BadZipFile, zlib.error, EOFError)
+
+
+# ===== Response Models =====
+
+class BatchDocument(BaseModel):
+    contract_id: str
+    analysis_id: str
+    filename: str
+    status: str
+    screening_result: Optional[str] = None
+
+
+class SkippedDocument(BaseModel):
+    filename: str
+    reason: str
+
+
+class BatchResponse(BaseModel):
+    id: str
+    status: str  # processing | completed
+    output_language: str
+    document_count: int
+    counts: Dict[str, int]
+    progress: int  # 0-100, finished documents
+    documents: List[BatchDocument]
+    skipped: List[SkippedDocument] = []
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+# ===== Storage =====
+
+class _TooLarge(Exception):
+    pass
+
+
+async def _store_upload(file: UploadFile, destination: Path, max_bytes: int) -> int:
+    """Copy an upload to storage chunk by chunk (never whole in memory)"""
+    size = 0
+    try:
+        async with aiofiles.open(destination, 'wb') as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _TooLarge()
+                await out.write(chunk)
+    except _TooLarge:
+        destination.unlink(missing_ok=True)
+        raise
+    return size
+
+
+def _extract_zip(
+    archive: BinaryIO,
+    upload_dir: Path,
+    max_bytes: int,
+    max_documents: int
+) -> Tuple[List[Tuple[uuid.UUID, str, Path, int]], List[SkippedDocument]]:
+    """
+    Extract the supported documents of a zip archive to storage
+
+    Runs in a worker thread (zipfile is blocking). Sizes are enforced while
+    copying, not taken from the archive headers.
+
+    Returns:
+        ([(contract_id, filename, path, size)], skipped documents)
+
+    Raises:
+        zipfile.BadZipFile: Corrupt archive; nothing extracted from it is kept
+    """
+    stored, skipped = [], []
+    destination = None
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                name = PurePosixPath(info.filename).name
+                if info.is_dir() or not name or name.startswith(('.', '__MACOSX')):
+                    continue
+                ext = PurePosixPath(name).suffix.lower()
+                if ext not in settings.ALLOWED_EXTENSIONS:
+                    skipped.append(SkippedDocument(filename=info.filename, reason=f"File type {ext or '(none)'} not allowed"))
+                    continue
+                if len(stored) >= max_documents:
+                    skipped.append(SkippedDocument(filename=info.filename, reason="Too many documents in batch"))
+                    continue
+
+                contract_id = uuid.uuid4()
+                destination = upload_dir / f"{contract_id}{ext}"
+                size = 0
+                with zf.open(info) as source, open(destination, 'wb') as out:
+                    while chunk := source.read(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > max_bytes:
+                            break
+                        out.write(chunk)
+                if size > max_bytes:
+                    destination.unlink(missing_ok=True)
+                    skipped.append(SkippedDocument(
+                        filename=info.filename, reason=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit"
+                    ))
+                    continue
+                stored.append((contract_id, name, destination, size))
+    except ZIP_ERRORS as e:
+        # The caller never sees this archive's files: remove them here
+        for _, _, path, _ in stored:
+            path.unlink(missing_ok=True)
+        if destination is not None:
+            destination.unlink(missing_ok=True)
+        raise zipfile.BadZipFile(str(e)) from e
+    return stored, skipped
+
+
+# ===== Helpers =====
+
+async def _get_batch(db: AsyncSession, batch_id: str, user: User) -> AnalysisBatch:
+    try:
+        batch_uuid = uuid.UUID(batch_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid batch_id format"
+        )
+
+    batch = await db.scalar(
+        select(AnalysisBatch).where(AnalysisBatch.id == batch_uuid, AnalysisBatch.user_id == user.id)
+    )
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found"
+        )
+    return batch
+
+
+async def _batch_documents(db: AsyncSession, batch_id: uuid.UUID) -> List[BatchDocument]:
+    rows = await db.execute(
+        select(Analysis.id, Analysis.contract_id, Analysis.status, Analysis.screening_result, Contract.filename)
+        .join(Contract, Contract.id == Analysis.contract_id)
+        .where(Analysis.batch_id == batch_id)
+        .order_by(Contract.uploaded_at, Contract.id)
+    )
+    return [
+        BatchDocument(
+            contract_id=str(row.contract_id),
+            analysis_id=str(row.id),
+            filename=row.filename,
+            status=row.status,
+            screening_result=row.screening_result
+        )
+        for row in rows
+    ]
+
+
+def _batch_progress(documents: List[BatchDocument]) -> Tuple[Dict[str, int], int, bool]:
+    """(count per status, percent finished, all finished)"""
+    counts: Dict[str, int] = {}
+    for document in documents:
+        counts[document.status] = counts.get(document.status, 0) + 1
+    finished = sum(counts.get(name, 0) for name in FINISHED_STATUSES)
+    progress = int(finished * 100 / len(documents)) if documents else 100
+    return counts, progress, finished == len(documents)
+
+
+def _build_batch_response(
+    batch: AnalysisBatch,
+    documents: List[BatchDocument],
+    skipped: List[SkippedDocument] = ()
+) -> BatchResponse:
+    counts, progress, done = _batch_progress(documents)
+    return BatchResponse(
+        id=str(batch.id),
+        # Derived from the documents: the chord callback is skipped if a task fails for good
+        status="completed" if done else "processing",
+        output_language=batch.output_language,
+        document_count=batch.document_count,
+        counts=counts,
+        progress=progress,
+        documents=documents,
+        skipped=list(skipped),
+        created_at=batch.created_at,
+        completed_at=batch.completed_at
+    )
+
+
+# ===== API Endpoints =====
+
+@router.post("", response_model=BatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_batch(
+    files: List[UploadFile] = File(..., description="Contract files (PDF/DOCX) and/or zip archives of them"),
+    output_language: str = Form("english"),
+    request: Request = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload and analyze many contracts at once
+
+    Each file (or each PDF/DOCX inside a zip archive) becomes a contract with
+    its own analysis; unsupported or oversized files are skipped and listed.
+    The analyses run on the batch queue (bounded concurrency, see
+    tasks/dispatch.py). Follow progress with GET /batches/{id}/stream.
+
+    Args:
+        files: Uploaded files
+        output_language: Language for analysis output
+        request: FastAPI request object (for audit logging)
+        current_user: Current authenticated user
+        db: Async database session
+
+    Returns:
+        Batch with one document per analysis
+
+    Raises:
+        HTTPException: If there is no supported document, or too many
+    """
+    audit = get_audit_logger(
+        user_id=current_user.id,
+        ip_address=request.client.host if request else None,
+        user_agent=request.headers.get("user-agent") if request else None
+    )
+
+    check_analysis_limit(current_user)
+
+    max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    max_documents = settings.BATCH_MAX_DOCUMENTS
+    upload_dir = Path(settings.UPLOAD_DIR) / str(current_user.id)
+    upload_dir.mkdir(parents=True, exist_ok=True)
+
+    stored: List[Tuple[uuid.UUID, str, Path, int, str]] = []  # (id, filename, path, size, mime type)
+    skipped: List[SkippedDocument] = []
+
+    try:
+        for file in files:
+            ext = Path(file.filename or "").suffix.lower()
+
+            if ext == ".zip":
+                documents, zip_skipped = await run_in_threadpool(
+                    _extract_zip, file.file, upload_dir, max_bytes, max_documents - len(stored)
+                )
+                stored.extend((*document, "application/octet-stream") for document in documents)
+                skipped.extend(zip_skipped)
+                continue
+
+            if ext not in settings.ALLOWED_EXTENSIONS:
+                skipped.append(SkippedDocument(filename=file.filename or "", reason=f"File type {ext or '(none)'} not allowed"))
+                continue
+            if len(stored) >= max_documents:
+                skipped.append(SkippedDocument(filename=file.filename or "", reason="Too many documents in batch"))
+                continue
+
+            contract_id = uuid.uuid4()
+            destination = upload_dir / f"{contract_id}{ext}"
+            try:
+                size = await _store_upload(file, destination, max_bytes)
+            except _TooLarge:
+                skipped.append(SkippedDocument(
+                    filename=file.filename or "", reason=f"File size exceeds {settings.MAX_FILE_SIZE_MB}MB limit"
+                ))
+                continue
+            stored.append((contract_id, file.filename or "", destination, size, file.content_type or "application/octet-stream"))
+    except ZIP_ERRORS:
+        for _, _, path, _, _ in stored:
+            path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid zip archive"
+        )
+
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No supported documents in batch. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+        )
+
+    if current_user.tier != "premium" and len(stored) > current_user.analyses_remaining:
+        for _, _, path, _, _ in stored:
+            path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail=f"Batch has {len(stored)} documents but only {current_user.analyses_remaining} free analyses remain. "
+                   f"Upgrade to Premium for unlimited analyses."
+        )
+
+    # One batch, and a contract + queued analysis per document
+    now = datetime.utcnow()
+    batch = AnalysisBatch(
+        id=uuid.uuid4(),
+        user_id=current_user.id,
+        output_language=output_language,
+        document_count=len(stored),
+        created_at=now
+    )
+    db.add(batch)
+
+    analyses = []
+    for index, (contract_id, filename, path, size, mime_type) in enumerate(stored):
+        contract = Contract(
+            id=contract_id,
+            user_id=current_user.id,
+            filename=filename,
+            mime_type=mime_type,
+            file_size=size,
+            file_path=f"{current_user.id}/{path.name}",
+            # Keeps the submission order for listing the batch
+            uploaded_at=now + timedelta(microseconds=index)
+        )
+        analysis = Analysis(
+            id=uuid.uuid4(),
+            contract_id=contract_id,
+            batch_id=batch.id,
+            status="queued",
+            output_language=output_language,
+            created_at=now
+        )
+        db.add_all([contract, analysis])
+        analyses.append((analysis, contract))
+    await db.commit()
+
+    for analysis, contract in analyses:
+        audit.log_contract_upload(
+            contract_id=contract.id,
+            filename=contract.filename,
+            file_size=contract.file_size,
+            status="success"
+        )
+
+    dispatch_batch(
+        batch_id=str(batch.id),
+        documents=[(str(analysis.id), None, contract.file_size) for analysis, contract in analyses],
+        output_language=output_language,
+        tier=current_user.tier
+    )
+
+    documents = [
+        BatchDocument(
+            contract_id=str(contract.id),
+            analysis_id=str(analysis.id),
+            filename=contract.filename,
+            status=analysis.status
+        )
+        for analysis, contract in analyses
+    ]
+    return _build_batch_response(batch, documents, skipped)
+
+
+@router.get("/{batch_id}", response_model=BatchResponse)
+async def get_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a batch with the status of each document"""
+    batch = await _get_batch(db, batch_id, current_user)
+    return _build_batch_response(batch, await _batch_documents(db, batch.id))
+
+
+@router.get("/{batch_id}/stream")
+async def stream_batch_events(
+    batch_id: str,
+    token: str = Query(..., description="JWT access token (EventSource cannot send headers)")
+):
+    """
+    Server-Sent Events (SSE) endpoint for batch progress.
+
+    Streams the progress events of every document in the batch ("document"
+    events, tagged with analysis_id) and a "batch_progress" event whenever a
+    document changes status. Ends with a final "batch_progress" once every
+    document finished.
+
+    Like the per-analysis stream, polls with a short-lived async session per
+    iteration.
+    """
+    # Own session instead of Depends(get_async_db): none is held while streaming
+    async with AsyncSessionLocal() as db:
+        current_user = await get_current_user_from_token(token, db)
+        batch = await _get_batch(db, batch_id, current_user)
+    batch_uuid = batch.id
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        last_event_time = batch.created_at - timedelta(seconds=1)
+        sent_event_ids = set()
+        statuses: Dict[str, str] = {}
+        max_iterations = 1200  # 30 minutes max (1200 * 1.5 seconds)
+
+        for iteration in range(max_iterations):
+            async with AsyncSessionLocal() as db:
+                events = (await db.execute(
+                    select(AnalysisEvent)
+                    .where(
+                        AnalysisEvent.analysis_id.in_(
+                            select(Analysis.id).where(Analysis.batch_id == batch_uuid)
+                        ),
+                        AnalysisEvent.created_at >= last_event_time
+                    )
+                    .order_by(AnalysisEvent.created_at)
+                )).scalars().all()
+                documents = await _batch_documents(db, batch_uuid)
+
+            for event in events:
+                if event.id in sent_event_ids:
+                    continue
+                event_data = {
+                    "kind": "document",
+                    "analysis_id": str(event.analysis_id),
+                    "payload": {
+                        "kind": event.event_type,
+                        "message": event.message,
+                        **(event.data or {})
+                    },
+                    "timestamp": event.created_at.isoformat()
+                }
+                yield f"data: {json.dumps(event_data)}\n\n"
+                sent_event_ids.add(event.id)
+                last_event_time = event.created_at
+
+            current = {document.analysis_id: document.status for document in documents}
+            counts, progress, done = _batch_progress(documents)
+            if current != statuses:
+                statuses = current
+                progress_event = {
+                    "kind": "batch_progress",
+                    "payload": {
+                        "batch_id": str(batch_uuid),
+                        "status": "completed" if done else "processing",
+                        "progress": progress,
+                        "counts": counts,
+                        "total": len(documents)
+                    },
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+                yield f"data: {json.dumps(progress_event)}\n\n"
+
+            if done:
+                break
+
+            await asyncio.sleep(1.5)
+        else:
+            timeout_event = {
+                "kind": "error",
+                "payload": {
+                    "message": "Stream timeout reached",
+                    "status": "timeout"
+                },
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            yield f"data: {json.dumps(timeout_event)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable nginx buffering
+        }
+    )
@@ -3,20 +3,25 @@ Contracts API
 Endpoints for contract upload and management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Request
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from typing import Optional
 from pathlib import Path
 import uuid
 import aiofiles
 import os
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models.user import User
 from ..models.contract import Contract
-from ..schemas.contract import ContractResponse, ContractList, ContractUpload
-from ..core.deps import get_current_user, check_analysis_limit
+from ..schemas.contract import ContractResponse, ContractSummary, ContractList, ContractUpload
+from ..core.deps import get_current_user, check_analysis_limit, parse_fields, select_fields
+from ..core.pagination import encode_cursor, keyset_desc
 from ..config import settings
 from ..services.audit_logger import get_audit_logger
+from ..services.analysis_search import build_analysis_filters
 
 router = APIRouter()
 
@@ -26,7 +31,7 @@ async def upload_contract(
     file: UploadFile = File(...),
     request: Request = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload a contract file
@@ -35,7 +40,7 @@ async def upload_contract(
         file: Uploaded file (PDF or DOCX)
         request: FastAPI request object (for audit logging)
         current_user: Current authenticated user
-        db: Database session
+        db: Async database session
 
     Returns:
         Contract upload confirmation
@@ -43,9 +48,8 @@ async def upload_contract(
     Raises:
         HTTPException: If file type not allowed or size exceeds limit
     """
-    # Create audit logger
+    # Audit entries are queued and written in batches, off the request path
     audit = get_audit_logger(
-        db,
         user_id=current_user.id,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("user-agent") if request else None
@@ -96,8 +100,8 @@ async def upload_contract(
 
     # Save contract to database
     db.add(contract)
-    db.commit()
-    db.refresh(contract)
+    await db.commit()
+    await db.refresh(contract)
 
     # ✅ AUDIT LOG: Contract upload
     audit.log_contract_upload(
@@ -116,91 +120,249 @@ async def upload_contract(
 
 @router.get("", response_model=ContractList)
 async def list_contracts(
-    page: int = 1,
-    page_size: int = 20,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: Optional[bool] = Query(
+        None, description="Count all contracts (default: true with page, false with cursor)"
+    ),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List user's contracts
 
+    Newest first, ordered by (uploaded_at, id). Pass the returned
+    next_cursor as `cursor` to fetch the next page without OFFSET;
+    page/page_size remain supported for existing clients.
+
     Args:
-        page: Page number (1-indexed)
+        page: Page number (1-indexed, ignored when cursor is given)
         page_size: Number of contracts per page
+        cursor: Opaque cursor from a previous response
+        include_total: Whether to count all of the user's contracts
         current_user: Current authenticated user
-        db: Database session
+        db: Async database session
 
     Returns:
-        Paginated list of contracts
+        Paginated list of contract summaries (without extracted text)
     """
     from ..models.analysis import Analysis
 
-    # Calculate offset
-    offset = (page - 1) * page_size
+    if include_total is None:
+        include_total = cursor is None
 
-    # Get contracts
-    contracts = db.query(Contract)\
-        .filter(Contract.user_id == current_user.id)\
-        .order_by(Contract.uploaded_at.desc())\
-        .offset(offset)\
-        .limit(page_size)\
-        .all()
+    # Keyset condition on (uploaded_at, id) in cursor mode, OFFSET otherwise;
+    # both served by ix_contracts_user_uploaded
+    conditions = [Contract.user_id == current_user.id]
+    offset = (page - 1) * page_size
+    if cursor:
+        conditions.append(keyset_desc(Contract.uploaded_at, Contract.id, cursor))
+        offset = 0
+    order = (Contract.uploaded_at.desc(), Contract.id.desc())
+
+    # One extra row tells whether there is a next page
+    page_ids = (
+        select(Contract.id)
+        .where(*conditions)
+        .order_by(*order)
+        .offset(offset)
+        .limit(page_size + 1)
+    )
 
-    # Get total count
-    total = db.query(Contract).filter(Contract.user_id == current_user.id).count()
+    # Latest succeeded analysis per contract (rn == 1), limited to the
+    # contracts on this page; served by ix_analyses_contract_status_completed
+    latest = (
+        select(
+            Analysis.contract_id,
+            Analysis.id.label("latest_analysis_id"),
+            Analysis.completed_at.label("latest_analysis_date"),
+            func.row_number().over(
+                partition_by=Analysis.contract_id,
+                order_by=Analysis.completed_at.desc()
+            ).label("rn")
+        )
+        .where(
+            Analysis.contract_id.in_(page_ids),
+            Analysis.status == "succeeded"
+        )
+        .subquery()
+    )
 
-    # Build response with latest analysis info
+    # One query: page of contracts + latest analysis (+ total count as a window in page mode)
+    columns = [Contract, latest.c.latest_analysis_id, latest.c.latest_analysis_date]
+    if include_total and not cursor:
+        columns.append(func.count().over().label("total"))
+
+    result = await db.execute(
+        select(*columns)
+        .outerjoin(latest, and_(latest.c.contract_id == Contract.id, latest.c.rn == 1))
+        .where(*conditions)
+        .order_by(*order)
+        .offset(offset)
+        .limit(page_size + 1)
+    )
+    rows = result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    total = None
+    if include_total:
+        if rows and not cursor:
+            total = rows[0].total
+        else:
+            # Cursor mode, or a page past the end where the window count has no row to ride on
+            total = await db.scalar(
+                select(func.count()).select_from(Contract).where(Contract.user_id == current_user.id)
+            )
+
+    # Build response with latest analysis info (summary schema, no extracted text)
     contract_responses = []
-    for contract in contracts:
-        # Get latest completed analysis for this contract
-        latest_analysis = db.query(Analysis)\
-            .filter(
-                Analysis.contract_id == contract.id,
-                Analysis.status == "succeeded"
-            )\
-            .order_by(Analysis.completed_at.desc())\
-            .first()
-
-        # Convert contract to dict and add latest_analysis_id and date
-        contract_data = {
-            "id": contract.id,
-            "user_id": contract.user_id,
-            "filename": contract.filename,
-            "mime_type": contract.mime_type,
-            "file_size": contract.file_size,
-            "file_path": contract.file_path,
-            "page_count": contract.page_count,
-            "extracted_text": contract.extracted_text,
-            "detected_language": contract.detected_language,
-            "jurisdiction": contract.jurisdiction,
-            "uploaded_at": contract.uploaded_at,
-            "updated_at": contract.updated_at,
-            "latest_analysis_id": latest_analysis.id if latest_analysis else None,
-            "latest_analysis_date": latest_analysis.completed_at if latest_analysis else None
-        }
-        contract_responses.append(ContractResponse(**contract_data))
+    for row in rows:
+        contract_response = ContractSummary.model_validate(row.Contract)
+        contract_response.latest_analysis_id = row.latest_analysis_id
+        contract_response.latest_analysis_date = row.latest_analysis_date
+        contract_responses.append(contract_response)
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1].Contract
+        next_cursor = encode_cursor(last.uploaded_at, last.id)
 
     return ContractList(
         contracts=contract_responses,
         total=total,
-        page=page,
-        page_size=page_size
+        page=None if cursor else page,
+        page_size=page_size,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/search", response_model=ContractList)
+async def search_contracts(
+    risk_level: Optional[str] = Query(None, description="Has a risk of this level (high, medium, low)"),
+    agreement_type: Optional[str] = Query(None, description="Agreement type (lease, nda, employment, ...)"),
+    auto_renewal: Optional[bool] = Query(None, description="Contract renews automatically"),
+    screening_result: Optional[str] = Query(
+        None, description="Screening result (no_major_issues, recommended_to_address, high_risk)"
+    ),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Find the user's contracts by their analysis results
+
+    Examples:
+        /contracts/search?risk_level=high
+        /contracts/search?agreement_type=lease&auto_renewal=true
+
+    A contract matches if one of its succeeded analyses matches all given
+    criteria; latest_analysis_id/date refer to the most recent matching
+    analysis. Filtering runs in PostgreSQL on the JSONB results (GIN indexed).
+
+    Args:
+        risk_level: Risk level filter
+        agreement_type: Agreement type filter
+        auto_renewal: Auto-renewal filter
+        screening_result: Screening result filter
+        page_size: Number of contracts per page
+        cursor: Opaque cursor from a previous response
+        current_user: Current authenticated user
+        db: Async database session
+
+    Returns:
+        Matching contract summaries, newest first
+    """
+    from ..models.analysis import Analysis
+
+    try:
+        filters = build_analysis_filters(
+            risk_level=risk_level,
+            agreement_type=agreement_type,
+            auto_renewal=auto_renewal,
+            screening_result=screening_result
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if not filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one search criterion is required"
+        )
+
+    # Most recent matching analysis per contract
+    user_contract_ids = select(Contract.id).where(Contract.user_id == current_user.id)
+    matches = (
+        select(
+            Analysis.contract_id,
+            Analysis.id.label("latest_analysis_id"),
+            Analysis.completed_at.label("latest_analysis_date"),
+            func.row_number().over(
+                partition_by=Analysis.contract_id,
+                order_by=Analysis.completed_at.desc()
+            ).label("rn")
+        )
+        .where(
+            Analysis.contract_id.in_(user_contract_ids),
+            Analysis.status == "succeeded",
+            *filters
+        )
+        .subquery()
+    )
+
+    conditions = [Contract.user_id == current_user.id]
+    if cursor:
+        conditions.append(keyset_desc(Contract.uploaded_at, Contract.id, cursor))
+
+    result = await db.execute(
+        select(Contract, matches.c.latest_analysis_id, matches.c.latest_analysis_date)
+        .join(matches, and_(matches.c.contract_id == Contract.id, matches.c.rn == 1))
+        .where(*conditions)
+        .order_by(Contract.uploaded_at.desc(), Contract.id.desc())
+        .limit(page_size + 1)
+    )
+    rows = result.all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    contract_responses = []
+    for row in rows:
+        contract_response = ContractSummary.model_validate(row.Contract)
+        contract_response.latest_analysis_id = row.latest_analysis_id
+        contract_response.latest_analysis_date = row.latest_analysis_date
+        contract_responses.append(contract_response)
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1].Contract
+        next_cursor = encode_cursor(last.uploaded_at, last.id)
+
+    return ContractList(
+        contracts=contract_responses,
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
-@router.get("/{contract_id}", response_model=ContractResponse)
+@router.get("/{contract_id}", response_model=ContractResponse, response_model_exclude_unset=True)
 async def get_contract(
     contract_id: uuid.UUID,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get contract details
 
     Args:
         contract_id: Contract ID
+        fields: Comma-separated fields to return (`id` is always included). The
+            extracted text is only loaded when `extracted_text` is listed (default: all)
         current_user: Current authenticated user
-        db: Database session
+        db: Async database session
 
     Returns:
         Contract details
@@ -208,10 +370,17 @@ async def get_contract(
     Raises:
         HTTPException: If contract not found or access denied
     """
-    contract = db.query(Contract).filter(
+    selected = parse_fields(fields, ContractResponse.model_fields)
+    include_text = selected is None or "extracted_text" in selected
+
+    query = select(Contract).where(
         Contract.id == contract_id,
         Contract.user_id == current_user.id
-    ).first()
+    )
+    if include_text:
+        query = query.options(undefer(Contract.extracted_text))
+
+    contract = await db.scalar(query)
 
     if not contract:
         raise HTTPException(
@@ -219,7 +388,11 @@ async def get_contract(
             detail="Contract not found"
         )
 
-    return ContractResponse.model_validate(contract)
+    contract_data = ContractSummary.model_validate(contract).model_dump()
+    if include_text:
+        contract_data["extracted_text"] = contract.extracted_text
+
+    return select_fields(ContractResponse(**contract_data), selected)
 
 
 @router.delete("/{contract_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -227,7 +400,7 @@ async def delete_contract(
     contract_id: uuid.UUID,
     request: Request = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a contract (GDPR Right to Erasure - Article 17)
@@ -236,23 +409,24 @@ async def delete_contract(
         contract_id: Contract ID
         request: FastAPI request object (for audit logging)
         current_user: Current authenticated user
-        db: Database session
+        db: Async database session
 
     Raises:
         HTTPException: If contract not found or access denied
     """
-    # Create audit logger
+    # Audit entries are queued and written in batches, off the request path
     audit = get_audit_logger(
-        db,
         user_id=current_user.id,
         ip_address=request.client.host if request else None,
         user_agent=request.headers.get("user-agent") if request else None
     )
 
-    contract = db.query(Contract).filter(
-        Contract.id == contract_id,
-        Contract.user_id == current_user.id
-    ).first()
+    contract = await db.scalar(
+        select(Contract).where(
+            Contract.id == contract_id,
+            Contract.user_id == current_user.id
+        )
+    )
 
     if not contract:
         # ✅ AUDIT LOG: Unauthorized deletion attempt
@@ -276,8 +450,8 @@ async def delete_contract(
         os.remove(file_path)
 
     # Delete contract from database (cascade deletes analyses)
-    db.delete(contract)
-    db.commit()
+    await db.delete(contract)
+    await db.commit()
 
     # ✅ AUDIT LOG: Contract deletion (GDPR Right to Erasure)
     audit.log_contract_delete(
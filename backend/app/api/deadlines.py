@@ -2,16 +2,18 @@
 Deadlines API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 import uuid
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import Deadline, DeadlineType
 from ..api.auth import get_current_user, User
+from ..core.pagination import encode_cursor, keyset_asc_nulls_last, NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -43,16 +45,19 @@ class DeadlineUpdate(BaseModel):
 
 @router.get("", response_model=List[DeadlineResponse])
 async def get_deadlines(
+    response: Response,
     upcoming_only: bool = Query(False, description="Only return upcoming deadlines"),
     days_ahead: int = Query(30, description="Days ahead to look for upcoming deadlines"),
     contract_id: Optional[uuid.UUID] = Query(None, description="Filter by contract ID"),
     is_completed: Optional[bool] = Query(None, description="Filter by completion status"),
     deadline_type: Optional[str] = Query(None, description="Filter by deadline type"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of deadlines to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get all deadlines for the current user
+    Get deadlines for the current user, ordered by (date, id) with undated last
 
     Query Parameters:
     - upcoming_only: Only show deadlines within next N days
@@ -60,33 +65,47 @@ async def get_deadlines(
     - contract_id: Filter by specific contract
     - is_completed: Filter by completion status
     - deadline_type: Filter by deadline type (payment, renewal, etc.)
+    - limit: Page size (default 100)
+    - cursor: Continue after the previous page; when more deadlines exist,
+      the response carries the next cursor in the X-Next-Cursor header
     """
-    query = db.query(Deadline).filter(Deadline.user_id == current_user.id)
+    query = select(Deadline).where(Deadline.user_id == current_user.id)
 
     # Apply filters
     if contract_id:
-        query = query.filter(Deadline.contract_id == contract_id)
+        query = query.where(Deadline.contract_id == contract_id)
 
     if is_completed is not None:
-        query = query.filter(Deadline.is_completed == is_completed)
+        query = query.where(Deadline.is_completed == is_completed)
 
     if deadline_type:
         try:
             dt = DeadlineType(deadline_type)
-            query = query.filter(Deadline.deadline_type == dt)
+            query = query.where(Deadline.deadline_type == dt)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid deadline_type: {deadline_type}")
 
     if upcoming_only:
         cutoff_date = datetime.utcnow() + timedelta(days=days_ahead)
-        query = query.filter(
+        query = query.where(
             Deadline.date != None,
             Deadline.date <= cutoff_date,
             Deadline.is_completed == False
         )
 
-    # Order by date (nulls last)
-    deadlines = query.order_by(Deadline.date.asc().nullslast(), Deadline.created_at.desc()).all()
+    # Keyset on (date, id), nulls last; served by ix_deadlines_user_date
+    if cursor:
+        query = query.where(keyset_asc_nulls_last(Deadline.date, Deadline.id, cursor))
+
+    # Order by date (nulls last); one extra row tells whether there is a next page
+    result = await db.execute(
+        query.order_by(Deadline.date.asc().nullslast(), Deadline.id.asc()).limit(limit + 1)
+    )
+    deadlines = result.scalars().all()
+
+    if len(deadlines) > limit:
+        deadlines = deadlines[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(deadlines[-1].date, deadlines[-1].id)
 
     return deadlines
 
@@ -95,19 +114,22 @@ async def get_deadlines(
 async def get_upcoming_deadlines(
     days: int = Query(30, description="Number of days ahead to check"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get upcoming deadlines within the next N days
     """
     cutoff_date = datetime.utcnow() + timedelta(days=days)
 
-    deadlines = db.query(Deadline).filter(
-        Deadline.user_id == current_user.id,
-        Deadline.is_completed == False,
-        Deadline.date != None,
-        Deadline.date <= cutoff_date
-    ).order_by(Deadline.date.asc()).all()
+    result = await db.execute(
+        select(Deadline).where(
+            Deadline.user_id == current_user.id,
+            Deadline.is_completed == False,
+            Deadline.date != None,
+            Deadline.date <= cutoff_date
+        ).order_by(Deadline.date.asc())
+    )
+    deadlines = result.scalars().all()
 
     return deadlines
 
@@ -116,15 +138,17 @@ async def get_upcoming_deadlines(
 async def get_deadline(
     deadline_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific deadline by ID
     """
-    deadline = db.query(Deadline).filter(
-        Deadline.id == deadline_id,
-        Deadline.user_id == current_user.id
-    ).first()
+    deadline = await db.scalar(
+        select(Deadline).where(
+            Deadline.id == deadline_id,
+            Deadline.user_id == current_user.id
+        )
+    )
 
     if not deadline:
         raise HTTPException(status_code=404, detail="Deadline not found")
@@ -137,15 +161,17 @@ async def update_deadline(
     deadline_id: uuid.UUID,
     update: DeadlineUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a deadline (mark as completed, etc.)
     """
-    deadline = db.query(Deadline).filter(
-        Deadline.id == deadline_id,
-        Deadline.user_id == current_user.id
-    ).first()
+    deadline = await db.scalar(
+        select(Deadline).where(
+            Deadline.id == deadline_id,
+            Deadline.user_id == current_user.id
+        )
+    )
 
     if not deadline:
         raise HTTPException(status_code=404, detail="Deadline not found")
@@ -163,8 +189,8 @@ async def update_deadline(
 
     deadline.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(deadline)
+    await db.commit()
+    await db.refresh(deadline)
 
     return deadline
 
@@ -173,21 +199,23 @@ async def update_deadline(
 async def delete_deadline(
     deadline_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a deadline
     """
-    deadline = db.query(Deadline).filter(
-        Deadline.id == deadline_id,
-        Deadline.user_id == current_user.id
-    ).first()
+    deadline = await db.scalar(
+        select(Deadline).where(
+            Deadline.id == deadline_id,
+            Deadline.user_id == current_user.id
+        )
+    )
 
     if not deadline:
         raise HTTPException(status_code=404, detail="Deadline not found")
 
-    db.delete(deadline)
-    db.commit()
+    await db.delete(deadline)
+    await db.commit()
 
     return {"message": "Deadline deleted successfully"}
 
@@ -196,7 +224,7 @@ async def delete_deadline(
 async def export_deadline_ics(
     deadline_id: uuid.UUID,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Export deadline as .ics calendar file
@@ -204,10 +232,12 @@ async def export_deadline_ics(
     from fastapi.responses import Response
     from ..utils.calendar_export import create_ics_from_deadline
 
-    deadline = db.query(Deadline).filter(
-        Deadline.id == deadline_id,
-        Deadline.user_id == current_user.id
-    ).first()
+    deadline = await db.scalar(
+        select(Deadline).where(
+            Deadline.id == deadline_id,
+            Deadline.user_id == current_user.id
+        )
+    )
 
     if not deadline:
         raise HTTPException(status_code=404, detail="Deadline not found")
@@ -231,7 +261,7 @@ async def export_all_deadlines_ics(
     upcoming_only: bool = Query(True),
     days_ahead: int = Query(90),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Export all deadlines as single .ics calendar file
@@ -239,19 +269,20 @@ async def export_all_deadlines_ics(
     from fastapi.responses import Response
     from ..utils.calendar_export import create_ics_from_deadlines
 
-    query = db.query(Deadline).filter(
+    query = select(Deadline).where(
         Deadline.user_id == current_user.id,
         Deadline.date != None
     )
 
     if upcoming_only:
         cutoff_date = datetime.utcnow() + timedelta(days=days_ahead)
-        query = query.filter(
+        query = query.where(
             Deadline.is_completed == False,
             Deadline.date <= cutoff_date
         )
 
-    deadlines = query.order_by(Deadline.date.asc()).all()
+    result = await db.execute(query.order_by(Deadline.date.asc()))
+    deadlines = result.scalars().all()
 
     if not deadlines:
         raise HTTPException(status_code=404, detail="No deadlines to export")
@@ -2,7 +2,7 @@
 Feedback API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
@@ -12,6 +12,7 @@ import uuid
 from ..database import get_db
 from ..models import Feedback, FeedbackType, FeedbackSection
 from ..api.auth import get_current_user, User
+from ..core.pagination import encode_cursor, keyset_desc, NEXT_CURSOR_HEADER
 
 router = APIRouter()
 
@@ -123,16 +124,21 @@ async def create_feedback(
 
 @router.get("", response_model=List[FeedbackResponse])
 async def get_feedback(
+    response: Response,
     analysis_id: Optional[uuid.UUID] = Query(None, description="Filter by analysis ID"),
     contract_id: Optional[uuid.UUID] = Query(None, description="Filter by contract ID"),
     section: Optional[str] = Query(None, description="Filter by section"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of submissions to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header value from the previous page"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get feedback submissions
 
-    Retrieve feedback submissions filtered by various criteria.
+    Retrieve feedback submissions filtered by various criteria, newest first
+    by (created_at, id). When more submissions exist, the next cursor is
+    returned in the X-Next-Cursor header.
     Regular users can only see their own feedback.
     """
     query = db.query(Feedback).filter(Feedback.user_id == current_user.id)
@@ -151,7 +157,17 @@ async def get_feedback(
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid section: {section}")
 
-    feedback_list = query.order_by(Feedback.created_at.desc()).all()
+    # Keyset on (created_at, id); served by ix_feedback_user_created
+    if cursor:
+        query = query.filter(keyset_desc(Feedback.created_at, Feedback.id, cursor))
+
+    # One extra row tells whether there is a next page
+    feedback_list = query.order_by(Feedback.created_at.desc(), Feedback.id.desc()).limit(limit + 1).all()
+
+    if len(feedback_list) > limit:
+        feedback_list = feedback_list[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(feedback_list[-1].created_at, feedback_list[-1].id)
+
     return feedback_list
 
 
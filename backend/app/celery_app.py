@@ -3,6 +3,7 @@ Celery configuration for background tasks.
 """
 
 from celery import Celery
+from kombu import Queue
 from .config import settings
 
 # Create Celery app
@@ -10,7 +11,7 @@ celery_app = Celery(
     "legally_ai",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=["app.tasks.analyze_contract"]
+    include=["app.tasks.analyze_contract", "app.tasks.batches", "app.tasks.eli5", "app.tasks.maintenance"]
 )
 
 # Configure Celery
@@ -25,12 +26,34 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Queues (see tasks/dispatch.py): "cpu" for extraction/OCR on a prefork
+    # pool, "llm" for LLM calls on a threads pool, "batch" for multi-document
+    # submissions on a small pool of their own, "celery" for the rest.
+    # A worker started without -Q consumes all of them.
+    task_queues=(Queue("celery"), Queue("cpu"), Queue("llm"), Queue("batch")),
+    task_default_queue="celery",
+    task_routes={
+        "analyze_contract": {"queue": "cpu"},
+        "prepare_contract": {"queue": "cpu"},
+        "llm_analysis": {"queue": "llm"},
+        "pregenerate_eli5": {"queue": "llm"},
+    },
+    # Priorities 0 (highest) .. 9 on the Redis transport
+    task_default_priority=5,
 )
 
-# Optional: Celery Beat schedule for periodic tasks
+# Redis emulates priorities with one list per priority step
+if settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+    celery_app.conf.broker_transport_options = {
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    }
+
+# Celery Beat schedule for periodic tasks
 celery_app.conf.beat_schedule = {
-    "cleanup-old-analyses": {
-        "task": "cleanup_old_analyses",
+    "maintain-partitions": {
+        "task": "maintain_partitions",
         "schedule": 86400.0,  # Run daily (24 hours)
     },
 }
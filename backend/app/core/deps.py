@@ -3,63 +3,93 @@ Dependencies
 Reusable dependencies for FastAPI endpoints
 """
 
-from typing import Optional
+from typing import Any, Iterable, Optional, Set, Tuple, Union
+import uuid
 from fastapi import Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.user import User
+from ..services.user_cache import user_cache
 from .security import decode_access_token
 
 # HTTP Bearer token security
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def _token_claims(token: str, headers: Optional[dict] = None) -> Tuple[uuid.UUID, Any]:
     """
-    Get the current authenticated user from JWT token
+    Decode a JWT and return the user ID it was issued for and its `iat`
 
     Args:
-        credentials: HTTP Bearer credentials
-        db: Database session
+        token: JWT access token
+        headers: Extra headers for the 401 response
 
     Returns:
-        Current user
+        Tuple of (user ID from the token subject, issued-at claim or None)
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If the token is invalid
     """
-    token = credentials.credentials
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers=headers,
+    )
 
     # Decode token
     payload = decode_access_token(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise credentials_exception
 
     # Get user ID from token
     user_id: Optional[str] = payload.get("sub")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise credentials_exception
 
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
+    try:
+        return uuid.UUID(user_id), payload.get("iat")
+    except ValueError:
+        raise credentials_exception
+
+
+def _user_id_from_token(token: str, headers: Optional[dict] = None) -> uuid.UUID:
+    """Decode a JWT and return the user ID it was issued for"""
+    return _token_claims(token, headers)[0]
+
+
+async def _load_user(db: AsyncSession, token: str, headers: Optional[dict] = None) -> User:
+    """
+    Resolve a token to its (active) user, through the user cache
+
+    Cached users are detached instances: fine for reading attributes, not for
+    modifying the account (use get_current_user_sync for that).
+    """
+    user_uuid, iat = _token_claims(token, headers)
+
+    user = await user_cache.get(user_uuid, iat)
+    if user is None:
+        result = await db.execute(select(User).where(User.id == user_uuid))
+        user = result.scalar_one_or_none()
+        if user is not None:
+            await user_cache.set(user, iat)
+
+    return _check_user(user, headers)
+
+
+def _check_user(user: Optional[User], headers: Optional[dict] = None) -> User:
+    """Reject missing or inactive users"""
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            headers=headers,
         )
 
     if not user.is_active:
@@ -71,6 +101,54 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    Get the current authenticated user from JWT token
+
+    Args:
+        credentials: HTTP Bearer credentials
+        db: Async database session
+
+    Returns:
+        Current user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return await _load_user(db, credentials.credentials, {"WWW-Authenticate": "Bearer"})
+
+
+def get_current_user_sync(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user, loaded through the sync session
+
+    For endpoints that still use `get_db` and modify or delete the user
+    (the instance must belong to the same session that commits it).
+
+    Args:
+        credentials: HTTP Bearer credentials
+        db: Database session
+
+    Returns:
+        Current user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    headers = {"WWW-Authenticate": "Bearer"}
+    user_uuid = _user_id_from_token(credentials.credentials, headers)
+
+    # Get user from database
+    user = db.query(User).filter(User.id == user_uuid).first()
+    return _check_user(user, headers)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -119,7 +197,7 @@ async def get_current_premium_user(
 
 async def get_current_user_from_token(
     token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """
     Get the current authenticated user from JWT token in query parameter
@@ -128,7 +206,7 @@ async def get_current_user_from_token(
 
     Args:
         token: JWT token from query parameter
-        db: Database session
+        db: Async database session
 
     Returns:
         Current user
@@ -136,37 +214,7 @@ async def get_current_user_from_token(
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-
-    # Get user ID from token
-    user_id: Optional[str] = payload.get("sub")
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials"
-        )
-
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User is inactive"
-        )
-
-    return user
+    return await _load_user(db, token)
 
 
 def check_analysis_limit(user: User) -> None:
@@ -184,3 +232,48 @@ def check_analysis_limit(user: User) -> None:
             status_code=status.HTTP_402_PAYMENT_REQUIRED,
             detail=f"Free tier limit reached ({user.contracts_analyzed}/3 analyses used). Upgrade to Premium for unlimited analyses."
         )
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """
+    Parse a `?fields=` query parameter (comma-separated field names)
+
+    Args:
+        fields: Raw query parameter value, or None
+        allowed: Field names the endpoint accepts
+
+    Returns:
+        Set of requested fields, or None when the parameter was not given
+        (meaning "all fields")
+
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    if fields is None:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+def select_fields(response: BaseModel, selected: Optional[Set[str]]) -> Union[BaseModel, JSONResponse]:
+    """
+    Limit a response to the fields parsed by parse_fields()
+
+    Args:
+        response: Full response model
+        selected: Requested fields, or None for all fields
+
+    Returns:
+        The response unchanged when no fields were requested, otherwise a
+        JSONResponse with only the requested fields and `id`
+    """
+    if selected is None:
+        return response
+    return JSONResponse(jsonable_encoder(response, include=selected | {"id"}, exclude_unset=True))
@@ -89,3 +89,16 @@ class FileTooLarge(HTTPException):
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             detail=f"File size exceeds {max_size_mb}MB limit"
         )
+
+
+class PasswordHashingBusy(HTTPException):
+    """
+    Raised when the password hashing pool is saturated (login/registration storm)
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests. Please retry shortly.",
+            headers={"Retry-After": str(retry_after)}
+        )
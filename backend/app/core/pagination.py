@@ -0,0 +1,100 @@
+"""
+Pagination
+Opaque keyset cursors for list endpoints, and the conditions selecting the
+rows after a cursor
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+# Header carrying the next-page cursor on endpoints that return a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: uuid.UUID) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+
+    Args:
+        sort_value: Value of the ordering column (may be None for nullable columns)
+        row_id: Row ID (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {
+        "v": sort_value.isoformat() if sort_value is not None else None,
+        "id": str(row_id),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], uuid.UUID]:
+    """
+    Decode a cursor created by encode_cursor
+
+    Args:
+        cursor: Cursor string from a previous page
+
+    Returns:
+        Tuple of (sort_value, row_id)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        sort_value = datetime.fromisoformat(payload["v"]) if payload["v"] is not None else None
+        return sort_value, uuid.UUID(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_desc(sort_column, id_column, cursor: str) -> ColumnElement:
+    """
+    Condition for the rows after a cursor in (sort_column DESC, id DESC) order
+
+    Args:
+        sort_column: Ordering column (NOT NULL)
+        id_column: Row ID column (tie-breaker)
+        cursor: Cursor of the last row of the previous page
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    return tuple_(sort_column, id_column) < tuple_(sort_value, row_id)
+
+
+def keyset_asc_nulls_last(sort_column, id_column, cursor: str) -> ColumnElement:
+    """
+    Condition for the rows after a cursor in (sort_column ASC NULLS LAST, id ASC) order
+
+    Args:
+        sort_column: Ordering column (nullable)
+        id_column: Row ID column (tie-breaker)
+        cursor: Cursor of the last row of the previous page
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    sort_value, row_id = decode_cursor(cursor)
+    if sort_value is None:
+        return and_(sort_column.is_(None), id_column > row_id)
+    return or_(
+        sort_column > sort_value,
+        and_(sort_column == sort_value, id_column > row_id),
+        sort_column.is_(None)
+    )
@@ -3,16 +3,31 @@ Security Utilities
 Password hashing and JWT token generation
 """
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from ..config import settings
+from .exceptions import PasswordHashingBusy
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt costs ~100-300ms of CPU per call: async endpoints run it in a small
+# dedicated pool (bcrypt releases the GIL) and shed load once too many
+# operations are waiting, instead of stalling the event loop.
+# PASSWORD_HASH_WORKERS=0 runs it inline on the event loop (benchmark baseline).
+_password_executor = (
+    ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    if settings.PASSWORD_HASH_WORKERS > 0 else None
+)
+_password_lock = threading.Lock()
+_password_stats = {"pending": 0, "max_pending": 0, "completed": 0, "rejected": 0}
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -28,6 +43,55 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_password_op(func: Callable, *args) -> Any:
+    """
+    Run a password hashing call in the bounded pool
+
+    Raises:
+        PasswordHashingBusy: If workers + PASSWORD_HASH_QUEUE operations are already pending
+    """
+    if _password_executor is None:
+        return func(*args)
+
+    with _password_lock:
+        if _password_stats["pending"] >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE:
+            _password_stats["rejected"] += 1
+            raise PasswordHashingBusy()
+        _password_stats["pending"] += 1
+        _password_stats["max_pending"] = max(_password_stats["max_pending"], _password_stats["pending"])
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+    finally:
+        with _password_lock:
+            _password_stats["pending"] -= 1
+            _password_stats["completed"] += 1
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash, off the event loop
+    """
+    return await _run_password_op(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password, off the event loop
+    """
+    return await _run_password_op(get_password_hash, password)
+
+
+def get_password_hash_stats() -> Dict[str, int]:
+    """Password hashing pool counters"""
+    with _password_lock:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "queue_limit": settings.PASSWORD_HASH_QUEUE,
+            **_password_stats,
+        }
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -2,25 +2,129 @@
 Database configuration and session management.
 """
 
+import threading
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import AsyncGenerator, Generator, Dict, Any
 
 from .config import settings
 
+# SQLite is only used for offline benchmarks and load tests (see benchmarks/)
+IS_SQLITE = settings.DATABASE_URL.startswith("sqlite")
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    """Store Postgres UUID columns as CHAR(32) on SQLite"""
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    """Store Postgres JSONB columns as JSON on SQLite"""
+    return "JSON"
+
+
+class PoolStats:
+    """Thread-safe counters for connection pool checkout waits"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait_seconds
+            self.wait_max = max(self.wait_max, wait_seconds)
+            if timed_out:
+                self.timeouts += 1
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+
+    stats = pool_stats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except Exception:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record(time.perf_counter() - start, timed_out)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool, TimedQueuePool):
+    """Same as TimedQueuePool, for the async engine"""
+
+    stats = async_pool_stats
+
+
+def _async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL to its async driver (asyncpg / aiosqlite)"""
+    if url.startswith("postgresql+psycopg2://"):
+        return url.replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    echo=settings.DEBUG,
+    # FastAPI runs sync dependencies in a threadpool
+    connect_args={"check_same_thread": False} if IS_SQLITE else {}
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for FastAPI endpoints (Celery tasks keep using the sync engine)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    echo=settings.DEBUG,
+)
+
+# expire_on_commit=False: attributes stay loaded after commit, since lazy
+# refreshes are not possible outside of an await
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -41,6 +145,48 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for FastAPI to get async database sessions.
+
+    Usage:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+            return result.scalars().all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_snapshot(pool: QueuePool, stats: PoolStats) -> Dict[str, Any]:
+    checkouts = stats.checkouts
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": checkouts,
+        "timeouts": stats.timeouts,
+        "wait_total_ms": round(stats.wait_total * 1000, 2),
+        "wait_avg_ms": round(stats.wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+        "wait_max_ms": round(stats.wait_max * 1000, 2),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Snapshot of the connection pool state and checkout wait times.
+
+    Used by the load-test tool (benchmarks/load_test.py) to see when the
+    pool (DB_POOL_SIZE + DB_MAX_OVERFLOW) runs out. Top-level keys describe
+    the async engine used by the API; "sync" is the sync engine.
+    """
+    snapshot = _pool_snapshot(async_engine.pool, async_pool_stats)
+    snapshot["sync"] = _pool_snapshot(engine.pool, pool_stats)
+    return snapshot
+
+
 def init_db():
     """
     Initialize database (create all tables).
@@ -49,3 +195,13 @@ def init_db():
     """
     from . import models  # Import all models
     Base.metadata.create_all(bind=engine)
+
+    # Partitioned tables need a partition for the current month before any insert
+    from .services.partitions import PARTITIONED_TABLES, ensure_partitions
+    if not IS_SQLITE:
+        db = SessionLocal()
+        try:
+            for table in PARTITIONED_TABLES:
+                ensure_partitions(db, table, months_ahead=settings.PARTITION_MONTHS_AHEAD)
+        finally:
+            db.close()
@@ -8,7 +8,11 @@ from fastapi.responses import JSONResponse
 
 from .config import settings
 from .api import api_router
-from .database import init_db
+from .database import init_db, async_engine
+from .services.audit_sink import audit_sink
+from .services.user_cache import user_cache
+from .services.eli5_cache import eli5_cache
+from .services.llm_analysis.llm_router import usage_stats
 
 # Create FastAPI app
 app = FastAPI(
@@ -30,7 +34,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["*"],
+    # "*" is not honoured for credentialed requests, so list custom headers explicitly
+    expose_headers=["*", "X-Next-Cursor"],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
@@ -40,8 +45,16 @@ app.include_router(api_router, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and start the audit log flusher"""
     init_db()
+    audit_sink.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued audit logs and close pooled async database connections"""
+    audit_sink.stop()
+    await async_engine.dispose()
 
 
 @app.get("/")
@@ -63,6 +76,55 @@ def health_check():
     )
 
 
+@app.get("/admin/db-pool")
+def db_pool_stats():
+    """
+    Database connection pool statistics (development/load testing only)
+    WARNING: This endpoint should be removed in production!
+    """
+    from .database import get_pool_stats
+
+    return get_pool_stats()
+
+
+@app.get("/admin/audit-queue")
+def audit_queue_stats():
+    """
+    Audit log queue depth and write counters (development/load testing only)
+    WARNING: This endpoint should be removed in production!
+    """
+    return audit_sink.stats()
+
+
+@app.get("/admin/user-cache")
+def user_cache_stats():
+    """
+    Authenticated user cache hit rate (development/load testing only)
+    WARNING: This endpoint should be removed in production!
+    """
+    return user_cache.stats()
+
+
+@app.get("/admin/eli5-cache")
+def eli5_cache_stats():
+    """
+    ELI5 item cache hit rate, summed over the API and worker processes
+    (development/load testing only)
+    WARNING: This endpoint should be removed in production!
+    """
+    return eli5_cache.stats()
+
+
+@app.get("/admin/llm-usage")
+def llm_usage_stats():
+    """
+    Token usage of the LLM calls of all processes (the workers make them),
+    incl. provider prompt cache hits (development/load testing only)
+    WARNING: This endpoint should be removed in production!
+    """
+    return usage_stats()
+
+
 @app.delete("/admin/clear-test-users")
 def clear_test_users():
     """
@@ -88,6 +150,10 @@ def clear_test_users():
 
         db.commit()
 
+        # Bulk deletes skip ORM events, so drop the cached users explicitly
+        for user in test_users:
+            user_cache.invalidate(user.id)
+
         return JSONResponse(
             status_code=200,
             content={
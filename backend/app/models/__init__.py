@@ -6,17 +6,21 @@ All SQLAlchemy models for the application
 from .user import User
 from .contract import Contract
 from .analysis import Analysis, AnalysisEvent
+from .analysis_batch import AnalysisBatch
 from .deadline import Deadline, DeadlineType
 from .feedback import Feedback, FeedbackType, FeedbackSection
+from .audit_log import AuditLog
 
 __all__ = [
     "User",
     "Contract",
     "Analysis",
     "AnalysisEvent",
+    "AnalysisBatch",
     "Deadline",
     "DeadlineType",
     "Feedback",
     "FeedbackType",
     "FeedbackSection",
+    "AuditLog",
 ]
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Integer
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, JSON, Integer, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 
@@ -12,27 +12,30 @@ class Analysis(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     contract_id = Column(UUID(as_uuid=True), ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Multi-document submission this analysis belongs to (POST /batches)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("analysis_batches.id", ondelete="SET NULL"), nullable=True, index=True)
 
-    # Status: queued, running, succeeded, failed
+    # Status: queued, running, succeeded, failed, cancelled
     status = Column(String(50), nullable=False, default="queued", index=True)
 
     # Output language
     output_language = Column(String(50), nullable=False, default="english")
 
-    # Results - stored as JSON
-    preparation_result = Column(JSON, nullable=True)  # Step 1 results
-    analysis_result = Column(JSON, nullable=True)     # Step 2 results
-    formatted_output = Column(JSON, nullable=True)    # Final formatted output
-    formatted_output_eli5 = Column(JSON, nullable=True)  # ELI5 simplified version
+    # Results - stored as JSONB, deferred (loaded on access or via undefer())
+    preparation_result = deferred(Column(JSONB, nullable=True))  # Step 1 results
+    analysis_result = deferred(Column(JSONB, nullable=True))     # Step 2 results
+    formatted_output = deferred(Column(JSONB, nullable=True))    # Final formatted output
+    formatted_output_eli5 = deferred(Column(JSONB, nullable=True))  # ELI5 simplified version
+    pipeline_state = deferred(Column(JSONB, nullable=True))  # Stage checkpoints (see tasks/analyze_contract.py)
 
     # Quality metrics
     quality_score = Column(Integer, nullable=True)
     confidence_level = Column(String(50), nullable=True)
-    screening_result = Column(String(50), nullable=True)
+    screening_result = Column(String(50), nullable=True, index=True)
 
     # Error tracking
     error_message = Column(Text, nullable=True)
-    error_traceback = Column(Text, nullable=True)
+    error_traceback = deferred(Column(Text, nullable=True))
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -41,10 +44,27 @@ class Analysis(Base):
 
     # Relationships
     contract = relationship("Contract", back_populates="analyses")
+    batch = relationship("AnalysisBatch", back_populates="analyses")
     events = relationship("AnalysisEvent", back_populates="analysis", cascade="all, delete-orphan", order_by="AnalysisEvent.created_at")
     deadlines = relationship("Deadline", back_populates="analysis", cascade="all, delete-orphan")
     feedback = relationship("Feedback", back_populates="analysis", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Latest succeeded analysis per contract (contract list)
+        Index("ix_analyses_contract_status_completed", contract_id, status, completed_at.desc()),
+        # Containment queries on results (see services/analysis_search.py)
+        Index(
+            "ix_analyses_preparation_result_gin",
+            text("preparation_result jsonb_path_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_analyses_risks_gin",
+            text("(analysis_result -> 'risks') jsonb_path_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def __repr__(self):
         return f"<Analysis(id={self.id}, status={self.status})>"
 
@@ -52,7 +72,10 @@ class Analysis(Base):
 class AnalysisEvent(Base):
     """SSE events for real-time progress updates"""
     __tablename__ = "analysis_events"
+    # Monthly range partitions on created_at (see services/partitions.py)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
+    # Partition key must be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     analysis_id = Column(UUID(as_uuid=True), ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
 
@@ -61,8 +84,8 @@ class AnalysisEvent(Base):
     message = Column(Text, nullable=True)
     data = Column(JSON, nullable=True)
 
-    # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Timestamp (partition key)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False, index=True)
 
     # Relationship
     analysis = relationship("Analysis", back_populates="events")
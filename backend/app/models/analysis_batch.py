@@ -0,0 +1,32 @@
+"""
+Analysis Batch Model
+Groups the analyses of a multi-document submission (POST /batches)
+"""
+
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import uuid
+
+from ..database import Base
+
+
+class AnalysisBatch(Base):
+    __tablename__ = "analysis_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    output_language = Column(String(50), nullable=False, default="english")
+    document_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps (completed_at is set by the chord callback once every analysis finished)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    analyses = relationship("Analysis", back_populates="batch")
+
+    def __repr__(self):
+        return f"<AnalysisBatch(id={self.id}, documents={self.document_count})>"
@@ -22,7 +22,10 @@ class AuditLog(Base):
     - Article 5(2): Accountability principle
     """
     __tablename__ = "audit_logs"
+    # Monthly range partitions on created_at (see services/partitions.py)
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
+    # Partition key must be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Who performed the action
@@ -39,8 +42,8 @@ class AuditLog(Base):
     status = Column(String(20), nullable=False)  # "success", "failure", "unauthorized"
     details = Column(JSON, nullable=True)  # Additional context (e.g., error message, changed fields)
 
-    # When it happened
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # When it happened (partition key)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow, nullable=False, index=True)
 
     # Performance tracking
     duration_ms = Column(Integer, nullable=True)  # How long the operation took
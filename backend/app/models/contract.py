@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 
@@ -19,8 +19,8 @@ class Contract(Base):
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
 
-    # Content
-    extracted_text = Column(Text, nullable=True)
+    # Content (deferred: only loaded when accessed or explicitly undeferred)
+    extracted_text = deferred(Column(Text, nullable=True))
     page_count = Column(Integer, nullable=True)
 
     # Language and metadata
@@ -37,5 +37,10 @@ class Contract(Base):
     deadlines = relationship("Deadline", back_populates="contract", cascade="all, delete-orphan")
     feedback = relationship("Feedback", back_populates="contract", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of the contract list
+        Index("ix_contracts_user_uploaded", user_id, uploaded_at, id),
+    )
+
     def __repr__(self):
         return f"<Contract(id={self.id}, filename={self.filename})>"
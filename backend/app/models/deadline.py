@@ -2,7 +2,7 @@
 Deadline model for contract deadlines tracking
 """
 
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -59,5 +59,10 @@ class Deadline(Base):
     analysis = relationship("Analysis", back_populates="deadlines")
     user = relationship("User", back_populates="deadlines")
 
+    __table_args__ = (
+        # Keyset pagination of the deadline list
+        Index("ix_deadlines_user_date", user_id, date, id),
+    )
+
     def __repr__(self):
         return f"<Deadline {self.title} - {self.date or self.date_formula}>"
@@ -3,7 +3,7 @@ Feedback Model
 Stores user feedback on analysis results for confidence calibration
 """
 
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -64,5 +64,10 @@ class Feedback(Base):
     analysis = relationship("Analysis", back_populates="feedback")
     contract = relationship("Contract", back_populates="feedback")
 
+    __table_args__ = (
+        # Keyset pagination of the feedback list
+        Index("ix_feedback_user_created", user_id, created_at, id),
+    )
+
     def __repr__(self):
         return f"<Feedback {self.id} - {self.section} - {self.feedback_type}>"
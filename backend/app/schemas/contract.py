@@ -24,9 +24,9 @@ class ContractUpload(BaseModel):
     status: str
 
 
-class ContractResponse(ContractBase):
+class ContractSummary(ContractBase):
     """
-    Contract response schema
+    Contract summary schema (list views, no extracted text)
     """
     id: UUID4
     user_id: UUID4
@@ -35,7 +35,6 @@ class ContractResponse(ContractBase):
     file_size: int
     file_path: str
     page_count: Optional[int]
-    extracted_text: Optional[str]
     detected_language: Optional[str]
     jurisdiction: Optional[str]
     uploaded_at: datetime
@@ -46,11 +45,19 @@ class ContractResponse(ContractBase):
     model_config = {"from_attributes": True}
 
 
+class ContractResponse(ContractSummary):
+    """
+    Contract response schema (detail view)
+    """
+    extracted_text: Optional[str] = None
+
+
 class ContractList(BaseModel):
     """
     List of contracts
     """
-    contracts: list[ContractResponse]
-    total: int
-    page: int
+    contracts: list[ContractSummary]
+    total: Optional[int] = None  # Only when requested (include_total)
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page
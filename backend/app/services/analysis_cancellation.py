@@ -0,0 +1,70 @@
+"""
+Analysis Cancellation
+
+POST /analyses/{id}/cancel marks the analysis "cancelled" and sets a flag in
+Redis. The analysis tasks check the flag between stages and while waiting
+on an LLM call, and abort the call in flight (see LLMRouter.abort), so the
+worker slot goes to the next queued analysis. Queued tasks are also revoked
+by ID (see tasks/dispatch.py).
+
+Without Redis the tasks rely on the cancelled status in the database, which
+they also check; only LLMRouter's own check before each call needs Redis.
+"""
+
+import logging
+import uuid
+from typing import Union
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "analysis_cancel:"
+
+# Longer than any analysis can run (task_time_limit is 30 minutes)
+FLAG_TTL = 60 * 60
+
+_redis = None
+
+
+class AnalysisCancelled(Exception):
+    """The analysis was cancelled by its owner"""
+
+
+def _redis_client():
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _redis
+
+
+def request_cancel(analysis_id: Union[str, uuid.UUID]) -> bool:
+    """
+    Set the cancellation flag for an analysis
+
+    Returns:
+        False if Redis is unavailable (tasks fall back to the database status)
+    """
+    client = _redis_client()
+    if client is None:
+        return False
+    try:
+        client.set(f"{REDIS_KEY_PREFIX}{analysis_id}", 1, ex=FLAG_TTL)
+    except Exception as e:
+        logger.warning(f"Setting cancellation flag for analysis {analysis_id} failed: {e}")
+        return False
+    return True
+
+
+def is_cancelled(analysis_id: Union[str, uuid.UUID]) -> bool:
+    """Whether the cancellation flag is set (False if Redis is unavailable)"""
+    client = _redis_client()
+    if client is None:
+        return False
+    try:
+        return bool(client.exists(f"{REDIS_KEY_PREFIX}{analysis_id}"))
+    except Exception as e:
+        # Polled while waiting on LLM calls: keep the log quiet
+        logger.debug(f"Reading cancellation flag for analysis {analysis_id} failed: {e}")
+        return False
@@ -0,0 +1,85 @@
+"""
+Analysis Search Service
+
+Builds SQL filters over the JSONB analysis results, so questions like
+"which of my contracts have a high-level risk" run in the database
+instead of loading every analysis into Python.
+
+Filters are written to match the GIN indexes on `analyses`:
+- ix_analyses_risks_gin:              (analysis_result -> 'risks') @> '[{"level": ...}]'
+- ix_analyses_preparation_result_gin: preparation_result @> '{"agreement_type": ...}'
+- ix_analyses_screening_result:       screening_result = ...
+
+PostgreSQL only (JSONB operators).
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models.analysis import Analysis
+
+RISK_LEVELS = ("high", "medium", "low")
+SCREENING_RESULTS = ("no_major_issues", "recommended_to_address", "high_risk")
+
+# What the LLM writes into auto_renewal when a contract does not renew
+NO_AUTO_RENEWAL_VALUES = ("", "null", "none", "no", "n/a", "not specified")
+
+
+def _risks() -> ColumnElement:
+    # Literal key (not a bind parameter) so the expression matches the GIN index
+    return Analysis.analysis_result.op("->", return_type=JSONB)(literal_column("'risks'"))
+
+
+def _auto_renewal_text() -> ColumnElement:
+    return func.lower(func.trim(Analysis.preparation_result["auto_renewal"].astext))
+
+
+def build_analysis_filters(
+    risk_level: Optional[str] = None,
+    agreement_type: Optional[str] = None,
+    auto_renewal: Optional[bool] = None,
+    screening_result: Optional[str] = None
+) -> List[ColumnElement]:
+    """
+    Build WHERE conditions on Analysis for the given criteria
+
+    Args:
+        risk_level: Has at least one risk with this level (high, medium, low)
+        agreement_type: Step 1 agreement type (lease, nda, employment, ...)
+        auto_renewal: Whether Step 1 found renewal terms
+        screening_result: Final screening result
+
+    Returns:
+        List of SQLAlchemy conditions (empty if no criteria given)
+
+    Raises:
+        ValueError: If risk_level or screening_result is not a known value
+    """
+    conditions: List[ColumnElement] = []
+
+    if risk_level is not None:
+        if risk_level not in RISK_LEVELS:
+            raise ValueError(f"Invalid risk_level: {risk_level}")
+        conditions.append(_risks().contains([{"level": risk_level}]))
+
+    if agreement_type is not None:
+        conditions.append(
+            Analysis.preparation_result.contains({"agreement_type": agreement_type.lower()})
+        )
+
+    if auto_renewal is not None:
+        renewal = _auto_renewal_text()
+        if auto_renewal:
+            conditions.append(renewal.notin_(NO_AUTO_RENEWAL_VALUES))
+        else:
+            conditions.append(or_(renewal.is_(None), renewal.in_(NO_AUTO_RENEWAL_VALUES)))
+
+    if screening_result is not None:
+        if screening_result not in SCREENING_RESULTS:
+            raise ValueError(f"Invalid screening_result: {screening_result}")
+        conditions.append(Analysis.screening_result == screening_result)
+
+    return conditions
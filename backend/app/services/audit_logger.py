@@ -2,6 +2,8 @@
 Audit Logger Service
 
 Provides easy-to-use functions for logging audit events throughout the application.
+Entries are handed to the audit sink (see audit_sink.py), which writes them in
+batches outside the request's session and transaction.
 """
 
 from sqlalchemy.orm import Session
@@ -10,6 +12,7 @@ from datetime import datetime
 import uuid
 
 from ..models.audit_log import AuditLog
+from .audit_sink import audit_sink
 
 
 class AuditLogger:
@@ -17,7 +20,7 @@ class AuditLogger:
     Service for creating audit log entries.
 
     Usage:
-        audit = AuditLogger(db, user_id="...", ip_address="...", user_agent="...")
+        audit = AuditLogger(user_id="...", ip_address="...", user_agent="...")
         audit.log_contract_upload(contract_id, status="success")
         audit.log_contract_view(contract_id)
         audit.log_contract_delete(contract_id)
@@ -25,12 +28,12 @@ class AuditLogger:
 
     def __init__(
         self,
-        db: Session,
+        db: Optional[Session] = None,
         user_id: Optional[uuid.UUID] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
     ):
-        self.db = db
+        self.db = db  # Not used for writes (the audit sink has its own session)
         self.user_id = user_id
         self.ip_address = ip_address
         self.user_agent = user_agent
@@ -56,26 +59,24 @@ class AuditLogger:
             duration_ms: How long the operation took in milliseconds
 
         Returns:
-            The created AuditLog entry
+            The AuditLog entry (transient; written by the audit sink)
         """
-        log_entry = AuditLog(
-            user_id=self.user_id,
-            ip_address=self.ip_address,
-            user_agent=self.user_agent,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            status=status,
-            details=details,
-            duration_ms=duration_ms,
-            created_at=datetime.utcnow()
-        )
-
-        self.db.add(log_entry)
-        self.db.commit()
-        self.db.refresh(log_entry)
+        record = {
+            "id": uuid.uuid4(),
+            "user_id": self.user_id,
+            "ip_address": self.ip_address,
+            "user_agent": self.user_agent,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "status": status,
+            "details": details,
+            "duration_ms": duration_ms,
+            "created_at": datetime.utcnow(),
+        }
+        audit_sink.submit(record)
 
-        return log_entry
+        return AuditLog(**record)
 
     # ===== Contract Operations =====
 
@@ -333,7 +334,7 @@ class AuditLogger:
 
 # Helper function to create an audit logger
 def get_audit_logger(
-    db: Session,
+    db: Optional[Session] = None,
     user_id: Optional[uuid.UUID] = None,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
@@ -344,7 +345,6 @@ def get_audit_logger(
     Usage in FastAPI endpoint:
         from fastapi import Request
         audit = get_audit_logger(
-            db,
             user_id=current_user.id,
             ip_address=request.client.host,
             user_agent=request.headers.get("user-agent")
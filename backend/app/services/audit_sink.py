@@ -0,0 +1,404 @@
+"""
+Audit Sink
+
+Takes audit log writes off the request path. Records are put on a bounded
+in-process queue and a background thread writes them in batches, one
+multi-row INSERT per batch, using its own database session.
+
+If the queue is full, records spill over to a Redis stream and the flusher
+drains them back into the database. If Redis is unreachable too, the record
+is dropped and counted as failed: submit() runs on the event loop, where a
+database write would stall every request of the process.
+
+Every API process polls the same stream (every SPILL_POLL_INTERVAL, whether
+or not it spilled anything itself), through one consumer group: an entry
+is delivered to a single process and acknowledged once inserted.
+Entries left unacknowledged by a crashed process are claimed by another
+after SPILL_CLAIM_IDLE_MS; the insert skips rows that already exist, so a
+crash between insert and acknowledgement does not duplicate them. Entries
+that cannot be inserted move to a dead-letter stream instead of blocking
+the rest.
+
+Durability modes (AUDIT_DURABILITY):
+- "async": enqueue and return (default). Records still queued when the
+  process is killed without a clean shutdown are lost.
+- "sync":  one INSERT per record, committed right away instead of batched.
+  Outside an event loop (Celery tasks, scripts) submit() returns once it is
+  written; on the event loop the write is handed to a worker thread.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+SPILL_STREAM = "audit_logs:spill"
+SPILL_GROUP = "audit-sink"
+DEAD_LETTER_STREAM = "audit_logs:spill:dead"
+
+# Unacknowledged spill entries idle this long belong to a dead consumer
+SPILL_CLAIM_IDLE_MS = 60 * 1000
+
+# How often the flusher drains the spill stream (seconds)
+SPILL_POLL_INTERVAL = 5.0
+
+_UUID_FIELDS = ("user_id", "resource_id")
+
+
+def _encode(record: Dict[str, Any]) -> Dict[str, str]:
+    """Flatten a record for a Redis stream entry"""
+    return {"record": json.dumps(record, default=str)}
+
+
+def _decode(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    """Inverse of _encode"""
+    record = json.loads(fields[b"record"])
+    record["id"] = uuid.UUID(record["id"])
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    for field in _UUID_FIELDS:
+        if record.get(field):
+            record[field] = uuid.UUID(record[field])
+    return record
+
+
+class AuditSink:
+    """
+    Bounded, batching writer for audit_logs.
+
+    Usage:
+        audit_sink.submit({...AuditLog column values...})
+        audit_sink.stats()      # queue depth and counters
+        audit_sink.stop()       # flush what is left (app shutdown)
+    """
+
+    def __init__(
+        self,
+        mode: str = "async",
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        redis_url: Optional[str] = None
+    ):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.redis_url = redis_url
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._redis = None
+        self._spill_group_ready = False
+        self._consumer = f"{socket.gethostname()}-{os.getpid()}"
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.spilled = 0
+        self.sync_writes = 0
+        self.failed = 0
+        self.dead_lettered = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+
+    # ===== Producer side =====
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """
+        Hand over one audit record (column values of AuditLog)
+
+        Never raises: audit failures are logged, not surfaced to the request.
+        """
+        if self.mode == "sync":
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._write_sync(record)
+            else:
+                loop.run_in_executor(None, self._write_sync, record)
+            return
+
+        self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if not self._spill(record):
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"Audit queue full and Redis unavailable, dropped {record.get('action')} record")
+            return
+
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _write_sync(self, record: Dict[str, Any]) -> None:
+        try:
+            self._insert([record])
+            with self._lock:
+                self.sync_writes += 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            logger.exception("Audit log write failed")
+
+    def _spill(self, record: Dict[str, Any]) -> bool:
+        """Push a record to the Redis spill-over stream (False if unavailable)"""
+        client = self._redis_client()
+        if client is None:
+            return False
+        try:
+            client.xadd(SPILL_STREAM, _encode(record))
+        except Exception as e:
+            logger.warning(f"Audit spill-over to Redis failed: {e}")
+            return False
+        with self._lock:
+            self.spilled += 1
+        return True
+
+    def _redis_client(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    # ===== Flusher =====
+
+    def start(self) -> None:
+        """Start the background flusher (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher after writing everything still queued"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self) -> int:
+        """
+        Write everything currently queued (and spilled) in batches
+
+        Returns:
+            Number of records written
+        """
+        written = 0
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                break
+            written += self._write_batch(batch)
+        written += self._drain_spill()
+        return written
+
+    def _run(self) -> None:
+        # Pick up records spilled by an earlier process first
+        last_spill_check = time.monotonic()
+        self._drain_spill()
+        while not self._stopping.is_set():
+            batch = self._take_batch(block=True)
+            if batch:
+                self._write_batch(batch)
+            # Any process may have spilled (its queue filled up), not just this one
+            if time.monotonic() - last_spill_check > SPILL_POLL_INTERVAL:
+                last_spill_check = time.monotonic()
+                self._drain_spill()
+        self.flush()
+
+    def _take_batch(self, block: bool) -> List[Dict[str, Any]]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> int:
+        started = time.perf_counter()
+        try:
+            self._insert(batch)
+        except Exception:
+            logger.exception(f"Audit batch of {len(batch)} failed, spilling")
+            lost = [record for record in batch if not self._spill(record)]
+            with self._lock:
+                self.failed += len(lost)
+            return 0
+
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+        return len(batch)
+
+    def _drain_spill(self) -> int:
+        """Insert spilled records (entries of other processes included)"""
+        client = self._redis_client()
+        if client is None:
+            return 0
+        written = 0
+        try:
+            self._ensure_spill_group(client)
+            # Entries of a crashed consumer first, then new ones
+            while True:
+                _, entries, *_ = client.xautoclaim(
+                    SPILL_STREAM, SPILL_GROUP, self._consumer,
+                    min_idle_time=SPILL_CLAIM_IDLE_MS, count=self.batch_size
+                )
+                if not entries:
+                    break
+                written += self._insert_spilled(client, entries)
+            while True:
+                response = client.xreadgroup(
+                    SPILL_GROUP, self._consumer, {SPILL_STREAM: ">"}, count=self.batch_size
+                )
+                entries = response[0][1] if response else []
+                if not entries:
+                    break
+                written += self._insert_spilled(client, entries)
+        except Exception as e:
+            logger.warning(f"Draining audit spill-over stream failed: {e}")
+        with self._lock:
+            self.written += written
+        return written
+
+    def _ensure_spill_group(self, client) -> None:
+        if self._spill_group_ready:
+            return
+        import redis
+        try:
+            client.xgroup_create(SPILL_STREAM, SPILL_GROUP, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._spill_group_ready = True
+
+    def _insert_spilled(self, client, entries: List[Any]) -> int:
+        """
+        Insert claimed spill entries and acknowledge them
+
+        A failing batch is retried row by row; rows that still fail go to the
+        dead-letter stream. Database outages (OperationalError) propagate and
+        leave the entries pending for a later drain.
+        """
+        records, dead = [], []
+        for entry_id, fields in entries:
+            try:
+                records.append((entry_id, _decode(fields)))
+            except Exception as e:
+                dead.append((entry_id, fields, f"Undecodable: {e}"))
+
+        written = 0
+        try:
+            self._insert([record for _, record in records], ignore_duplicates=True)
+            written = len(records)
+        except OperationalError:
+            raise
+        except Exception:
+            logger.warning(f"Audit spill batch of {len(records)} failed, inserting row by row", exc_info=True)
+            fields_by_id = dict(entries)
+            for entry_id, record in records:
+                try:
+                    self._insert([record], ignore_duplicates=True)
+                    written += 1
+                except OperationalError:
+                    raise
+                except Exception as e:
+                    dead.append((entry_id, fields_by_id[entry_id], str(e)))
+
+        entry_ids = [entry_id for entry_id, _ in entries]
+        with client.pipeline(transaction=True) as pipe:
+            for entry_id, fields, error in dead:
+                pipe.xadd(DEAD_LETTER_STREAM, {**fields, "error": error[:1000], "entry_id": entry_id})
+            pipe.xack(SPILL_STREAM, SPILL_GROUP, *entry_ids)
+            pipe.xdel(SPILL_STREAM, *entry_ids)
+            pipe.execute()
+
+        if dead:
+            logger.error(f"Moved {len(dead)} audit records to {DEAD_LETTER_STREAM}")
+            with self._lock:
+                self.dead_lettered += len(dead)
+        return written
+
+    @staticmethod
+    def _insert(records: List[Dict[str, Any]], ignore_duplicates: bool = False) -> None:
+        """
+        One multi-row INSERT ... VALUES for the batch
+
+        ignore_duplicates: skip rows already written (ON CONFLICT DO NOTHING)
+        """
+        if not records:
+            return
+        db = SessionLocal()
+        if ignore_duplicates:
+            dialect_insert = sqlite_insert if db.get_bind().dialect.name == "sqlite" else postgresql_insert
+            statement = dialect_insert(AuditLog.__table__).values(records).on_conflict_do_nothing()
+        else:
+            statement = insert(AuditLog.__table__).values(records)
+        try:
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+    # ===== Metrics =====
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and counters"""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_queue_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "batches": self.batches,
+                "spilled": self.spilled,
+                "sync_writes": self.sync_writes,
+                "failed": self.failed,
+                "dead_lettered": self.dead_lettered,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+            }
+
+
+audit_sink = AuditSink(
+    mode=settings.AUDIT_DURABILITY,
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    redis_url=settings.REDIS_URL or None
+)
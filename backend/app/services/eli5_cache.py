@@ -0,0 +1,186 @@
+"""
+ELI5 Item Cache
+
+Simplified texts of single obligations, rights, risks and mitigations, keyed
+by a hash of the item's source text (and the section and prompt version).
+Standard clauses recur across contracts, so an item simplified once is
+reused by every later analysis that contains it, and a batch only sends the
+items it has not seen before to the LLM.
+
+Two levels:
+- in-process LRU (always)
+- Redis string per item (optional, ELI5_CACHE_REDIS=true), shared by the
+  API processes and workers
+
+Hit/miss counters are also summed over all processes in Redis (ELI5 runs on
+the workers), and stats() reports those totals when Redis is available.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from ..config import settings
+from .shared_counters import shared_counters
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "eli5_item:"
+
+
+def item_key(section: str, text: str, version: str) -> str:
+    """Cache key of an item: hash of prompt version, section and source text"""
+    digest = hashlib.sha256(f"{version}\0{section}\0{text}".encode("utf-8")).hexdigest()
+    return digest
+
+
+class ELI5Cache:
+    """
+    Usage:
+        cached = eli5_cache.get_many(keys)      # {key: simplified text} for hits
+        eli5_cache.set_many({key: simplified text, ...})
+        eli5_cache.stats()
+    """
+
+    def __init__(self, ttl: float = 30 * 24 * 3600, max_size: int = 20000, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis_url = redis_url
+
+        # key -> (expires_at, text), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._shared = shared_counters("eli5_cache")
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.stored = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # ===== Lookup =====
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Cached texts of the keys that are cached"""
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+
+        found: Dict[str, str] = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+            self.hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        from_redis = self._redis_get(missing)
+        if from_redis:
+            self._store(from_redis)
+            found.update(from_redis)
+
+        with self._lock:
+            self.redis_hits += len(from_redis)
+            self.misses += len(missing) - len(from_redis)
+        self._shared.incr(
+            hits=len(keys) - len(missing), redis_hits=len(from_redis), misses=len(missing) - len(from_redis)
+        )
+        return found
+
+    def set_many(self, texts: Dict[str, str]) -> None:
+        """Cache simplified texts (validated ones only)"""
+        if not self.enabled or not texts:
+            return
+        self._store(texts)
+        self._redis_set(texts)
+        with self._lock:
+            self.stored += len(texts)
+        self._shared.incr(stored=len(texts))
+
+    def _store(self, texts: Dict[str, str]) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, text in texts.items():
+                self._entries[key] = (expires_at, text)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ===== Redis =====
+
+    def _redis_client(self):
+        if self._redis is None and self.redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def _redis_get(self, keys: list) -> Dict[str, str]:
+        client = self._redis_client()
+        if client is None or not keys:
+            return {}
+        try:
+            values = client.mget([f"{REDIS_KEY_PREFIX}{key}" for key in keys])
+        except Exception as e:
+            logger.warning(f"ELI5 cache lookup in Redis failed: {e}")
+            return {}
+        return {key: value.decode("utf-8") for key, value in zip(keys, values) if value is not None}
+
+    def _redis_set(self, texts: Dict[str, str]) -> None:
+        client = self._redis_client()
+        if client is None:
+            return
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                for key, text in texts.items():
+                    pipe.set(f"{REDIS_KEY_PREFIX}{key}", text, ex=max(1, int(self.ttl)))
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"ELI5 cache write to Redis failed: {e}")
+
+    # ===== Metrics =====
+
+    def stats(self) -> Dict[str, object]:
+        """Counters of all processes (this process's without Redis); size is this process's LRU"""
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "stored": self.stored,
+            }
+            size = len(self._entries)
+        shared = self._shared.read()
+        if shared is not None:
+            counters = {name: shared.get(name, 0) for name in counters}
+        lookups = counters["hits"] + counters["redis_hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "redis": bool(self.redis_url),
+            "scope": "this process" if shared is None else "all processes",
+            "size": size,
+            **counters,
+            "hit_rate": round((counters["hits"] + counters["redis_hits"]) / lookups, 4) if lookups else 0.0,
+        }
+
+
+eli5_cache = ELI5Cache(
+    ttl=settings.ELI5_CACHE_TTL,
+    max_size=settings.ELI5_CACHE_SIZE,
+    redis_url=settings.REDIS_URL if settings.ELI5_CACHE_REDIS else None
+)
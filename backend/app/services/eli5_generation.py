@@ -0,0 +1,136 @@
+"""
+ELI5 Generation Coordination
+
+The simplified version of an analysis (formatted_output_eli5) is generated
+by a Celery job, either on demand (POST /analyses/{id}/simplify) or
+speculatively after the analysis succeeded (see tasks/eli5.py). Each job
+claims the analysis in Redis, under its job ID, before it starts: the same
+analysis is never simplified twice at the same time, and requests arriving
+meanwhile attach to the job holding the claim.
+
+The claim is taken when the job is queued and lives ELI5_CLAIM_TTL seconds,
+covering the wait on the "llm" queue; the job renews it when it starts and
+after each simplified section, so it never expires under a running job.
+
+Without Redis nothing is coordinated (claims always succeed); the item cache
+(services/eli5_cache.py) still keeps duplicate work cheap.
+"""
+
+import logging
+import uuid
+from typing import Any, Dict, Optional, Union
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Analysis
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "eli5_lock:"
+
+# Covers queueing, and each step of a running job (renewed); a lost job blocks no longer
+LOCK_TTL = settings.ELI5_CLAIM_TTL
+
+_redis = None
+
+
+def _redis_client():
+    global _redis
+    if _redis is None and settings.REDIS_URL:
+        import redis
+        _redis = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _redis
+
+
+def claim(analysis_id: Union[str, uuid.UUID], owner: str) -> bool:
+    """
+    Claim the ELI5 generation of an analysis for a job
+
+    Args:
+        analysis_id: UUID of the analysis
+        owner: Job ID
+
+    Returns:
+        False if someone else is generating it (True without Redis)
+    """
+    client = _redis_client()
+    if client is None:
+        return True
+    try:
+        return bool(client.set(f"{REDIS_KEY_PREFIX}{analysis_id}", owner, nx=True, ex=LOCK_TTL))
+    except Exception as e:
+        logger.warning(f"Claiming ELI5 generation of analysis {analysis_id} failed: {e}")
+        return True
+
+
+def refresh(analysis_id: Union[str, uuid.UUID], owner: str) -> bool:
+    """
+    Renew a job's claim for another LOCK_TTL seconds (re-taking it if it expired)
+
+    Returns:
+        False if another job holds the claim (True without Redis)
+    """
+    client = _redis_client()
+    if client is None:
+        return True
+    key = f"{REDIS_KEY_PREFIX}{analysis_id}"
+    try:
+        if client.set(key, owner, nx=True, ex=LOCK_TTL):
+            return True
+        holder = client.get(key)
+        if holder is not None and holder.decode("utf-8") == owner:
+            client.expire(key, LOCK_TTL)
+            return True
+        return False
+    except Exception as e:
+        logger.warning(f"Renewing ELI5 generation claim of analysis {analysis_id} failed: {e}")
+        return True
+
+
+def release(analysis_id: Union[str, uuid.UUID], owner: str) -> None:
+    """Release a claim taken with claim()"""
+    client = _redis_client()
+    if client is None:
+        return
+    key = f"{REDIS_KEY_PREFIX}{analysis_id}"
+    try:
+        holder = client.get(key)
+        if holder is not None and holder.decode("utf-8") == owner:
+            client.delete(key)
+    except Exception as e:
+        logger.warning(f"Releasing ELI5 generation of analysis {analysis_id} failed: {e}")
+
+
+def claimed_by(analysis_id: Union[str, uuid.UUID]) -> Optional[str]:
+    """Job ID holding the claim, if any"""
+    client = _redis_client()
+    if client is None:
+        return None
+    try:
+        holder = client.get(f"{REDIS_KEY_PREFIX}{analysis_id}")
+    except Exception as e:
+        logger.warning(f"Reading ELI5 generation claim of analysis {analysis_id} failed: {e}")
+        return None
+    return holder.decode("utf-8") if holder is not None else None
+
+
+def store_result(analysis_id: uuid.UUID, result: Dict[str, Any], overwrite: bool = True) -> bool:
+    """
+    Store formatted_output_eli5 in a session of its own
+
+    Args:
+        overwrite: Replace an existing result (False: only fill it in)
+
+    Returns:
+        Whether the result was stored
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(Analysis).filter(Analysis.id == analysis_id)
+        if not overwrite:
+            query = query.filter(Analysis.formatted_output_eli5.is_(None))
+        stored = query.update({Analysis.formatted_output_eli5: result}, synchronize_session=False)
+        db.commit()
+        return bool(stored)
+    finally:
+        db.close()
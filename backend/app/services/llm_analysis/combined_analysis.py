@@ -0,0 +1,151 @@
+"""
+Combined Analysis
+Step 1 and Step 2 in one LLM call, for short contracts
+
+For a contract of a few thousand characters, the two steps send mostly the
+same text in two round trips. The combined prompt (prompts/combined_en.txt)
+asks for both schemas in one JSON response ({"preparation": ..., "analysis":
+...}), which halves the latency and the input tokens. It is selected by
+document size in tokens (COMBINED_ANALYSIS_MAX_TOKENS, 0 disables it: a
+character limit would let through twice as much Latin as Cyrillic text); a response
+missing required fields raises IncompleteCombinedResponse, and the caller
+falls back to the two-step path.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .llm_router import LLMRouter, LLMCallCancelled
+from .prompt_templates import PromptTemplate, get_prompt_template
+from .step1_preparation import build_preparation_data, run_step1_heuristics
+from .token_budget import count_tokens
+
+# Contracts up to this many tokens (redacted text) are analyzed in one call
+COMBINED_ANALYSIS_MAX_TOKENS = int(os.getenv("COMBINED_ANALYSIS_MAX_TOKENS", "2000"))
+
+# Fields the rest of the pipeline (formatting, deadlines, screening) relies on
+PREPARATION_REQUIRED_FIELDS = ("agreement_type", "user_role", "parties", "negotiability", "jurisdiction")
+ANALYSIS_REQUIRED_FIELDS = ("about_summary", "obligations", "rights", "risks", "screening_result")
+
+
+class IncompleteCombinedResponse(ValueError):
+    """The combined response lacks fields of one of the two schemas"""
+
+
+def use_combined_analysis(contract_text: str, model: Optional[str] = None) -> bool:
+    """Whether a contract is short enough for the combined call"""
+    if COMBINED_ANALYSIS_MAX_TOKENS <= 0 or not contract_text:
+        return False
+    # Skip counting texts far too long (prose runs well under 8 characters per token)
+    if len(contract_text) > COMBINED_ANALYSIS_MAX_TOKENS * 8:
+        return False
+    return count_tokens(contract_text, model) <= COMBINED_ANALYSIS_MAX_TOKENS
+
+
+def _instructions(template: PromptTemplate) -> str:
+    """Static prefix of a step template (task and schema), without its intro line"""
+    return template.static_prefix.split("\n", 1)[1].strip()
+
+
+# (combined, preparation, analysis template versions) -> compiled combined template
+_compiled: Dict[Tuple[str, str, str], PromptTemplate] = {}
+
+
+def combined_template() -> PromptTemplate:
+    """
+    Combined template with the Step 1 and Step 2 instructions inlined
+
+    Compiled once per version of the three templates; its static prefix
+    holds all instructions, its placeholders are contract_text and
+    output_language.
+    """
+    combined = get_prompt_template("combined")
+    preparation = get_prompt_template("preparation")
+    analysis = get_prompt_template("analysis")
+    key = (combined.version, preparation.version, analysis.version)
+
+    template = _compiled.get(key)
+    if template is None:
+        template = combined.partial(
+            preparation_instructions=_instructions(preparation),
+            analysis_instructions=_instructions(analysis)
+        )
+        _compiled.clear()  # Older versions are stale (hot reload)
+        _compiled[key] = template
+    return template
+
+
+def _validate(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    preparation = result.get("preparation")
+    analysis = result.get("analysis")
+    if not isinstance(preparation, dict) or not isinstance(analysis, dict):
+        raise IncompleteCombinedResponse("Combined response lacks the preparation or analysis object")
+
+    missing = [f"preparation.{field}" for field in PREPARATION_REQUIRED_FIELDS if field not in preparation]
+    missing += [f"analysis.{field}" for field in ANALYSIS_REQUIRED_FIELDS if field not in analysis]
+    if missing:
+        raise IncompleteCombinedResponse(f"Combined response lacks {', '.join(missing)}")
+    return preparation, analysis
+
+
+def run_combined_analysis(
+    contract_text: str,
+    detected_language: str,
+    quality_score: float,
+    llm_router: LLMRouter,
+    output_language: str = "english",
+    on_response: Optional[Callable[[str], None]] = None
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run Step 1 and Step 2 in a single LLM call
+
+    Args:
+        contract_text: Extracted contract text (short, see use_combined_analysis)
+        detected_language: Detected language from language detection
+        quality_score: Quality score from document parser
+        llm_router: LLM router instance
+        output_language: Language for output
+        on_response: Receives the raw LLM response (for checkpointing)
+
+    Returns:
+        (Step 1 results, Step 2 results), as run_step1_preparation and
+        run_step2_analysis return them
+
+    Raises:
+        IncompleteCombinedResponse: Required fields are missing (run the two steps instead)
+    """
+    template = combined_template()
+    system_prompt = "You are a legal document analyst helping non-lawyers understand contracts. Extract information accurately and return valid JSON."
+    prompt = template.render(contract_text=contract_text, output_language=output_language.capitalize())
+    # Stay within the provider's tokens-per-minute window
+    llm_router.wait_for_rate_limit(system_prompt, template.static_prefix, prompt)
+
+    # Like Step 1: the local heuristics run while the LLM request is in flight
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="combined-llm") as executor:
+        llm_future = executor.submit(
+            llm_router.call_with_json,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            prefix=template.static_prefix,
+            on_response=on_response
+        )
+
+        heuristics = run_step1_heuristics(contract_text, detected_language)
+
+        try:
+            result = llm_future.result()
+        except LLMCallCancelled:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Combined analysis failed: {str(e)}")
+
+    preparation, analysis = _validate(result)
+    preparation_data = build_preparation_data(preparation, heuristics, detected_language, quality_score)
+    analysis_data = {
+        **analysis,
+        "agreement_type": preparation_data.get("agreement_type"),
+        "user_role": preparation_data.get("user_role"),
+        "negotiability": preparation_data.get("negotiability")
+    }
+    return preparation_data, analysis_data
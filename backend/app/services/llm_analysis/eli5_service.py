@@ -1,14 +1,61 @@
 """
 ELI5 (Explain Like I'm 5) Simplification Service
 Simplifies legal language into everyday terms using LLM
+
+Sections are simplified concurrently (one LLM call each, up to
+ELI5_MAX_CONCURRENCY at a time) through a single LLMRouter, shared by
+all requests of the process, so they reuse the SDK client's connection
+pool; the total latency is close to that of the slowest section.
 """
 
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from .llm_router import LLMRouter
+from .prompt_templates import DYNAMIC_MARKER, PromptTemplate
+from .token_budget import count_tokens
+from ..eli5_cache import eli5_cache, item_key
+import json
 import logging
+import os
+import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Sections simplified at the same time (one LLM call in flight per section)
+ELI5_MAX_CONCURRENCY = int(os.getenv("ELI5_MAX_CONCURRENCY", "5"))
+
+# Extra JSON batch calls for items that were missing or invalid in the response
+ELI5_BATCH_RETRIES = int(os.getenv("ELI5_BATCH_RETRIES", "1"))
+
+# Part of the item cache key (with the item prompt version, see below): bump
+# when the item text layout changes
+ELI5_ITEM_LAYOUT_VERSION = "json-1"
+
+DEFAULT_SECTIONS = ['obligations', 'rights', 'risks', 'mitigations', 'about_summary']
+
+_ITEM_PREFIX = re.compile(r"^Item\s*\d+\s*:\s*", re.IGNORECASE)
+
+_shared_router: Optional[LLMRouter] = None
+_shared_router_lock = threading.Lock()
+
+
+def get_shared_router() -> LLMRouter:
+    """
+    Process-wide LLMRouter for ELI5 calls (thread-safe SDK client, one connection pool)
+
+    Callers should not abort() it (that cancels every ELI5 call in flight);
+    if one does, the next caller gets a new router.
+    """
+    global _shared_router
+    router = _shared_router
+    if router is None or router.aborted:
+        with _shared_router_lock:
+            if _shared_router is None or _shared_router.aborted:
+                _shared_router = LLMRouter()
+            router = _shared_router
+    return router
+
 
 ELI5_PROMPT_TEMPLATE = """**Your Task:**
 Rephrase the following contract analysis text in simple, everyday language that anyone can understand.
@@ -41,9 +88,50 @@ Send a letter saying you want to end it. Do this 30 days before you want it to e
 Any conditions:
 You can only do this if you haven't broken any rules in the agreement.
 
+""" + DYNAMIC_MARKER + """
+
 **Text to Rephrase:**
 {text_to_simplify}"""
 
+ELI5_ITEM_PROMPT_TEMPLATE = """Rephrase ALL items given below in simple, everyday language.
+
+**Rules:**
+1. Use simple, everyday words - NO legal jargon
+2. Keep sentences SHORT: Maximum 15 words per sentence
+3. Keep the SAME meaning, just simpler words
+4. Do NOT add ANY prefixes - start directly with the rephrased content
+5. Return ONLY a JSON object mapping each item ID to its rephrased text, e.g. {"1": "...", "2": "..."}
+6. Include every item ID exactly once
+
+""" + DYNAMIC_MARKER + """
+
+Rephrase these {item_count} items.
+
+**Items to rephrase (JSON, item ID -> text):**
+
+{items}"""
+
+ELI5_SUMMARY_PROMPT_TEMPLATE = """Rephrase the contract summary given below in simple, everyday language that anyone can understand.
+
+**Rules:**
+1. Use simple, everyday words - NO legal jargon
+2. Keep sentences SHORT: Maximum 15 words per sentence
+3. Be conversational and friendly
+4. Keep the SAME meaning and key facts
+5. Do NOT add ANY prefixes - start directly with the rephrased content
+
+""" + DYNAMIC_MARKER + """
+
+**Contract Summary to Rephrase:**
+{about_text}"""
+
+_ELI5_PROMPT = PromptTemplate("eli5", ELI5_PROMPT_TEMPLATE)
+_ELI5_SUMMARY_PROMPT = PromptTemplate("eli5_summary", ELI5_SUMMARY_PROMPT_TEMPLATE)
+_ELI5_ITEM_PROMPT = PromptTemplate("eli5_items", ELI5_ITEM_PROMPT_TEMPLATE)
+
+# Cached items are only reused with the prompt that produced them
+ELI5_ITEM_PROMPT_VERSION = f"{ELI5_ITEM_LAYOUT_VERSION}-{_ELI5_ITEM_PROMPT.version}"
+
 
 def simplify_text(text: str, llm_router: LLMRouter) -> str:
     """
@@ -60,13 +148,14 @@ def simplify_text(text: str, llm_router: LLMRouter) -> str:
         return text
 
     try:
-        prompt = ELI5_PROMPT_TEMPLATE.replace("{text_to_simplify}", text)
+        prompt = _ELI5_PROMPT.render(text_to_simplify=text)
 
         simplified = llm_router.call(
             prompt=prompt,
             system_prompt="You are a helpful lawyer who explains complex legal concepts in simple, everyday language that anyone can understand.",
             temperature=0.1,  # Low temperature for consistent, accurate rephrasing
-            max_tokens=1000
+            max_tokens=1000,
+            prefix=_ELI5_PROMPT.static_prefix
         )
 
         # Strip common prefixes that LLMs add despite instructions
@@ -221,6 +310,103 @@ When to do it: {mitigation.get('when', '')}
     return simplified
 
 
+def _item_source_text(section_name: str, item: Dict[str, Any]) -> Optional[str]:
+    """Text of an item to simplify (None for unknown sections)"""
+    if section_name == 'obligations':
+        return f"""What you must do: {item.get('action', '')}
+When: {item.get('trigger', '')}
+Deadline: {item.get('time_window', '')}
+What happens if you don't: {item.get('consequence', '')}"""
+    if section_name == 'rights':
+        return f"""What you can do: {item.get('right', '')}
+How to do it: {item.get('how_to_exercise', '')}
+Any conditions: {item.get('conditions', 'None')}"""
+    if section_name == 'risks':
+        return f"""{_risk_emoji(item)}: {item.get('description', '')}
+What to do: {item.get('recommendation', '')}"""
+    if section_name == 'mitigations':
+        return f"""What to do to protect yourself: {item.get('mitigation', '') or item.get('action', '')}
+Why this helps: {item.get('rationale', '')}
+When to do it: {item.get('when', '')}"""
+    return None
+
+
+def _risk_emoji(item: Dict[str, Any]) -> str:
+    return {'high': '⚠️', 'medium': '⚠️', 'low': 'ℹ️'}.get((item.get('level') or 'medium').lower(), '⚠️')
+
+
+def _apply_simplified(section_name: str, item: Dict[str, Any], simplified_text: str) -> Dict[str, Any]:
+    """Copy of an item with its simplified text in the section's fields"""
+    simplified_item = item.copy()
+    if section_name == 'obligations':
+        simplified_item['action_simple'] = simplified_text
+        simplified_item['original_action'] = item.get('action', '')
+    elif section_name == 'rights':
+        simplified_item['right_simple'] = simplified_text
+        simplified_item['original_right'] = item.get('right', '')
+    elif section_name == 'risks':
+        simplified_item['description_simple'] = simplified_text
+        simplified_item['original_description'] = item.get('description', '')
+        simplified_item['level_simple'] = _risk_emoji(item)
+    elif section_name == 'mitigations':
+        simplified_item['mitigation_simple'] = simplified_text
+        simplified_item['original_mitigation'] = item.get('mitigation', '') or item.get('action', '')
+    return simplified_item
+
+
+def _parse_batch_response(response_text: str, item_ids: List[str]) -> Dict[str, str]:
+    """
+    Valid simplified texts of a JSON batch response, by item ID
+
+    Items that are missing, not a string or empty are left out (and retried).
+    """
+    try:
+        data = json.loads(response_text)
+    except (json.JSONDecodeError, TypeError):
+        logger.warning("ELI5 batch response is not valid JSON")
+        return {}
+    if isinstance(data, dict) and isinstance(data.get('items'), dict):
+        data = data['items']
+    if not isinstance(data, dict):
+        return {}
+
+    valid = {}
+    for item_id in item_ids:
+        text = data.get(item_id)
+        if not isinstance(text, str):
+            continue
+        text = _ITEM_PREFIX.sub('', text.strip(), count=1).strip()
+        if text:
+            valid[item_id] = text
+    return valid
+
+
+def _simplify_items_json(
+    section_name: str,
+    texts: Dict[str, str],
+    llm_router: LLMRouter
+) -> Dict[str, str]:
+    """One JSON-mode LLM call for {item ID: text}; returns the valid {item ID: simplified text}"""
+    prompt = _ELI5_ITEM_PROMPT.render(
+        item_count=str(len(texts)),
+        items=json.dumps(texts, ensure_ascii=False, indent=2)
+    )
+
+    try:
+        response_text = llm_router.call(
+            prompt=prompt,
+            system_prompt="You are a helpful lawyer who explains complex legal concepts in simple, everyday language.",
+            temperature=0.1,
+            max_tokens=min(4000, 500 + 300 * len(texts)),
+            json_mode=True,
+            prefix=_ELI5_ITEM_PROMPT.static_prefix
+        )
+    except Exception as e:
+        logger.warning(f"ELI5 batch call for {section_name} failed: {e}")
+        return {}
+    return _parse_batch_response(response_text, list(texts))
+
+
 def simplify_analysis_section_batch(
     section_name: str,
     section_data: List[Dict[str, Any]],
@@ -230,116 +416,81 @@ def simplify_analysis_section_batch(
     Simplify an entire section using BATCHED processing (1 LLM call for all items)
     This is 10-15x faster than individual calls
 
+    The model returns a JSON object {item ID: simplified text}, which is
+    validated per item: only items that are missing or invalid are sent
+    again (up to ELI5_BATCH_RETRIES more calls). Items are cached by a hash
+    of their text (see services/eli5_cache.py), so items already simplified
+    for any analysis, and duplicates within the section, skip the LLM.
+
     Args:
         section_name: Name of section ('obligations', 'rights', 'risks', 'mitigations')
         section_data: List of items in the section
         llm_router: LLM router instance
 
     Returns:
-        List of simplified items
+        List of simplified items (items that could not be simplified are
+        returned unchanged)
     """
     if not section_data or len(section_data) == 0:
         return []
 
     try:
-        # Build batch prompt with all items
-        batch_items = []
+        # Cache key of every item that can be simplified, by position
+        item_keys: Dict[int, str] = {}
+        source_texts: Dict[str, str] = {}
         for idx, item in enumerate(section_data):
             if not isinstance(item, dict):
                 continue
-
-            if section_name == 'obligations':
-                text = f"""Item {idx + 1}:
-What you must do: {item.get('action', '')}
-When: {item.get('trigger', '')}
-Deadline: {item.get('time_window', '')}
-What happens if you don't: {item.get('consequence', '')}"""
-            elif section_name == 'rights':
-                text = f"""Item {idx + 1}:
-What you can do: {item.get('right', '')}
-How to do it: {item.get('how_to_exercise', '')}
-Any conditions: {item.get('conditions', 'None')}"""
-            elif section_name == 'risks':
-                level = item.get('level', 'medium').lower()
-                emoji = {'high': '⚠️', 'medium': '⚠️', 'low': 'ℹ️'}.get(level, '⚠️')
-                text = f"""Item {idx + 1}:
-{emoji}: {item.get('description', '')}
-What to do: {item.get('recommendation', '')}"""
-            elif section_name == 'mitigations':
-                text = f"""Item {idx + 1}:
-What to do to protect yourself: {item.get('mitigation', '') or item.get('action', '')}
-Why this helps: {item.get('rationale', '')}
-When to do it: {item.get('when', '')}"""
-            else:
+            text = _item_source_text(section_name, item)
+            if text is None:
                 continue
+            key = item_key(section_name, text, ELI5_ITEM_PROMPT_VERSION)
+            item_keys[idx] = key
+            source_texts[key] = text
 
-            batch_items.append(text)
-
-        if not batch_items:
+        if not item_keys:
             return section_data
 
-        # Combine all items
-        batch_text = "\n\n---NEXT ITEM---\n\n".join(batch_items)
-
-        # Single LLM call for entire section
-        prompt = f"""Rephrase ALL {len(batch_items)} items below in simple, everyday language.
-
-**Rules:**
-1. Use simple, everyday words - NO legal jargon
-2. Keep sentences SHORT: Maximum 15 words per sentence
-3. Keep the SAME structure: "Item 1:", "Item 2:", etc.
-4. Do NOT add ANY prefixes - start directly with "Item 1:"
-5. Separate each item with "---NEXT ITEM---"
-
-**Items to rephrase:**
-
-{batch_text}"""
-
-        simplified_batch = llm_router.call(
-            prompt=prompt,
-            system_prompt="You are a helpful lawyer who explains complex legal concepts in simple, everyday language.",
-            temperature=0.1,
-            max_tokens=2000
-        )
-
-        # Parse batch response back into items
-        simplified_texts = simplified_batch.split("---NEXT ITEM---")
+        simplified_by_key = eli5_cache.get_many(source_texts)
+
+        # Distinct uncached texts, with short IDs for the prompt
+        pending = {
+            str(number): key
+            for number, key in enumerate((key for key in source_texts if key not in simplified_by_key), start=1)
+        }
+        cached = len(source_texts) - len(pending)
+        calls = 0
+        new_texts: Dict[str, str] = {}
+        while pending and calls <= ELI5_BATCH_RETRIES:
+            if calls:
+                logger.info(f"Retrying {len(pending)} missing/invalid {section_name} items")
+            calls += 1
+            results = _simplify_items_json(
+                section_name,
+                {item_id: source_texts[key] for item_id, key in pending.items()},
+                llm_router
+            )
+            for item_id, text in results.items():
+                new_texts[pending.pop(item_id)] = text
+
+        if pending:
+            logger.warning(f"{len(pending)} {section_name} items could not be simplified")
+        eli5_cache.set_many(new_texts)
+        simplified_by_key.update(new_texts)
 
         # Merge simplified text back into original items
         simplified_items = []
         for idx, item in enumerate(section_data):
-            if not isinstance(item, dict):
+            key = item_keys.get(idx)
+            if key is None or key not in simplified_by_key:
                 simplified_items.append(item)
-                continue
-
-            simplified_item = item.copy()
-
-            # Get simplified text for this item (if available)
-            if idx < len(simplified_texts):
-                simplified_text = simplified_texts[idx].strip()
-                # Remove "Item N:" prefix
-                simplified_text = simplified_text.split(":", 1)[-1].strip() if ":" in simplified_text else simplified_text
-
-                # Store in appropriate field based on section type
-                if section_name == 'obligations':
-                    simplified_item['action_simple'] = simplified_text
-                    simplified_item['original_action'] = item.get('action', '')
-                elif section_name == 'rights':
-                    simplified_item['right_simple'] = simplified_text
-                    simplified_item['original_right'] = item.get('right', '')
-                elif section_name == 'risks':
-                    simplified_item['description_simple'] = simplified_text
-                    simplified_item['original_description'] = item.get('description', '')
-                    simplified_item['level_simple'] = {'high': '⚠️', 'medium': '⚠️', 'low': 'ℹ️'}.get(
-                        item.get('level', 'medium').lower(), '⚠️'
-                    )
-                elif section_name == 'mitigations':
-                    simplified_item['mitigation_simple'] = simplified_text
-                    simplified_item['original_mitigation'] = item.get('mitigation', '') or item.get('action', '')
-
-            simplified_items.append(simplified_item)
+            else:
+                simplified_items.append(_apply_simplified(section_name, item, simplified_by_key[key]))
 
-        logger.info(f"Batch simplified {len(simplified_items)} {section_name} items in 1 LLM call")
+        logger.info(
+            f"Batch simplified {len(simplified_items)} {section_name} items "
+            f"({cached} cached, {calls} LLM calls)"
+        )
         return simplified_items
 
     except Exception as e:
@@ -410,23 +561,14 @@ def simplify_about_summary(about_text: str, llm_router: LLMRouter) -> str:
 
     try:
         # Use simplified prompt specifically for contract summaries
-        prompt = f"""Rephrase this contract summary in simple, everyday language that anyone can understand.
-
-**Rules:**
-1. Use simple, everyday words - NO legal jargon
-2. Keep sentences SHORT: Maximum 15 words per sentence
-3. Be conversational and friendly
-4. Keep the SAME meaning and key facts
-5. Do NOT add ANY prefixes - start directly with the rephrased content
-
-**Contract Summary to Rephrase:**
-{about_text}"""
+        prompt = _ELI5_SUMMARY_PROMPT.render(about_text=about_text)
 
         simplified = llm_router.call(
             prompt=prompt,
             system_prompt="You are a helpful lawyer who explains complex legal concepts in simple, everyday language.",
             temperature=0.1,
-            max_tokens=500
+            max_tokens=500,
+            prefix=_ELI5_SUMMARY_PROMPT.static_prefix
         )
 
         # Strip common prefixes that LLMs add despite instructions
@@ -462,10 +604,84 @@ def simplify_about_summary(about_text: str, llm_router: LLMRouter) -> str:
         return about_text
 
 
+def _simplify_section(
+    section: str,
+    section_data: Any,
+    llm_router: LLMRouter,
+    use_batch: bool
+) -> Optional[Tuple[str, Any]]:
+    """
+    Simplify one section of an analysis
+
+    Returns:
+        (output key, simplified value), or None if the section was skipped
+    """
+    # Special handling for about_summary (string, not list)
+    if section == 'about_summary':
+        if isinstance(section_data, str):
+            try:
+                simplified = simplify_about_summary(section_data, llm_router)
+                logger.info(f"Simplified about_summary text")
+                return 'about_summary_simplified', simplified
+            except Exception as e:
+                logger.error(f"Failed to simplify about_summary: {e}", exc_info=True)
+        else:
+            logger.warning(f"about_summary is not a string: {type(section_data)}")
+        return None
+
+    # Handle nested {content: [...]} structure
+    if isinstance(section_data, dict) and 'content' in section_data:
+        section_data = section_data['content']
+
+    # Now check if it's a list
+    if not isinstance(section_data, list):
+        logger.warning(f"Section {section} is not a list or doesn't have content: {type(section_data)}")
+        return None
+
+    try:
+        # Use batch processing for 10-15x speedup
+        if use_batch:
+            simplified = simplify_analysis_section_batch(section, section_data, llm_router)
+            logger.info(f"Batch simplified {len(section_data)} items in {section} (1 LLM call)")
+        else:
+            simplified = simplify_analysis_section(section, section_data, llm_router)
+            logger.info(f"Simplified {len(section_data)} items in {section} ({len(section_data)} LLM calls)")
+        return f'{section}_simplified', simplified
+    except Exception as e:
+        logger.error(f"Failed to simplify {section}: {e}", exc_info=True)
+        return None
+
+
+def estimate_simplification_tokens(
+    analysis_result: Dict[str, Any],
+    sections_to_simplify: Optional[List[str]] = None,
+    model: Optional[str] = None
+) -> int:
+    """
+    Tokens simplify_full_analysis would use (prompts and completions), for
+    rate-limit checks before starting it
+
+    Item cache hits are not taken into account: an upper bound.
+    """
+    total = 0
+    for section in sections_to_simplify or DEFAULT_SECTIONS:
+        section_data = analysis_result.get(section)
+        if not section_data:
+            continue
+        prefix = _ELI5_SUMMARY_PROMPT if section == 'about_summary' else _ELI5_ITEM_PROMPT
+        source = section_data if isinstance(section_data, str) else json.dumps(section_data, ensure_ascii=False)
+        # The simplified text is about as long as the source
+        total += count_tokens(prefix.static_prefix, model) + 2 * count_tokens(source, model)
+    return total
+
+
 def simplify_full_analysis(
     analysis_result: Dict[str, Any],
     sections_to_simplify: Optional[List[str]] = None,
-    use_batch: bool = True
+    use_batch: bool = True,
+    llm_router: Optional[LLMRouter] = None,
+    max_concurrency: Optional[int] = None,
+    on_section: Optional[Callable[[str, Any], None]] = None
 ) -> Dict[str, Any]:
     """
     Simplify entire analysis result
@@ -474,62 +690,37 @@ def simplify_full_analysis(
         analysis_result: Complete analysis results
         sections_to_simplify: List of sections to simplify (default: all)
         use_batch: Use batch processing (10-15x faster, default: True)
+        llm_router: Router to use, shared by all sections (default: get_shared_router())
+        max_concurrency: Sections simplified at the same time (default: ELI5_MAX_CONCURRENCY)
+        on_section: Called with (key, simplified value) as each section
+            completes, in completion order (e.g. to stream it)
 
     Returns:
         Analysis with simplified versions added
     """
     if sections_to_simplify is None:
-        sections_to_simplify = ['obligations', 'rights', 'risks', 'mitigations', 'about_summary']
+        sections_to_simplify = DEFAULT_SECTIONS
 
-    llm_router = LLMRouter()
+    llm_router = llm_router or get_shared_router()
     simplified_analysis = analysis_result.copy()
 
-    for section in sections_to_simplify:
-        if section not in analysis_result:
-            continue
-
-        section_data = analysis_result[section]
-
-        # Special handling for about_summary (string, not list)
-        if section == 'about_summary':
-            if isinstance(section_data, str):
-                try:
-                    simplified_analysis['about_summary_simplified'] = simplify_about_summary(
-                        section_data,
-                        llm_router
-                    )
-                    logger.info(f"Simplified about_summary text")
-                except Exception as e:
-                    logger.error(f"Failed to simplify about_summary: {e}", exc_info=True)
-            else:
-                logger.warning(f"about_summary is not a string: {type(section_data)}")
-            continue
+    sections = [section for section in sections_to_simplify if section in analysis_result]
+    if not sections:
+        return simplified_analysis
 
-        # Handle nested {content: [...]} structure
-        if isinstance(section_data, dict) and 'content' in section_data:
-            section_data = section_data['content']
-
-        # Now check if it's a list
-        if isinstance(section_data, list):
-            try:
-                # Use batch processing for 10-15x speedup
-                if use_batch:
-                    simplified_analysis[f'{section}_simplified'] = simplify_analysis_section_batch(
-                        section,
-                        section_data,
-                        llm_router
-                    )
-                    logger.info(f"Batch simplified {len(section_data)} items in {section} (1 LLM call)")
-                else:
-                    simplified_analysis[f'{section}_simplified'] = simplify_analysis_section(
-                        section,
-                        section_data,
-                        llm_router
-                    )
-                    logger.info(f"Simplified {len(section_data)} items in {section} ({len(section_data)} LLM calls)")
-            except Exception as e:
-                logger.error(f"Failed to simplify {section}: {e}", exc_info=True)
-        else:
-            logger.warning(f"Section {section} is not a list or doesn't have content: {type(section_data)}")
+    workers = max(1, min(len(sections), max_concurrency or ELI5_MAX_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eli5") as executor:
+        futures = [
+            executor.submit(_simplify_section, section, analysis_result[section], llm_router, use_batch)
+            for section in sections
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            key, value = result
+            simplified_analysis[key] = value
+            if on_section is not None:
+                on_section(key, value)
 
     return simplified_analysis
@@ -0,0 +1,244 @@
+"""
+Fake LLM provider for offline benchmarks and load tests
+Mimics the OpenAI/Groq SDK client shape and returns canned, schema-valid responses
+"""
+
+import os
+import json
+import random
+import threading
+from types import SimpleNamespace
+from typing import Dict, Any, Optional
+
+
+# Canned Step 1 response (matches prompts/preparation_en.txt output schema)
+FAKE_PREPARATION_RESULT: Dict[str, Any] = {
+    "agreement_type": "lease",
+    "agreement_subtype": "residential",
+    "user_role": "tenant",
+    "user_role_confidence": 0.9,
+    "parties": [
+        {"name": "[NAME_1]", "role": "landlord"},
+        {"name": "[NAME_2]", "role": "tenant"}
+    ],
+    "negotiability": "medium",
+    "negotiability_reason": "Standard residential lease with some negotiable terms",
+    "governing_language": "english",
+    "is_translation": False,
+    "has_original_attached": False,
+    "jurisdiction": "England and Wales",
+    "timezone_hint": "Europe/London",
+    "venue_court": None,
+    "version_status": "signed",
+    "has_signatures": True,
+    "effective_date": "2025-01-01",
+    "version_stamp": None,
+    "referenced_documents": ["Schedule 1"],
+    "key_dates": [
+        {"date": "2025-01-01", "event": "Lease starts"},
+        {"date": "2025-12-31", "event": "Lease ends"}
+    ],
+    "key_amounts": [
+        {"amount": "1,500 GBP", "type": "rent"},
+        {"amount": "3,000 GBP", "type": "deposit"}
+    ],
+    "term_start": "2025-01-01",
+    "term_end": "2025-12-31",
+    "auto_renewal": "Renews monthly unless either party gives 30 days notice"
+}
+
+# Canned Step 2 response (matches prompts/analysis_en.txt output schema)
+FAKE_ANALYSIS_RESULT: Dict[str, Any] = {
+    "about_summary": "You rent a flat for one year. You pay rent every month and must look after the flat.",
+    "payment_terms": {
+        "main_amount": "1,500 GBP per month",
+        "deposit_upfront": "3,000 GBP deposit",
+        "first_due_date": "2025-01-01",
+        "due_frequency": "Monthly on the 1st",
+        "end_date_renewal": "Ends 2025-12-31, then renews monthly",
+        "cancellation_notice": "30 days written notice",
+        "taxes_fees_note": "Taxes/fees not analyzed"
+    },
+    "obligations": [
+        {
+            "action": "Pay rent of 1,500 GBP",
+            "trigger": "Every month",
+            "time_window": "By the 1st of each month",
+            "consequence": "Late fee of 50 GBP",
+            "quote_original": "The Tenant shall pay the rent monthly in advance on the first day of each month.",
+            "quote_translated": "The Tenant shall pay the rent monthly in advance on the first day of each month."
+        },
+        {
+            "action": "Keep the property clean and in good repair",
+            "trigger": "During the whole term",
+            "time_window": "Ongoing",
+            "consequence": "Repair costs deducted from deposit",
+            "quote_original": "The Tenant shall keep the Property in good and clean condition.",
+            "quote_translated": "The Tenant shall keep the Property in good and clean condition."
+        }
+    ],
+    "rights": [
+        {
+            "right": "End the lease early",
+            "how_to_exercise": "Send written notice to the landlord",
+            "conditions": "30 days notice after the first 6 months",
+            "quote_original": "The Tenant may terminate this Agreement by giving 30 days written notice.",
+            "quote_translated": "The Tenant may terminate this Agreement by giving 30 days written notice."
+        }
+    ],
+    "risks": [
+        {
+            "level": "high",
+            "category": "termination",
+            "description": "Landlord can end the lease with only 14 days notice",
+            "recommendation": "Negotiate a 60-day notice period",
+            "is_hidden": True,
+            "quote_original": "The Landlord may terminate this Agreement on 14 days notice.",
+            "quote_translated": "The Landlord may terminate this Agreement on 14 days notice."
+        },
+        {
+            "level": "medium",
+            "category": "payment",
+            "description": "Rent can be increased without a cap",
+            "recommendation": "Request a cap on yearly increases",
+            "is_hidden": False,
+            "quote_original": "The Landlord may review the rent annually.",
+            "quote_translated": "The Landlord may review the rent annually."
+        }
+    ],
+    "gaps_anomalies": ["No clause on who pays for major repairs"],
+    "calendar": [
+        {"date_or_formula": "2025-01-01", "event": "First rent payment due"},
+        {"date_or_formula": "Monthly on 1st", "event": "Pay rent"},
+        {"date_or_formula": "2025-12-01", "event": "Last day to give notice before renewal"}
+    ],
+    "suggestions": [
+        {
+            "suggestion": "Ask for 60 days notice before the landlord can end the lease",
+            "quote_original": "The Landlord may terminate this Agreement on 14 days notice.",
+            "quote_translated": "The Landlord may terminate this Agreement on 14 days notice."
+        }
+    ],
+    "mitigations": [
+        {
+            "mitigation": "Take dated photos of the flat when you move in",
+            "quote_original": None,
+            "quote_translated": None
+        }
+    ],
+    "screening_result": "recommended_to_address",
+    "screening_reason": "Short landlord notice period should be negotiated"
+}
+
+# Opening of the combined Step 1 + Step 2 prompt (prompts/combined_en.txt)
+COMBINED_ANALYSIS_MARKER = "performing a COMBINED ANALYSIS"
+
+# Heading of the item list in ELI5 JSON batch prompts (see eli5_service.py)
+ELI5_BATCH_MARKER = "**Items to rephrase (JSON, item ID -> text):**"
+
+FAKE_SIMPLIFIED_TEXT = "You must do this on time. If you do not, you may have to pay extra."
+
+
+class _FakeCompletions:
+    """Implements client.chat.completions.create()"""
+
+    def __init__(self, client: "FakeLLMClient"):
+        self._client = client
+
+    def create(self, **kwargs) -> SimpleNamespace:
+        return self._client.complete(**kwargs)
+
+
+class FakeLLMClient:
+    """
+    Deterministic stand-in for the Groq/OpenAI SDK clients
+
+    Responses are picked from the prompt content:
+    - Combined prompt -> {"preparation": ..., "analysis": ...} of both
+    - Step 1 preparation prompt -> FAKE_PREPARATION_RESULT
+    - Step 2 analysis prompt -> FAKE_ANALYSIS_RESULT
+    - ELI5 JSON batch prompt -> {item ID: simplified text} for every item
+    - Anything else -> FAKE_SIMPLIFIED_TEXT
+
+    Latency is latency +/- uniform(jitter) seconds, drawn from a seeded RNG
+    so repeated benchmark runs see the same delay sequence.
+
+    Prompt caching is mimicked like the providers do it: a system message
+    seen before (by any client of the process) is reported as cached prompt
+    tokens in the usage metadata.
+    """
+
+    _seen_prefixes: set = set()
+    _seen_prefixes_lock = threading.Lock()
+
+    def __init__(
+        self,
+        latency: Optional[float] = None,
+        jitter: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency if latency is not None else float(os.getenv("FAKE_LLM_LATENCY", "0"))
+        self.jitter = jitter if jitter is not None else float(os.getenv("FAKE_LLM_JITTER", "0"))
+        self.seed = seed if seed is not None else int(os.getenv("FAKE_LLM_SEED", "42"))
+        self._rng = random.Random(self.seed)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+        self._closed = threading.Event()
+
+    def close(self) -> None:
+        """Like the SDK clients: in-flight requests fail, as their connections are closed"""
+        self._closed.set()
+
+    def _sleep(self) -> None:
+        delay = self.latency
+        if self.jitter:
+            delay += self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0 and self._closed.wait(delay):
+            raise ConnectionError("Connection closed")
+
+    def _respond(self, prompt: str, json_mode: bool) -> str:
+        if COMBINED_ANALYSIS_MARKER in prompt:
+            return json.dumps({"preparation": FAKE_PREPARATION_RESULT, "analysis": FAKE_ANALYSIS_RESULT})
+        if "Step 1: PREPARATION" in prompt:
+            return json.dumps(FAKE_PREPARATION_RESULT)
+        if "Step 2: TEXT ANALYSIS" in prompt:
+            return json.dumps(FAKE_ANALYSIS_RESULT)
+        if ELI5_BATCH_MARKER in prompt:
+            items = json.loads(prompt.split(ELI5_BATCH_MARKER, 1)[1])
+            return json.dumps({item_id: FAKE_SIMPLIFIED_TEXT for item_id in items})
+        if json_mode:
+            return json.dumps({"result": FAKE_SIMPLIFIED_TEXT})
+        return FAKE_SIMPLIFIED_TEXT
+
+    def complete(self, **kwargs) -> SimpleNamespace:
+        """Build an SDK-shaped chat completion response"""
+        if self._closed.is_set():
+            raise ConnectionError("Client is closed")
+        self.calls += 1
+        messages = kwargs.get("messages", [])
+        # The prompt type is told by the static prefix (system message), the items by the user message
+        prompt = "\n\n".join(m.get("content") or "" for m in messages)
+        json_mode = (kwargs.get("response_format") or {}).get("type") == "json_object"
+
+        self._sleep()
+        content = self._respond(prompt, json_mode)
+
+        prompt_chars = sum(len(m.get("content") or "") for m in messages)
+        cached_chars = 0
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+        if system:
+            with self._seen_prefixes_lock:
+                if system in self._seen_prefixes:
+                    cached_chars = len(system)
+                else:
+                    self._seen_prefixes.add(system)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_chars // 3,
+                completion_tokens=len(content) // 3,
+                total_tokens=(prompt_chars + len(content)) // 3,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=cached_chars // 3)
+            )
+        )
+
@@ -1,12 +1,24 @@
 """
 LLM Router - Provider-agnostic LLM interface
-Supports both Groq and OpenRouter APIs
+Supports Groq and OpenRouter APIs, plus an offline "fake" provider for benchmarks
+
+Prompt caching: a call's static prefix (instructions, schema, examples; the
+same for every call of a prompt type) is sent first, in the system message
+right after the system prompt, and the call-specific text last, in the user
+message. Providers that cache prompt prefixes (OpenAI-compatible automatic
+caching, Anthropic models via OpenRouter with an explicit cache breakpoint)
+then only process the dynamic part anew. Cached prompt tokens reported in
+the usage metadata are counted in usage_stats(), summed over all processes
+(the LLM calls run on the Celery workers) when Redis is available.
 """
 
 import os
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, Optional, Any
 import json
 import logging
+import re
+import threading
+import time
 
 # Try importing both clients
 try:
@@ -21,9 +33,179 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+from ..shared_counters import shared_counters
+from .fake_provider import FakeLLMClient
+from .token_budget import context_window, count_tokens, prompt_budget, truncate_to_tokens
+
 logger = logging.getLogger(__name__)
 
 
+# Completion tokens reserved per call unless the caller passes max_tokens
+DEFAULT_MAX_TOKENS = 8000
+
+
+class LLMCallCancelled(Exception):
+    """The caller no longer wants the result (see LLMRouter cancel_check)"""
+
+
+# (remaining, limit) response headers; Groq and OpenAI send the first two
+# pairs, OpenRouter the last
+_RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-remaining-requests", "x-ratelimit-limit-requests"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-limit-tokens"),
+    ("x-ratelimit-remaining", "x-ratelimit-limit"),
+)
+_TOKENS_REMAINING_HEADER = "x-ratelimit-remaining-tokens"
+# Time until the token window resets, e.g. "7.66s" or "1m30s" (Groq, OpenAI)
+_TOKENS_RESET_HEADER = "x-ratelimit-reset-tokens"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+# Rate-limit headroom seen in the latest response of this process
+_rate_limit = {"headroom": None, "remaining_tokens": None, "tokens_reset_at": None, "updated": 0.0}
+_rate_limit_lock = threading.Lock()
+
+# Longest wait for the provider's token window before a call (seconds)
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "60"))
+
+
+def _parse_duration(value) -> Optional[float]:
+    """Seconds of a rate-limit reset header ("7.66s", "1m30s", "250ms"); None if unparsable"""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _record_rate_limit(headers) -> None:
+    fractions = []
+    remaining_tokens = None
+    for remaining_header, limit_header in _RATE_LIMIT_HEADERS:
+        try:
+            remaining = float(headers.get(remaining_header))
+            limit = float(headers.get(limit_header))
+        except (TypeError, ValueError):
+            continue
+        if limit > 0:
+            fractions.append(min(1.0, max(0.0, remaining / limit)))
+        if remaining_header == _TOKENS_REMAINING_HEADER:
+            remaining_tokens = int(remaining)
+    if fractions:
+        reset = _parse_duration(headers.get(_TOKENS_RESET_HEADER))
+        now = time.monotonic()
+        with _rate_limit_lock:
+            _rate_limit["headroom"] = min(fractions)
+            _rate_limit["remaining_tokens"] = remaining_tokens
+            _rate_limit["tokens_reset_at"] = now + reset if reset is not None else None
+            _rate_limit["updated"] = now
+
+
+def rate_limit_headroom(max_age: float = 60.0) -> Optional[float]:
+    """
+    Fraction of the provider's rate limit left (0..1), from the rate-limit
+    headers of the latest LLM response in this process
+
+    Returns:
+        None if no response reported it within max_age seconds
+    """
+    with _rate_limit_lock:
+        if _rate_limit["headroom"] is None or time.monotonic() - _rate_limit["updated"] > max_age:
+            return None
+        return _rate_limit["headroom"]
+
+
+def rate_limit_remaining_tokens(max_age: float = 60.0) -> Optional[int]:
+    """
+    Tokens left in the provider's current rate-limit window, from the
+    headers of the latest LLM response in this process (Groq and OpenAI
+    report them)
+
+    Returns:
+        None if no response reported it within max_age seconds
+    """
+    with _rate_limit_lock:
+        if _rate_limit["remaining_tokens"] is None or time.monotonic() - _rate_limit["updated"] > max_age:
+            return None
+        return _rate_limit["remaining_tokens"]
+
+
+def rate_limit_wait(required_tokens: int, max_age: float = 60.0) -> float:
+    """
+    Seconds until the provider's token window has room for required_tokens,
+    judging by the latest response of this process
+
+    Returns:
+        0 if it has room, or nothing recent was reported. Without a reset
+        header, the time until the reading is max_age old.
+    """
+    with _rate_limit_lock:
+        remaining = _rate_limit["remaining_tokens"]
+        now = time.monotonic()
+        if remaining is None or now - _rate_limit["updated"] > max_age or remaining >= required_tokens:
+            return 0.0
+        if _rate_limit["tokens_reset_at"] is not None:
+            return max(0.0, _rate_limit["tokens_reset_at"] - now)
+        return max(0.0, _rate_limit["updated"] + max_age - now)
+
+
+# Token usage of this process's LLM calls, and of all processes' (Redis)
+_usage = {"calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+_usage_lock = threading.Lock()
+_shared_usage = shared_counters("llm_usage")
+
+# OpenRouter models that only cache prompts up to an explicit cache_control breakpoint
+_CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/",)
+
+
+def _usage_value(obj, name: str) -> int:
+    value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+    return value if isinstance(value, int) else 0
+
+
+def _cached_prompt_tokens(usage) -> int:
+    """Cached prompt tokens, as OpenAI/OpenRouter/Groq report them (0 if not reported)"""
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    if details is None:
+        return 0
+    return _usage_value(details, "cached_tokens")
+
+
+def _record_usage(usage) -> str:
+    """Add a response's usage to usage_stats(); returns it for logging"""
+    if usage is None:
+        return "usage not reported"
+    prompt_tokens = _usage_value(usage, "prompt_tokens")
+    cached = _cached_prompt_tokens(usage)
+    completion_tokens = _usage_value(usage, "completion_tokens")
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["prompt_tokens"] += prompt_tokens
+        _usage["cached_prompt_tokens"] += cached
+        _usage["completion_tokens"] += completion_tokens
+    _shared_usage.incr(
+        calls=1, prompt_tokens=prompt_tokens, cached_prompt_tokens=cached, completion_tokens=completion_tokens
+    )
+    return f"prompt tokens: {prompt_tokens} (cached: {cached}), completion tokens: {completion_tokens}"
+
+
+def usage_stats() -> Dict[str, Any]:
+    """Token usage of the LLM calls of all processes (this process's without Redis)"""
+    shared = _shared_usage.read()
+    if shared is not None:
+        stats: Dict[str, Any] = {name: shared.get(name, 0) for name in _usage}
+        stats["scope"] = "all processes"
+    else:
+        with _usage_lock:
+            stats = dict(_usage)
+        stats["scope"] = "this process"
+    stats["cached_prompt_ratio"] = (
+        round(stats["cached_prompt_tokens"] / stats["prompt_tokens"], 4) if stats["prompt_tokens"] else 0.0
+    )
+    return stats
+
+
 class LLMRouter:
     """
     Router for LLM API calls
@@ -35,17 +217,24 @@ class LLMRouter:
         api_key: Optional[str] = None,
         provider: Optional[str] = None,
         model: Optional[str] = None,
-        timeout: Optional[float] = None
+        timeout: Optional[float] = None,
+        cancel_check: Optional[Callable[[], bool]] = None
     ):
         """
         Initialize LLM router
 
         Args:
             api_key: API key (reads from env if not provided)
-            provider: 'groq' or 'openrouter' (auto-detects from env if not provided)
+            provider: 'groq', 'openrouter' or 'fake' (auto-detects from env if not provided)
             model: Model name (uses default from constants if not provided)
             timeout: Request timeout in seconds (default: 120s)
+            cancel_check: Returns True once the work was cancelled; checked
+                before each call (raising LLMCallCancelled). abort() stops
+                calls already in flight.
         """
+        self.cancel_check = cancel_check
+        self._aborted = False
+
         # Determine provider
         self.provider = provider or os.getenv("LLM_PROVIDER", "openrouter")
         self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", "120"))
@@ -84,8 +273,18 @@ class LLMRouter:
             self.model = model or os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.1-70b-instruct")
             logger.info(f"Using OpenRouter with model: {self.model}")
 
+        elif self.provider == "fake":
+            # Offline provider: canned responses with configurable latency
+            # (FAKE_LLM_LATENCY, FAKE_LLM_JITTER, FAKE_LLM_SEED)
+            self.api_key = api_key or "fake"
+            self.client = FakeLLMClient()
+            self.model = model or "fake-llm"
+            logger.info(
+                f"Using fake LLM provider (latency: {self.client.latency}s, jitter: {self.client.jitter}s)"
+            )
+
         else:
-            raise ValueError(f"Unknown provider: {self.provider}. Use 'groq' or 'openrouter'")
+            raise ValueError(f"Unknown provider: {self.provider}. Use 'groq', 'openrouter' or 'fake'")
 
     def call(
         self,
@@ -93,27 +292,39 @@ class LLMRouter:
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        json_mode: bool = False
+        json_mode: bool = False,
+        prefix: Optional[str] = None
     ) -> str:
         """
         Make LLM API call
 
         Args:
-            prompt: User prompt
+            prompt: User prompt (the call-specific part)
             system_prompt: System prompt (optional)
             temperature: Sampling temperature (default 0.1)
-            max_tokens: Max tokens to generate (default 8000)
+            max_tokens: Max tokens to generate (default DEFAULT_MAX_TOKENS)
             json_mode: Whether to request JSON output
+            prefix: Static instructions shared by every call of this prompt
+                type, sent before the prompt so providers can cache them
 
         Returns:
             LLM response text
+
+        Raises:
+            LLMCallCancelled: If cancel_check reports a cancellation
         """
+        self.raise_if_cancelled()
+
         messages = []
 
-        if system_prompt:
+        # Static parts first, in one system message: the cacheable prefix
+        system_content = "\n\n".join(part for part in (system_prompt, prefix) if part)
+        if system_content:
+            if prefix and self.provider == "openrouter" and self.model.startswith(_CACHE_CONTROL_MODEL_PREFIXES):
+                system_content = [{"type": "text", "text": system_content, "cache_control": {"type": "ephemeral"}}]
             messages.append({
                 "role": "system",
-                "content": system_prompt
+                "content": system_content
             })
 
         messages.append({
@@ -125,7 +336,7 @@ class LLMRouter:
             "model": self.model,
             "messages": messages,
             "temperature": temperature or 0.1,
-            "max_tokens": max_tokens or 8000,
+            "max_tokens": max_tokens or DEFAULT_MAX_TOKENS,
         }
 
         # Add provider-specific parameters
@@ -144,10 +355,22 @@ class LLMRouter:
                 "X-Title": "Legally AI Contract Analysis"
             }
 
+        elif self.provider == "fake":
+            if json_mode:
+                kwargs["response_format"] = {"type": "json_object"}
+
         try:
             logger.info(f"Making LLM call to {self.provider} with model {self.model}")
-            response = self.client.chat.completions.create(**kwargs)
-            logger.info(f"LLM call successful, response length: {len(response.choices[0].message.content)} chars")
+            completions = self.client.chat.completions
+            if hasattr(completions, "with_raw_response"):
+                # Same call, but with the HTTP headers (rate-limit headroom)
+                raw_response = completions.with_raw_response.create(**kwargs)
+                _record_rate_limit(raw_response.headers)
+                response = raw_response.parse()
+            else:
+                response = completions.create(**kwargs)
+            usage = _record_usage(getattr(response, "usage", None))
+            logger.info(f"LLM call successful, response length: {len(response.choices[0].message.content)} chars, {usage}")
             return response.choices[0].message.content
 
         except TimeoutError as e:
@@ -157,6 +380,10 @@ class LLMRouter:
                 f"The AI service may be experiencing high load. Please try again in a few moments."
             )
         except Exception as e:
+            if self._aborted:
+                # abort() closed the client under this call
+                raise LLMCallCancelled(f"LLM call cancelled ({self.provider})") from e
+
             error_msg = str(e)
             logger.error(f"LLM API call failed ({self.provider}): {error_msg}")
 
@@ -179,10 +406,38 @@ class LLMRouter:
             else:
                 raise RuntimeError(f"LLM API call failed ({self.provider}): {error_msg}")
 
+    def raise_if_cancelled(self) -> None:
+        """Raise LLMCallCancelled if the work was cancelled"""
+        if self._aborted or (self.cancel_check is not None and self.cancel_check()):
+            raise LLMCallCancelled("LLM call cancelled")
+
+    def abort(self) -> None:
+        """
+        Cancel calls in flight (from another thread)
+
+        Closes the SDK client, which closes its connections: pending requests
+        fail and are reported as LLMCallCancelled. The router is unusable
+        afterwards.
+        """
+        self._aborted = True
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f"Closing LLM client failed: {e}")
+
+    @property
+    def aborted(self) -> bool:
+        """True once abort() was called"""
+        return self._aborted
+
     def call_with_json(
         self,
         prompt: str,
-        system_prompt: Optional[str] = None
+        system_prompt: Optional[str] = None,
+        on_response: Optional[Callable[[str], None]] = None,
+        prefix: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Make LLM call expecting JSON response
@@ -190,6 +445,9 @@ class LLMRouter:
         Args:
             prompt: User prompt (should request JSON output)
             system_prompt: System prompt
+            on_response: Called with the raw response text before parsing
+                (used to checkpoint it)
+            prefix: Static instructions (see call())
 
         Returns:
             Parsed JSON dict
@@ -197,8 +455,11 @@ class LLMRouter:
         response_text = self.call(
             prompt=prompt,
             system_prompt=system_prompt,
-            json_mode=True
+            json_mode=True,
+            prefix=prefix
         )
+        if on_response is not None:
+            on_response(response_text)
 
         try:
             return json.loads(response_text)
@@ -207,17 +468,60 @@ class LLMRouter:
 
     def estimate_tokens(self, text: str) -> int:
         """
-        Rough estimate of token count
+        Token count of a text for this router's model
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Token count (tokenizer-based, or a character-ratio estimate, see token_budget)
+        """
+        return count_tokens(text, self.model)
+
+    def wait_for_rate_limit(self, *prompt_parts: str, max_wait: Optional[float] = None) -> None:
+        """
+        Back off until the provider's token window has room for a prompt
+
+        Waits at most max_wait (default LLM_RATE_LIMIT_MAX_WAIT) seconds,
+        then lets the call go ahead; checks for a cancellation every second.
 
         Args:
-            text: Text to estimate
+            *prompt_parts: Everything the call sends (system prompt, prefix, prompt)
+        """
+        required = sum(count_tokens(part, self.model) for part in prompt_parts if part)
+        deadline = time.monotonic() + (LLM_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait)
+        wait = rate_limit_wait(required)
+        if wait <= 0:
+            return
+        logger.info(f"Rate-limit token window too small for {required} prompt tokens, waiting up to {wait:.1f}s")
+        while wait > 0 and time.monotonic() < deadline:
+            self.raise_if_cancelled()
+            time.sleep(min(1.0, wait, max(0.0, deadline - time.monotonic())))
+            wait = rate_limit_wait(required)
+
+    def fit_text(self, text: str, *fixed_parts: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Truncate the variable text of a prompt to the model's prompt budget
+        (see token_budget.prompt_budget, capped by LLM_MAX_PROMPT_TOKENS)
+
+        Args:
+            text: Variable text (contract text)
+            *fixed_parts: Everything else sent with it (system prompt,
+                static prefix, the prompt without the text)
+            max_tokens: Completion tokens the call reserves (default DEFAULT_MAX_TOKENS)
 
         Returns:
-            Estimated token count
+            The text, or its longest prefix that fits
         """
-        # Very rough estimate: 1 token ≈ 4 characters for English
-        # Slightly more for Cyrillic/other scripts
-        return len(text) // 3
+        budget = prompt_budget(self.model, max_tokens or DEFAULT_MAX_TOKENS)
+        budget -= sum(count_tokens(part, self.model) for part in fixed_parts)
+        fitted = truncate_to_tokens(text, budget, self.model)
+        if len(fitted) < len(text):
+            logger.warning(
+                f"Text truncated to {len(fitted)} of {len(text)} characters ({budget} tokens) "
+                f"to fit the prompt budget of {self.model} (context window: {context_window(self.model)} tokens)"
+            )
+        return fitted
 
 
 def test_llm_connection(api_key: Optional[str] = None, provider: Optional[str] = None) -> bool:
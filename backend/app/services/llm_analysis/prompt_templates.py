@@ -0,0 +1,159 @@
+"""
+Prompt Templates
+Templates of prompts/ read and compiled once, at import
+
+A template is split once into its literal parts and {placeholder} names, so
+a prompt is assembled with a single join instead of one str.replace() pass
+per placeholder over the whole prompt (contract text included). Values are
+inserted verbatim: a "{user_role}" inside the contract text stays as it is.
+
+Templates are split by a DYNAMIC_MARKER line into a static prefix
+(instructions, schema, examples: no placeholders) and the dynamic suffix
+(contract text and other per-call values). The router sends the static
+prefix first, identical for every call of a prompt type, so the providers'
+prompt (prefix) caching can reuse it; render() fills in the dynamic suffix.
+
+Each template has a version (hash of its text); prompt_version() combines
+them, for caches of LLM output to key on. With PROMPT_HOT_RELOAD (default:
+DEBUG), templates whose file changed are recompiled on the next lookup.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+PROMPT_HOT_RELOAD = os.getenv("PROMPT_HOT_RELOAD", os.getenv("DEBUG", "false")).lower() == "true"
+
+# {name}: lowercase identifiers only, so JSON examples in templates are left alone
+_PLACEHOLDER = re.compile(r"\{([a-z_]+)\}")
+
+# Line separating the static prefix from the dynamic suffix
+DYNAMIC_MARKER = "=== DYNAMIC ==="
+
+
+class PromptTemplate:
+    """
+    Usage:
+        template = PromptTemplate("analysis", text)
+        llm_router.call(
+            prompt=template.render(contract_text=..., user_role=...),
+            prefix=template.static_prefix
+        )
+        template.placeholders, template.version
+    """
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+        static, marker, dynamic = text.partition(DYNAMIC_MARKER)
+        if not marker:
+            static, dynamic = "", text
+        self.static_prefix = static.strip()
+        # Left by partial() templates until filled in; render() refuses them
+        self._static_placeholders = frozenset(_PLACEHOLDER.findall(self.static_prefix))
+
+        # [literal, name, literal, name, ..., literal]
+        parts = _PLACEHOLDER.split(dynamic.strip())
+        self._literals: List[str] = parts[0::2]
+        self._names: List[str] = parts[1::2]
+        self.placeholders: FrozenSet[str] = frozenset(self._names)
+
+    def render(self, **values: str) -> str:
+        """
+        Dynamic suffix with every placeholder filled in
+
+        Raises:
+            KeyError: A placeholder has no value
+            ValueError: The static prefix has placeholders
+        """
+        if self._static_placeholders:
+            raise ValueError(
+                f"Prompt template {self.name} has placeholders in its static prefix: "
+                f"{', '.join(sorted(self._static_placeholders))}"
+            )
+        missing = self.placeholders.difference(values)
+        if missing:
+            raise KeyError(f"Prompt template {self.name} needs {', '.join(sorted(missing))}")
+        pieces = [self._literals[0]]
+        for name, literal in zip(self._names, self._literals[1:]):
+            pieces.append(values[name])
+            pieces.append(literal)
+        return "".join(pieces)
+
+    def partial(self, **values: str) -> "PromptTemplate":
+        """Template with some placeholders filled in, static prefix included (the others are kept)"""
+        text = _PLACEHOLDER.sub(lambda match: values.get(match.group(1), match.group(0)), self.text)
+        return PromptTemplate(self.name, text)
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({self.name!r}, version={self.version!r})"
+
+
+# file name -> (mtime, compiled template)
+_templates: Dict[str, Tuple[float, PromptTemplate]] = {}
+_lock = threading.Lock()
+
+
+def _template_file(prompt_type: str, language: str) -> Path:
+    # For prototype, start with English only
+    # Can add other languages later
+    return PROMPTS_DIR / f"{prompt_type}_en.txt"
+
+
+def _compile(path: Path) -> Tuple[float, PromptTemplate]:
+    return path.stat().st_mtime, PromptTemplate(path.stem, path.read_text())
+
+
+def _load_all() -> None:
+    for path in sorted(PROMPTS_DIR.glob("*.txt")):
+        _templates[path.name] = _compile(path)
+
+
+def get_prompt_template(prompt_type: str, language: str = "english") -> PromptTemplate:
+    """
+    Compiled template for a prompt type ("preparation", "analysis", "combined")
+
+    Raises:
+        FileNotFoundError: No such template
+    """
+    path = _template_file(prompt_type, language)
+    entry = _templates.get(path.name)
+
+    if entry is not None and PROMPT_HOT_RELOAD:
+        try:
+            changed = path.stat().st_mtime != entry[0]
+        except FileNotFoundError:
+            changed = False
+        if changed:
+            with _lock:
+                entry = _compile(path)
+                _templates[path.name] = entry
+            logger.info(f"Prompt template {path.name} reloaded (version {entry[1].version})")
+
+    if entry is None:
+        if not path.exists():
+            raise FileNotFoundError(f"Prompt template not found: {path}")
+        with _lock:
+            entry = _compile(path)
+            _templates[path.name] = entry
+
+    return entry[1]
+
+
+def prompt_version() -> str:
+    """Hash of the versions of all file templates, for keying cached LLM output"""
+    versions = sorted(f"{name}:{template.version}" for name, (_, template) in _templates.items())
+    return hashlib.sha256("\n".join(versions).encode("utf-8")).hexdigest()[:12]
+
+
+_load_all()
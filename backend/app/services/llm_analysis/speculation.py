@@ -0,0 +1,206 @@
+"""
+Speculative Step 2
+Starts Step 2 from guessed Step 1 fields, while Step 1 is still running
+
+Step 2 only uses a handful of Step 1 fields (SPECULATED_FIELDS, plus quality
+and coverage, which are known before Step 1). When they can be guessed - from
+the Step 1 result of an earlier analysis of the same text, or from keyword
+heuristics - Step 2 is sent at the same time as Step 1. Once Step 1 returns,
+the speculative result is kept if the guesses hold (or differ only in ways
+Step 2 doesn't act on); otherwise it is discarded and Step 2 is re-issued
+with the real Step 1 data.
+"""
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .llm_router import LLMRouter
+from .step1_preparation import assess_negotiability_from_text, run_step1_heuristics
+from .step2_analysis import run_step2_analysis
+
+logger = logging.getLogger(__name__)
+
+# Step 1 fields the Step 2 prompt depends on
+SPECULATED_FIELDS = ("agreement_type", "user_role", "negotiability", "detected_jurisdiction", "governing_language")
+
+# agreement_type of the Step 1 schema -> (user role, keywords)
+# Only types with an obvious user role: for the others (NDA, vendor,
+# partnership) the role depends on which side uploaded the contract.
+AGREEMENT_KEYWORDS = {
+    "lease": ("tenant", ("lease", "tenancy", "landlord", "tenant", "rent", "premises")),
+    "employment": ("employee", ("employment", "employer", "employee", "salary", "probation")),
+    "tos": ("customer", ("terms of service", "terms of use", "by clicking", "by accessing", "end user")),
+    "freelance": ("contractor", ("independent contractor", "freelance", "statement of work", "deliverables")),
+}
+
+# Keyword hits the best agreement type needs to be guessed at all
+MIN_KEYWORD_HITS = 3
+
+
+def guess_agreement_type(text: str) -> Optional[str]:
+    """
+    Guess agreement_type from keyword counts
+
+    Returns:
+        Key of AGREEMENT_KEYWORDS, or None if no type clearly dominates
+    """
+    text_lower = text.lower()
+    hits = {
+        agreement_type: sum(len(re.findall(rf"\b{re.escape(keyword)}\b", text_lower)) for keyword in keywords)
+        for agreement_type, (_, keywords) in AGREEMENT_KEYWORDS.items()
+    }
+    ranked = sorted(hits.items(), key=lambda item: item[1], reverse=True)
+    best_type, best_hits = ranked[0]
+    if best_hits < MIN_KEYWORD_HITS or best_hits == ranked[1][1]:
+        return None
+    return best_type
+
+
+def guess_preparation_data(
+    contract_text: str,
+    detected_language: str,
+    quality_score: float,
+    previous: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Guess the Step 1 data Step 2 needs
+
+    Args:
+        contract_text: Redacted contract text
+        detected_language: Detected language from language detection
+        quality_score: Quality score from the prepare stage
+        previous: Step 1 result of an earlier analysis of the same text
+
+    Returns:
+        preparation_data for run_step2_analysis, or None if there is no
+        confident guess
+    """
+    heuristics = run_step1_heuristics(contract_text, detected_language)
+    guesses = {
+        "detected_jurisdiction": heuristics["jurisdiction"],
+        "quality_score": quality_score,
+        "coverage_score": heuristics["coverage"],
+        # The real value comes from the Step 1 LLM response
+        "governing_language": heuristics["governing_language"]["governing_language"],
+    }
+
+    if previous and not previous.get("error") and all(previous.get(field) for field in ("agreement_type", "user_role")):
+        return {
+            **guesses,
+            "governing_language": previous.get("governing_language", "unknown"),
+            "agreement_type": previous["agreement_type"],
+            "user_role": previous["user_role"],
+            "negotiability": previous.get("negotiability", "medium"),
+        }
+
+    agreement_type = guess_agreement_type(contract_text)
+    if agreement_type is None:
+        return None
+    negotiability, _ = assess_negotiability_from_text(contract_text, agreement_type)
+    return {
+        **guesses,
+        "agreement_type": agreement_type,
+        "user_role": AGREEMENT_KEYWORDS[agreement_type][0],
+        "negotiability": negotiability,
+    }
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"[^a-z]+", " ", str(value or "").lower()).strip()
+
+
+def guesses_hold(guesses: Dict[str, Any], preparation_data: Dict[str, Any]) -> bool:
+    """
+    Whether a Step 2 result computed from guesses is valid for the real Step 1 data
+
+    Differences Step 2 doesn't act on are tolerated: a user role that
+    contains the other ("tenant" / "residential tenant"), and medium vs high
+    negotiability (Step 2 only distinguishes low from the rest, for
+    suggestions).
+    """
+    if preparation_data.get("error"):
+        return False
+
+    if _normalize(guesses.get("agreement_type")) != _normalize(preparation_data.get("agreement_type")):
+        return False
+
+    guessed_role = _normalize(guesses.get("user_role"))
+    actual_role = _normalize(preparation_data.get("user_role"))
+    if not guessed_role or not actual_role or (guessed_role not in actual_role and actual_role not in guessed_role):
+        return False
+
+    guessed_low = _normalize(guesses.get("negotiability")) == "low"
+    actual_low = _normalize(preparation_data.get("negotiability", "medium")) == "low"
+    if guessed_low != actual_low:
+        return False
+
+    # Printed into the Step 2 prompt as is ("unknown" if missing)
+    if _normalize(guesses.get("governing_language", "unknown")) != _normalize(preparation_data.get("governing_language", "unknown")):
+        return False
+
+    return guesses.get("detected_jurisdiction") == preparation_data.get("detected_jurisdiction")
+
+
+class SpeculativeStep2:
+    """
+    Step 2 running in the background on guessed preparation data
+
+    Usage:
+        speculation = SpeculativeStep2(text, guesses, llm_router, "english")
+        ... run Step 1 ...
+        if speculation.holds(preparation_data):
+            result = speculation.adopt(speculation.future.result(), preparation_data)
+        else:
+            speculation.discard()
+    """
+
+    def __init__(
+        self,
+        contract_text: str,
+        guesses: Dict[str, Any],
+        llm_router: LLMRouter,
+        output_language: str = "english"
+    ):
+        self.guesses = guesses
+        self.llm_router = llm_router
+        self.raw_response: Optional[str] = None
+        self.discarded = False
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="step2-speculative")
+        self.future = executor.submit(
+            run_step2_analysis,
+            contract_text=contract_text,
+            preparation_data=guesses,
+            llm_router=llm_router,
+            output_language=output_language,
+            on_response=self._keep_raw_response
+        )
+        executor.shutdown(wait=False)
+
+    def _keep_raw_response(self, text: str) -> None:
+        self.raw_response = text
+
+    def holds(self, preparation_data: Dict[str, Any]) -> bool:
+        return guesses_hold(self.guesses, preparation_data)
+
+    def adopt(self, result: Dict[str, Any], preparation_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Step 2 result with the metadata of the real Step 1 data"""
+        return {
+            **result,
+            "agreement_type": preparation_data.get("agreement_type"),
+            "user_role": preparation_data.get("user_role"),
+            "negotiability": preparation_data.get("negotiability")
+        }
+
+    def discard(self) -> None:
+        """
+        Drop the speculative call
+
+        Aborts it if it is still in flight, which also makes llm_router
+        unusable (see LLMRouter.abort).
+        """
+        self.discarded = True
+        if not self.future.done():
+            self.llm_router.abort()
@@ -1,12 +1,19 @@
 """
 Step 1: Preparation Analysis
 Extracts metadata, detects document type, assesses quality
+
+Step 1 is a small dependency graph: the LLM call only needs the prompt, and
+the local heuristics (structure, governing language, jurisdiction,
+referenced documents) only need the text. The LLM request is sent first and
+the heuristics run while it is in flight; both are merged once the response
+arrives, so the heuristics add no wall-clock time.
 """
 
 import os
-from typing import Dict, Any
-from pathlib import Path
-from .llm_router import LLMRouter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+from .llm_router import LLMRouter, LLMCallCancelled
+from .prompt_templates import get_prompt_template
 from .parsers import detect_structure
 from .language import detect_governing_language, detect_jurisdiction, estimate_timezone
 from .quality import compute_coverage_score
@@ -21,16 +28,9 @@ def load_prompt_template(language: str, prompt_type: str = "preparation") -> str
         prompt_type: "preparation" or "analysis"
 
     Returns:
-        Prompt template string
+        Prompt template string (see get_prompt_template for the compiled template)
     """
-    # For prototype, start with English only
-    # Can add other languages later
-    prompt_file = Path(__file__).parent / "prompts" / f"{prompt_type}_en.txt"
-
-    if not prompt_file.exists():
-        raise FileNotFoundError(f"Prompt template not found: {prompt_file}")
-
-    return prompt_file.read_text()
+    return get_prompt_template(prompt_type, language).text
 
 
 def extract_referenced_documents(text: str) -> list:
@@ -63,55 +63,55 @@ def extract_referenced_documents(text: str) -> list:
     return list(referenced)
 
 
-def run_step1_preparation(
-    contract_text: str,
-    detected_language: str,
-    quality_score: float,
-    llm_router: LLMRouter
-) -> Dict[str, Any]:
+def run_step1_heuristics(contract_text: str, detected_language: str) -> Dict[str, Any]:
     """
-    Run Step 1: Preparation analysis
+    Local (non-LLM) part of Step 1
 
     Args:
         contract_text: Extracted contract text
         detected_language: Detected language from language detection
-        quality_score: Quality score from document parser
-        llm_router: LLM router instance
 
     Returns:
-        Dictionary with Step 1 analysis results
+        Dict with structure, governing_language, jurisdiction, timezone,
+        referenced_documents and coverage
     """
-    # Load prompt template
-    prompt_template = load_prompt_template(detected_language, "preparation")
-
-    # Fill in the contract text
-    prompt = prompt_template.replace("{contract_text}", contract_text[:15000])  # Limit to ~15k chars
-
-    # Call LLM
-    try:
-        result = llm_router.call_with_json(
-            prompt=prompt,
-            system_prompt="You are a legal document analyst. Extract information accurately and return valid JSON."
-        )
-    except Exception as e:
-        raise RuntimeError(f"Step 1 analysis failed: {str(e)}")
-
-    # Detect document structure
-    structure = detect_structure(contract_text)
+    jurisdiction = detect_jurisdiction(contract_text)
+    referenced_docs = extract_referenced_documents(contract_text)
+    return {
+        "structure": detect_structure(contract_text),
+        "governing_language": detect_governing_language(contract_text, detected_language),
+        "jurisdiction": jurisdiction,
+        "timezone": estimate_timezone(jurisdiction),
+        "referenced_documents": referenced_docs,
+        # For prototype testing, assume annexes are not critical. In production,
+        # this would check if referenced documents were uploaded
+        "coverage": 1.0 if len(referenced_docs) <= 5 else 0.5,  # Don't penalize reasonable annex references
+    }
 
-    # Detect governing language info
-    gov_lang_info = detect_governing_language(contract_text, detected_language)
 
-    # Detect jurisdiction
-    jurisdiction = detect_jurisdiction(contract_text)
-    timezone = estimate_timezone(jurisdiction)
+def build_preparation_data(
+    result: Dict[str, Any],
+    heuristics: Dict[str, Any],
+    detected_language: str,
+    quality_score: float
+) -> Dict[str, Any]:
+    """
+    Merge the Step 1 LLM extraction with the local heuristics
 
-    # Extract referenced documents
-    referenced_docs = extract_referenced_documents(contract_text)
+    Args:
+        result: Parsed Step 1 LLM response
+        heuristics: run_step1_heuristics() output
+        detected_language: Detected language from language detection
+        quality_score: Quality score from document parser
 
-    # Compute coverage (for prototype testing, assume annexes are not critical)
-    # In production, this would check if referenced documents were uploaded
-    coverage = 1.0 if len(referenced_docs) <= 5 else 0.5  # Don't penalize reasonable annex references
+    Returns:
+        Dictionary with Step 1 analysis results
+    """
+    structure = heuristics["structure"]
+    gov_lang_info = heuristics["governing_language"]
+    jurisdiction = heuristics["jurisdiction"]
+    timezone = heuristics["timezone"]
+    coverage = heuristics["coverage"]
 
     # Merge all data
     preparation_data = {
@@ -132,6 +132,57 @@ def run_step1_preparation(
     return preparation_data
 
 
+def run_step1_preparation(
+    contract_text: str,
+    detected_language: str,
+    quality_score: float,
+    llm_router: LLMRouter,
+    on_response: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run Step 1: Preparation analysis
+
+    Args:
+        contract_text: Extracted contract text
+        detected_language: Detected language from language detection
+        quality_score: Quality score from document parser
+        llm_router: LLM router instance
+        on_response: Receives the raw LLM response (for checkpointing)
+
+    Returns:
+        Dictionary with Step 1 analysis results
+    """
+    template = get_prompt_template("preparation", detected_language)
+    system_prompt = "You are a legal document analyst. Extract information accurately and return valid JSON."
+    # As much of the contract as the model's context window leaves room for
+    prompt = template.render(contract_text=llm_router.fit_text(
+        contract_text, system_prompt, template.static_prefix, template.render(contract_text="")
+    ))
+    # Stay within the provider's tokens-per-minute window
+    llm_router.wait_for_rate_limit(system_prompt, template.static_prefix, prompt)
+
+    # Send the LLM request first, run the local heuristics while it is in flight
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="step1-llm") as executor:
+        llm_future = executor.submit(
+            llm_router.call_with_json,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            prefix=template.static_prefix,
+            on_response=on_response
+        )
+
+        heuristics = run_step1_heuristics(contract_text, detected_language)
+
+        try:
+            result = llm_future.result()
+        except LLMCallCancelled:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Step 1 analysis failed: {str(e)}")
+
+    return build_preparation_data(result, heuristics, detected_language, quality_score)
+
+
 def assess_negotiability_from_text(text: str, agreement_type: str) -> tuple:
     """
     Simple heuristic-based negotiability assessment
@@ -3,16 +3,17 @@ Step 2: Text Analysis
 Extracts obligations, rights, risks, and generates recommendations
 """
 
-from typing import Dict, Any
-from .llm_router import LLMRouter
-from .step1_preparation import load_prompt_template
+from typing import Callable, Dict, Any, Optional
+from .llm_router import LLMRouter, LLMCallCancelled
+from .prompt_templates import get_prompt_template
 
 
 def run_step2_analysis(
     contract_text: str,
     preparation_data: Dict[str, Any],
     llm_router: LLMRouter,
-    output_language: str = "english"
+    output_language: str = "english",
+    on_response: Optional[Callable[[str], None]] = None
 ) -> Dict[str, Any]:
     """
     Run Step 2: Text Analysis
@@ -22,13 +23,11 @@ def run_step2_analysis(
         preparation_data: Results from Step 1
         llm_router: LLM router instance
         output_language: Language for output (e.g., "english", "russian", "serbian")
+        on_response: Receives the raw LLM response (for checkpointing)
 
     Returns:
         Dictionary with Step 2 analysis results
     """
-    # Load prompt template
-    prompt_template = load_prompt_template("english", "analysis")
-
     # Prepare preparation data summary for context
     prep_summary = f"""
 Agreement Type: {preparation_data.get('agreement_type', 'unknown')}
@@ -41,18 +40,31 @@ Governing Language: {preparation_data.get('governing_language', 'unknown')}
 """
 
     # Fill in the template
-    prompt = prompt_template.replace("{preparation_data}", prep_summary)
-    prompt = prompt.replace("{contract_text}", contract_text[:15000])  # Limit to ~15k chars
-    prompt = prompt.replace("{user_role}", preparation_data.get('user_role', 'user'))
-    prompt = prompt.replace("{agreement_type}", preparation_data.get('agreement_type', 'agreement'))
-    prompt = prompt.replace("{output_language}", output_language.capitalize())
+    template = get_prompt_template("analysis")
+    values = {
+        "preparation_data": prep_summary,
+        "user_role": preparation_data.get('user_role') or 'user',
+        "agreement_type": preparation_data.get('agreement_type') or 'agreement',
+        "output_language": output_language.capitalize()
+    }
+    system_prompt = "You are a legal document analyst helping non-lawyers understand contracts. Be clear, specific, and actionable."
+    # As much of the contract as the model's context window leaves room for
+    prompt = template.render(contract_text=llm_router.fit_text(
+        contract_text, system_prompt, template.static_prefix, template.render(contract_text="", **values)
+    ), **values)
+    # Stay within the provider's tokens-per-minute window
+    llm_router.wait_for_rate_limit(system_prompt, template.static_prefix, prompt)
 
     # Call LLM
     try:
         result = llm_router.call_with_json(
             prompt=prompt,
-            system_prompt="You are a legal document analyst helping non-lawyers understand contracts. Be clear, specific, and actionable."
+            system_prompt=system_prompt,
+            prefix=template.static_prefix,
+            on_response=on_response
         )
+    except LLMCallCancelled:
+        raise
     except Exception as e:
         raise RuntimeError(f"Step 2 analysis failed: {str(e)}")
 
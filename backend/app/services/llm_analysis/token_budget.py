@@ -0,0 +1,174 @@
+"""
+Token Budget
+Token counts and prompt budgets per model
+
+Contract text used to be cut at a fixed 15000 characters and tokens
+estimated as len(text) // 3. Both are off by a factor of two between scripts:
+English runs about 4 characters per token, Cyrillic closer to 2. This module
+counts tokens with the model's tokenizer (tiktoken, loaded lazily and cached
+per encoding) and falls back to per-script character ratios when no
+tokenizer is available (tiktoken not installed, encoding not downloadable).
+
+The prompt budget of a call is the model's context window minus the tokens
+reserved for the completion (max_tokens), minus a safety margin for message
+framing and tokenizer mismatch (Llama and Claude tokenizers differ from the
+OpenAI encodings used to count them), and at most LLM_MAX_PROMPT_TOKENS:
+provider tokens-per-minute limits (Groq's tiers) are far below the context
+windows, and a prompt over the limit is rejected rather than truncated.
+
+Usage:
+    budget = prompt_budget(model, max_tokens=8000) - count_tokens(instructions, model)
+    text = truncate_to_tokens(contract_text, budget, model)
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Model name prefix -> context window (tokens); first match wins
+MODEL_CONTEXT_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("llama-3.3-70b", 131072),
+    ("llama-3.1-", 131072),
+    ("meta-llama/llama-3", 131072),
+    ("anthropic/claude", 200000),
+    ("google/gemini", 1000000),
+    ("openai/gpt-4o", 128000),
+    ("openai/gpt-4-turbo", 128000),
+    ("fake-llm", 32768),
+)
+
+# Unknown models (LLM_CONTEXT_WINDOW overrides the table for all models)
+DEFAULT_CONTEXT_WINDOW = 32768
+LLM_CONTEXT_WINDOW = int(os.getenv("LLM_CONTEXT_WINDOW", "0"))
+
+# Cap on the prompt budget of every call, whatever the context window (0: none)
+LLM_MAX_PROMPT_TOKENS = int(os.getenv("LLM_MAX_PROMPT_TOKENS", "24000"))
+
+# Model name prefix -> tiktoken encoding; other models are counted with cl100k_base
+MODEL_ENCODINGS: Tuple[Tuple[str, str], ...] = (
+    ("openai/gpt-4o", "o200k_base"),
+    ("gpt-4o", "o200k_base"),
+)
+DEFAULT_ENCODING = "cl100k_base"
+
+# Share of the prompt budget kept free (message framing, tokenizer mismatch)
+SAFETY_MARGIN = 0.05
+
+# Fallback: characters per token, by script (errs on the side of more tokens)
+CHARS_PER_TOKEN_ASCII = 3.5
+CHARS_PER_TOKEN_OTHER = 2.0
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+# encoding name -> tiktoken Encoding, or None if it could not be loaded
+_encodings: Dict[str, Optional["tiktoken.Encoding"]] = {}
+_lock = threading.Lock()
+
+
+def context_window(model: Optional[str]) -> int:
+    """Context window of a model in tokens (LLM_CONTEXT_WINDOW if set)"""
+    if LLM_CONTEXT_WINDOW > 0:
+        return LLM_CONTEXT_WINDOW
+    for prefix, window in MODEL_CONTEXT_WINDOWS:
+        if model and model.startswith(prefix):
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def prompt_budget(model: Optional[str], max_tokens: int, max_prompt_tokens: Optional[int] = None) -> int:
+    """
+    Tokens a prompt (all messages) may take: context window - max_tokens -
+    safety margin, capped at max_prompt_tokens (default LLM_MAX_PROMPT_TOKENS)
+    """
+    available = max(0, int((context_window(model) - max_tokens) * (1 - SAFETY_MARGIN)))
+    cap = LLM_MAX_PROMPT_TOKENS if max_prompt_tokens is None else max_prompt_tokens
+    return min(available, cap) if cap > 0 else available
+
+
+def _encoding_name(model: Optional[str]) -> str:
+    for prefix, name in MODEL_ENCODINGS:
+        if model and model.startswith(prefix):
+            return name
+    return DEFAULT_ENCODING
+
+
+def _tokenizer(model: Optional[str]):
+    """tiktoken Encoding for a model, loaded on first use; None if unavailable"""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    name = _encoding_name(model)
+    if name in _encodings:
+        return _encodings[name]
+    with _lock:
+        if name not in _encodings:
+            try:
+                _encodings[name] = tiktoken.get_encoding(name)
+            except Exception as e:
+                # Typically no network to download the encoding: don't retry per call
+                logger.warning(f"Tokenizer {name} unavailable, estimating tokens from characters: {e}")
+                _encodings[name] = None
+    return _encodings[name]
+
+
+def _estimate_tokens(text: str) -> int:
+    non_ascii = len(_NON_ASCII.findall(text))
+    return math.ceil((len(text) - non_ascii) / CHARS_PER_TOKEN_ASCII + non_ascii / CHARS_PER_TOKEN_OTHER)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Number of tokens of a text for a model
+
+    Args:
+        text: Text to count
+        model: Model name (default encoding if None)
+
+    Returns:
+        Exact count with the model's tokenizer, else a character-ratio estimate
+    """
+    if not text:
+        return 0
+    encoding = _tokenizer(model)
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    Longest prefix of a text within max_tokens tokens
+
+    Returns:
+        The text itself if it fits
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = _tokenizer(model)
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+    # The estimate grows with the length: binary search for the longest prefix that fits
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
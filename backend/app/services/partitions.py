@@ -0,0 +1,199 @@
+"""
+Partition Maintenance Service
+
+`analysis_events` and `audit_logs` are range-partitioned by month on
+`created_at` (PostgreSQL). This module creates upcoming monthly partitions
+and drops whole months once they fall out of retention, so retention costs a
+`DROP TABLE` instead of a large DELETE + vacuum.
+
+Partition naming: <table>_pYYYYMM, covering [first of month, first of next month).
+
+Each table also has a DEFAULT partition (<table>_default) that takes rows no
+monthly partition covers, so inserts keep working if maintenance misses a
+month (Celery Beat down, task failing). ensure_partitions() creates the
+missing months, including any the default partition holds rows of, and
+moves those rows into them.
+"""
+
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by month on created_at
+PARTITIONED_TABLES = ("analysis_events", "audit_logs")
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value: datetime) -> date:
+    """First day of the month containing value"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Shift a first-of-month date by a number of months (may be negative)"""
+    index = month.year * 12 + (month.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(db: Session, table: str) -> bool:
+    """Whether table exists as a partitioned table (false on SQLite / unmigrated DBs)"""
+    if db.bind.dialect.name != "postgresql":
+        return False
+    return bool(db.execute(
+        text("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+             "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"),
+        {"table": table}
+    ).scalar())
+
+
+def list_partitions(db: Session, table: str) -> Dict[date, str]:
+    """
+    Existing monthly partitions of a table
+
+    Returns:
+        Dict of month (first day) -> partition name
+    """
+    rows = db.execute(
+        text("SELECT child.relname FROM pg_inherits i "
+             "JOIN pg_class parent ON parent.oid = i.inhparent "
+             "JOIN pg_class child ON child.oid = i.inhrelid "
+             "WHERE parent.relname = :table"),
+        {"table": table}
+    ).scalars().all()
+
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def ensure_default_partition(db: Session, table: str) -> None:
+    """Create the DEFAULT partition of a table if it is missing"""
+    db.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT'
+    ))
+
+
+def default_partition_months(db: Session, table: str) -> List[date]:
+    """Months the DEFAULT partition holds rows of"""
+    rows = db.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at) FROM \"{default_partition_name(table)}\""
+    )).scalars().all()
+    return sorted(month_start(row) for row in rows)
+
+
+def _create_partition(db: Session, table: str, month: date, from_default: bool) -> None:
+    """
+    Create the partition of a month
+
+    from_default: the DEFAULT partition holds rows of the month. Postgres
+    refuses to create a partition whose range rows in the default partition
+    fall into, so the default partition is detached while they move over.
+    """
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+
+    if not from_default:
+        db.execute(text(f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" {bounds}'))
+        return
+
+    # One transaction: the detach locks the table, so inserts wait instead of failing
+    db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+    db.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{table}" {bounds}'))
+    moved = db.execute(text(
+        f'WITH moved AS (DELETE FROM "{default}" '
+        f"WHERE created_at >= '{month.isoformat()}' AND created_at < '{add_months(month, 1).isoformat()}' "
+        f'RETURNING *) INSERT INTO "{table}" SELECT * FROM moved'
+    )).rowcount
+    db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+    logger.warning(f"Moved {moved} rows of {month:%Y-%m} from {default} to {name}")
+
+
+def ensure_partitions(db: Session, table: str, months_ahead: int, now: datetime = None) -> List[str]:
+    """
+    Create the DEFAULT partition, and partitions for the current month, the
+    next `months_ahead` months and any month the DEFAULT partition holds
+    rows of (moving those rows into it)
+
+    Args:
+        db: Database session
+        table: Partitioned table name
+        months_ahead: How many future months to create
+        now: Reference time (default: utcnow)
+
+    Returns:
+        Names of partitions created
+    """
+    if not is_partitioned(db, table):
+        return []
+
+    ensure_default_partition(db, table)
+
+    current = month_start(now or datetime.utcnow())
+    existing = list_partitions(db, table)
+    in_default = set(default_partition_months(db, table))
+    months = {add_months(current, offset) for offset in range(months_ahead + 1)} | in_default
+    created = []
+
+    for month in sorted(months):
+        if month in existing:
+            continue
+        _create_partition(db, table, month, from_default=month in in_default)
+        created.append(partition_name(table, month))
+
+    db.commit()
+    if created:
+        logger.info(f"Created partitions: {', '.join(created)}")
+    return created
+
+
+def drop_expired_partitions(db: Session, table: str, retention_months: int, now: datetime = None) -> List[str]:
+    """
+    Drop partitions whose whole month is older than the retention window
+
+    With retention_months=1 in October, September and October are kept and
+    August and earlier are dropped.
+
+    Args:
+        db: Database session
+        table: Partitioned table name
+        retention_months: Full months to keep before the current month
+        now: Reference time (default: utcnow)
+
+    Returns:
+        Names of partitions dropped
+    """
+    if not is_partitioned(db, table):
+        return []
+
+    oldest_kept = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    dropped = []
+
+    for month, name in sorted(list_partitions(db, table).items()):
+        if month >= oldest_kept:
+            continue
+        db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+        dropped.append(name)
+
+    db.commit()
+    if dropped:
+        logger.info(f"Dropped expired partitions: {', '.join(dropped)}")
+    return dropped
@@ -0,0 +1,114 @@
+"""
+Shared Counters
+
+Counters summed over every process (API and Celery workers) in a Redis hash,
+for the /admin metrics endpoints: LLM and ELI5 work runs on the workers, so
+the API process's own counters stay at zero.
+
+incr() only adds to a local buffer; a background thread sends the buffered
+amounts every FLUSH_INTERVAL seconds (one HINCRBY pipeline), so a slow or
+unreachable Redis never delays the LLM call or cache lookup being counted.
+Amounts that fail to send stay buffered for the next flush; up to
+FLUSH_INTERVAL seconds of counts are lost when a process is killed.
+Without Redis, or when it is unreachable, read() returns None and callers
+fall back to their in-process counters.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "counters:"
+
+# Seconds between sends of the buffered increments
+FLUSH_INTERVAL = 1.0
+
+
+class SharedCounters:
+    """
+    Usage:
+        llm_counters = SharedCounters("llm_usage")
+        llm_counters.incr(calls=1, prompt_tokens=1200)
+        llm_counters.read()     # {"calls": ..., "prompt_tokens": ...} or None
+    """
+
+    def __init__(self, name: str, redis_url: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL):
+        self.key = f"{REDIS_KEY_PREFIX}{name}"
+        self.redis_url = redis_url
+        self.flush_interval = flush_interval
+        self._redis = None
+
+        # Amounts not sent to Redis yet
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        if redis_url:
+            atexit.register(self.flush)
+
+    def _redis_client(self):
+        if self._redis is None and self.redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def incr(self, **amounts: int) -> None:
+        """Add amounts to the named counters (zero amounts are skipped); never blocks on Redis"""
+        amounts = {name: amount for name, amount in amounts.items() if amount}
+        if not self.redis_url or not amounts:
+            return
+        with self._lock:
+            for name, amount in amounts.items():
+                self._pending[name] = self._pending.get(name, 0) + amount
+            if self._flusher is None or not self._flusher.is_alive():
+                # Also after a fork: the parent's flusher thread is not copied
+                self._flusher = threading.Thread(target=self._run, name=f"counters-{self.key}", daemon=True)
+                self._flusher.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Send the buffered amounts (kept for the next flush if Redis fails)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        client = self._redis_client()
+        if client is None or not pending:
+            return
+        try:
+            with client.pipeline(transaction=False) as pipe:
+                for name, amount in pending.items():
+                    pipe.hincrby(self.key, name, amount)
+                pipe.execute()
+        except Exception as e:
+            logger.debug(f"Incrementing shared counters {self.key} failed: {e}")
+            with self._lock:
+                for name, amount in pending.items():
+                    self._pending[name] = self._pending.get(name, 0) + amount
+
+    def read(self) -> Optional[Dict[str, int]]:
+        """Totals of all processes (this one's buffered amounts included), or None without Redis"""
+        client = self._redis_client()
+        if client is None:
+            return None
+        self.flush()
+        try:
+            values = client.hgetall(self.key)
+        except Exception as e:
+            logger.warning(f"Reading shared counters {self.key} failed: {e}")
+            return None
+        return {name.decode("utf-8"): int(value) for name, value in values.items()}
+
+
+def shared_counters(name: str) -> SharedCounters:
+    """Counters in the application's Redis (settings.REDIS_URL)"""
+    return SharedCounters(name, redis_url=settings.REDIS_URL or None)
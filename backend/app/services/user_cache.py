@@ -0,0 +1,269 @@
+"""
+Authenticated User Cache
+
+Short-TTL cache of the user row behind a JWT, so authenticated requests
+don't need a `SELECT ... FROM users` each time. Entries are keyed by user ID
+and the token's `iat`, and hold a snapshot of the user's columns (without
+the password hash). A hit yields a detached `User` instance.
+
+Two levels:
+- in-process LRU (always)
+- Redis hash per user (optional, USER_CACHE_REDIS=true), shared by all
+  API processes
+
+Any ORM update or delete of a User (account update, tier change, deletion)
+invalidates that user in this process and in Redis once the transaction
+commits (invalidating at flush time would let a concurrent request cache the
+old committed row again). Other processes' LRUs are bounded by USER_CACHE_TTL.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from ..config import settings
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "user_cache:"
+
+# Session.info key of the user IDs to invalidate when the session commits
+PENDING_INVALIDATIONS_KEY = "user_cache_pending_invalidations"
+
+# Columns kept in the snapshot (the password hash stays in the database)
+_EXCLUDED_COLUMNS = {"hashed_password"}
+_SNAPSHOT_COLUMNS = [c.name for c in User.__table__.columns if c.name not in _EXCLUDED_COLUMNS]
+_DATETIME_COLUMNS = {"created_at", "updated_at"}
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {name: getattr(user, name) for name in _SNAPSHOT_COLUMNS}
+
+
+def _to_json(snapshot: Dict[str, Any]) -> str:
+    return json.dumps(snapshot, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _from_json(raw: str) -> Dict[str, Any]:
+    snapshot = json.loads(raw)
+    snapshot["id"] = uuid.UUID(snapshot["id"])
+    for name in _DATETIME_COLUMNS:
+        if snapshot.get(name):
+            snapshot[name] = datetime.fromisoformat(snapshot[name])
+    return snapshot
+
+
+class UserCache:
+    """
+    Usage:
+        user = await user_cache.get(user_id, iat)
+        if user is None:
+            user = ...load from database...
+            await user_cache.set(user, iat)
+
+        user_cache.invalidate(user_id)
+        user_cache.stats()
+    """
+
+    def __init__(self, ttl: float = 30, max_size: int = 10000, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.redis_url = redis_url
+
+        # user_id -> {iat: (expires_at, snapshot)}, least recently used first
+        self._entries: "OrderedDict[uuid.UUID, Dict[Any, tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_sync = None
+        # Strong references to in-flight Redis deletes (the loop keeps weak ones)
+        self._redis_tasks = set()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    # ===== Lookup =====
+
+    async def get(self, user_id: uuid.UUID, iat: Any) -> Optional[User]:
+        """Cached user for this token, or None"""
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id, {}).get(iat)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return User(**entry[1])
+
+        snapshot = await self._redis_get(user_id, iat)
+        if snapshot is not None:
+            self._store(user_id, iat, snapshot)
+            with self._lock:
+                self.redis_hits += 1
+            return User(**snapshot)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, user: User, iat: Any) -> None:
+        """Cache a user loaded from the database"""
+        if not self.enabled:
+            return
+        snapshot = _snapshot(user)
+        self._store(user.id, iat, snapshot)
+        await self._redis_set(user.id, iat, snapshot)
+
+    def _store(self, user_id: uuid.UUID, iat: Any, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            tokens = self._entries.setdefault(user_id, {})
+            tokens[iat] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # ===== Invalidation =====
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Drop every cached token of a user (this process and Redis)"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+        self._redis_delete(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ===== Redis =====
+
+    def _redis_client(self):
+        if self._redis is None and self.redis_url:
+            import redis.asyncio
+            self._redis = redis.asyncio.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis
+
+    def _redis_sync_client(self):
+        if self._redis_sync is None and self.redis_url:
+            import redis
+            self._redis_sync = redis.Redis.from_url(
+                self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5
+            )
+        return self._redis_sync
+
+    def _redis_delete(self, user_id: uuid.UUID) -> None:
+        """Delete a user's Redis hash, without blocking a running event loop"""
+        if not self.redis_url:
+            return
+        key = f"{REDIS_KEY_PREFIX}{user_id}"
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            task = loop.create_task(self._redis_delete_async(key))
+            self._redis_tasks.add(task)
+            task.add_done_callback(self._redis_tasks.discard)
+            return
+
+        try:
+            self._redis_sync_client().delete(key)
+        except Exception as e:
+            logger.warning(f"User cache invalidation in Redis failed: {e}")
+
+    async def _redis_delete_async(self, key: str) -> None:
+        try:
+            await self._redis_client().delete(key)
+        except Exception as e:
+            logger.warning(f"User cache invalidation in Redis failed: {e}")
+
+    async def _redis_get(self, user_id: uuid.UUID, iat: Any) -> Optional[Dict[str, Any]]:
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            raw = await client.hget(f"{REDIS_KEY_PREFIX}{user_id}", str(iat))
+        except Exception as e:
+            logger.warning(f"User cache lookup in Redis failed: {e}")
+            return None
+        return _from_json(raw) if raw else None
+
+    async def _redis_set(self, user_id: uuid.UUID, iat: Any, snapshot: Dict[str, Any]) -> None:
+        client = self._redis_client()
+        if client is None:
+            return
+        key = f"{REDIS_KEY_PREFIX}{user_id}"
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, str(iat), _to_json(snapshot))
+                pipe.expire(key, max(1, int(self.ttl)))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"User cache write to Redis failed: {e}")
+
+    # ===== Metrics =====
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "redis": bool(self.redis_url),
+                "size": len(self._entries),
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(
+    ttl=settings.USER_CACHE_TTL,
+    max_size=settings.USER_CACHE_SIZE,
+    redis_url=settings.REDIS_URL if settings.USER_CACHE_REDIS else None
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_user_invalidation(mapper, connection, target: User) -> None:
+    """Account updates, tier changes and deletions must not be served from cache"""
+    session = object_session(target)
+    if session is None:
+        user_cache.invalidate(target.id)
+        return
+    session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
@@ -1,3 +1,14 @@
-from .analyze_contract import analyze_contract_task
+from .analyze_contract import analyze_contract_task, prepare_contract_task, llm_analysis_task
+from .batches import finalize_batch_task
+from .eli5 import pregenerate_eli5_task
+from .dispatch import dispatch_analysis, dispatch_batch
 
-__all__ = ["analyze_contract_task"]
+__all__ = [
+    "analyze_contract_task",
+    "prepare_contract_task",
+    "llm_analysis_task",
+    "finalize_batch_task",
+    "pregenerate_eli5_task",
+    "dispatch_analysis",
+    "dispatch_batch",
+]
@@ -1,16 +1,49 @@
 """
-Celery task for contract analysis.
+Celery tasks for contract analysis.
 
-BUG FIX: This task now receives analysis_id instead of contract_id to avoid
+BUG FIX: These tasks receive analysis_id instead of contract_id to avoid
 creating duplicate Analysis records. The API endpoint creates the Analysis record
-and passes its ID to this task.
+and passes its ID to the task.
+
+The pipeline is split into two routed stages (see tasks/dispatch.py):
+- prepare_contract (queue "cpu"): text extraction/OCR, PII redaction,
+  language detection and quality scoring
+- llm_analysis (queue "llm"): Step 1 and Step 2 LLM calls and formatting
+analyze_contract runs both stages in one task.
+
+Checkpoints: every completed stage is recorded in analyses.pipeline_state
+(redacted text hash, prepared metadata, raw LLM responses), next to the
+Step 1/2 results in preparation_result / analysis_result. Tasks are
+acks_late, so work lost with a crashed worker is redelivered, and transient
+failures (soft time limit, lost database connection) are retried. A
+redelivered or retried task resumes after the last completed stage instead
+of re-running extraction and LLM calls.
+
+Short contracts (COMBINED_ANALYSIS_MAX_TOKENS) get Step 1 and Step 2 from a
+single LLM call; if its response is incomplete, the two steps run as usual
+(see services/llm_analysis/combined_analysis.py).
+
+Speculative Step 2 (SPECULATIVE_STEP2=true): when the Step 1 fields Step 2
+depends on can be guessed (earlier analysis of the same text, keyword
+heuristics), Step 2 is sent alongside Step 1 and kept if the guesses hold,
+saving an LLM round trip; otherwise it is re-issued with the real Step 1
+data (see services/llm_analysis/speculation.py).
+
+Cancellation (POST /analyses/{id}/cancel) is cooperative: the tasks check
+for it between stages and while waiting on an LLM call, abort the call in
+flight and return without failing the analysis.
 """
 
 from celery import Task
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import hashlib
+import time
 import uuid
 from datetime import datetime
+import threading
 import traceback
 import logging
 
@@ -18,35 +51,45 @@ logger = logging.getLogger(__name__)
 
 from ..celery_app import celery_app
 from ..database import SessionLocal
-from ..models import Contract, Analysis, AnalysisEvent
+from ..models import Contract, Analysis, AnalysisEvent, Deadline
 from ..config import settings
 from pathlib import Path
 
 # Import LLM analysis modules from prototype
-from ..services.llm_analysis.llm_router import LLMRouter
+from ..services.llm_analysis.llm_router import LLMRouter, LLMCallCancelled
 from ..services.llm_analysis.step1_preparation import run_step1_preparation
 from ..services.llm_analysis.step2_analysis import run_step2_analysis, determine_final_screening_result
+from ..services.llm_analysis.speculation import SpeculativeStep2, guess_preparation_data
+from ..services.llm_analysis.combined_analysis import run_combined_analysis, use_combined_analysis
+from ..services.llm_analysis.prompt_templates import prompt_version
 from ..services.llm_analysis.language import detect_language
 from ..services.llm_analysis.parsers import extract_text, detect_structure
 from ..services.llm_analysis.quality import compute_quality_score, compute_confidence_level, compute_coverage_score
 
 # Import PII redaction for GDPR compliance
 from ..utils.pii_redactor import redact_pii
+from ..services.analysis_cancellation import AnalysisCancelled, is_cancelled
 
 
 class DatabaseTask(Task):
-    """Base task class that handles database sessions"""
-    _session = None
+    """
+    Base task class that handles database sessions
+
+    One session per worker thread: the LLM queue runs on a threads pool,
+    where a task instance is shared by concurrent executions.
+    """
+    _local = threading.local()
 
     def after_return(self, *args, **kwargs):
-        if self._session is not None:
-            self._session.close()
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
 
     @property
     def session(self) -> Session:
-        if self._session is None:
-            self._session = SessionLocal()
-        return self._session
+        if getattr(self._local, "session", None) is None:
+            self._local.session = SessionLocal()
+        return self._local.session
 
 
 def create_event(db: Session, analysis_id: uuid.UUID, event_type: str, message: str, data: Dict = None):
@@ -62,249 +105,668 @@ def create_event(db: Session, analysis_id: uuid.UUID, event_type: str, message:
     db.commit()
 
 
-@celery_app.task(bind=True, base=DatabaseTask, name="analyze_contract")
-def analyze_contract_task(
-    self,
-    analysis_id: str,  # ✅ BUG FIX: Receive analysis_id instead of contract_id
-    output_language: str = "english"
-) -> Dict[str, Any]:
+# ===== Stage checkpoints =====
+# analyses.pipeline_state:
+# {
+#   "text_sha256": SHA-256 of the redacted text the LLM stages ran on,
+#   "prepared": {"detected_language", "quality_score", "coverage"},
+#   "completed_stages": ["prepare", "step1", "step2"],
+#   "raw_responses": {"step1": "...", "step2": "..."} (or {"combined": "..."}),
+#   "prompt_version": prompt templates version the Step 1 result came from,
+#   "attempts": number of task runs that worked on the analysis,
+#   "task_attempts": {task name: runs of that task, redeliveries included}
+# }
+STAGE_PREPARE = "prepare"
+STAGE_STEP1 = "step1"
+STAGE_STEP2 = "step2"
+
+# raw_responses key of a combined Step 1 + Step 2 call (completes both stages)
+RAW_COMBINED = "combined"
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Failures worth a retry; anything else fails the analysis right away
+TRANSIENT_ERRORS = (SoftTimeLimitExceeded, OperationalError)
+
+CANCELLATION_ERRORS = (AnalysisCancelled, LLMCallCancelled)
+
+# How often a task waiting on an LLM call looks for a cancellation
+CANCEL_POLL_INTERVAL = 1.0
+
+# Runs of one task per analysis. Redeliveries after a worker crash count too:
+# acks_late requeues them without going through max_retries, so a contract
+# that reliably kills the worker would otherwise come back forever.
+MAX_TASK_ATTEMPTS = settings.ANALYSIS_MAX_RETRIES + 1
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _checkpoint(analysis: Analysis) -> Dict[str, Any]:
+    return dict(analysis.pipeline_state or {})
+
+
+def _completed_stages(analysis: Analysis) -> List[str]:
+    return _checkpoint(analysis).get("completed_stages", [])
+
+
+def _save_checkpoint(db: Session, analysis: Analysis, stage: Optional[str] = None, **updates) -> None:
+    """Merge updates into pipeline_state (marking stage completed) and commit"""
+    state = _checkpoint(analysis)
+    state.update(updates)
+    if stage is not None and stage not in state.get("completed_stages", []):
+        state["completed_stages"] = state.get("completed_stages", []) + [stage]
+    # Assign a new dict: in-place changes to a JSON column are not tracked
+    analysis.pipeline_state = state
+    db.commit()
+
+
+def _check_text_hash(db: Session, analysis: Analysis, text_sha256: str) -> None:
     """
-    Analyze a contract asynchronously.
+    Drop checkpoints computed from a different redacted text
 
-    ✅ BUG FIX APPLIED:
-    - This task now receives analysis_id (not contract_id)
-    - It fetches the existing Analysis record (doesn't create a new one)
-    - This ensures the SSE stream polls for events with the correct analysis_id
+    Everything after the prepare stage depends on the exact text sent to the
+    LLM; if it changed (e.g. new redaction rules), those stages must run again.
+    """
+    state = _checkpoint(analysis)
+    if state.get("text_sha256") == text_sha256:
+        return
+    if state.get("text_sha256") is not None:
+        logger.warning(f"Redacted text of analysis {analysis.id} changed, discarding stage checkpoints")
+    _save_checkpoint(
+        db,
+        analysis,
+        text_sha256=text_sha256,
+        completed_stages=[],
+        raw_responses={}
+    )
+
+
+def _finished_result(analysis: Analysis) -> Dict[str, Any]:
+    """Task result for an analysis that is already finished (redelivered task)"""
+    return {
+        "analysis_id": str(analysis.id),
+        "status": analysis.status,
+        "preparation_result": analysis.preparation_result,
+        "analysis_result": analysis.analysis_result
+    }
+
+
+def _cancel_requested(db: Session, analysis: Analysis) -> bool:
+    """Redis flag, or the status in the database (works without Redis)"""
+    if is_cancelled(analysis.id):
+        return True
+    return db.query(Analysis.status).filter(Analysis.id == analysis.id).scalar() == "cancelled"
 
-    Args:
-        analysis_id: UUID of the Analysis record (created by API endpoint)
-        output_language: Language for output (default: "english")
+
+def _set_status(db: Session, analysis: Analysis, **values) -> bool:
+    """
+    Conditional status write (like the cancel endpoint's): never overwrites
+    a cancellation, even when the Redis flag is gone
 
     Returns:
-        Dict with analysis results
+        False if the analysis was cancelled meanwhile (nothing written)
     """
-    db = self.session
+    updated = db.query(Analysis).filter(
+        Analysis.id == analysis.id,
+        Analysis.status.notin_(["cancelled"])
+    ).update(values, synchronize_session=False)
+    if not updated:
+        db.rollback()
+        return False
+    # Commit expires the instance, so it reloads the new values
+    db.commit()
+    return True
 
-    try:
-        # ✅ BUG FIX: Parse analysis_id instead of contract_id
+
+def _raise_if_cancelled(db: Session, analysis: Analysis) -> None:
+    """Stage boundary check"""
+    if _cancel_requested(db, analysis):
+        raise AnalysisCancelled()
+
+
+def _wait_for_llm(db: Session, future, llm_router: LLMRouter, analysis: Analysis, timeout: float):
+    """
+    future.result(timeout), aborting the LLM call if the analysis is cancelled
+
+    Raises:
+        AnalysisCancelled: The analysis was cancelled while waiting
+        concurrent.futures.TimeoutError: No result within timeout
+    """
+    from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+    deadline = time.monotonic() + timeout
+    while True:
         try:
-            analysis_uuid = uuid.UUID(analysis_id)
-        except ValueError:
-            raise ValueError(f"Invalid analysis_id format: {analysis_id}")
-
-        # ✅ BUG FIX: Get existing analysis record (created by API endpoint)
-        # Before: Created NEW Analysis with uuid.uuid4()
-        # After: Fetch existing Analysis by ID
-        analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
-        if not analysis:
-            raise ValueError(f"Analysis {analysis_id} not found")
-
-        # Get contract through the analysis relationship
-        contract = db.query(Contract).filter(Contract.id == analysis.contract_id).first()
-        if not contract:
-            raise ValueError(f"Contract {analysis.contract_id} not found")
-
-        # ✅ BUG FIX: Update analysis status to running (don't create new record)
-        # Before: analysis = Analysis(id=uuid.uuid4(), contract_id=..., status="running")
-        # After: analysis.status = "running"
-        analysis.status = "running"
-        analysis.started_at = datetime.utcnow()
-        db.commit()
+            return future.result(timeout=max(0.0, min(CANCEL_POLL_INTERVAL, deadline - time.monotonic())))
+        except FuturesTimeoutError:
+            if _cancel_requested(db, analysis):
+                llm_router.abort()
+                raise AnalysisCancelled()
+            if time.monotonic() >= deadline:
+                raise
+
+
+def _previous_preparation(db: Session, analysis: Analysis, text_sha256: str) -> Optional[Dict[str, Any]]:
+    """Step 1 result of the latest earlier analysis of the same contract, redacted text and prompts"""
+    rows = db.query(Analysis.preparation_result, Analysis.pipeline_state).filter(
+        Analysis.contract_id == analysis.contract_id,
+        Analysis.id != analysis.id,
+        Analysis.status == "succeeded"
+    ).order_by(Analysis.created_at.desc()).limit(5).all()
+    for preparation_result, state in rows:
+        state = state or {}
+        if (
+            preparation_result
+            and state.get("text_sha256") == text_sha256
+            and state.get("prompt_version") == prompt_version()
+            and STAGE_STEP1 in state.get("completed_stages", [])
+        ):
+            return preparation_result
+    return None
+
+
+def _start_speculative_step2(
+    db: Session,
+    analysis: Analysis,
+    prepared: Dict[str, Any],
+    text_sha256: str,
+    llm_router: LLMRouter,
+    output_language: str
+) -> Optional[SpeculativeStep2]:
+    """Send Step 2 on guessed Step 1 data, if enabled and the guesses are confident"""
+    if not settings.SPECULATIVE_STEP2:
+        return None
+    guesses = guess_preparation_data(
+        prepared["redacted_text"],
+        prepared["detected_language"],
+        prepared["quality_score"],
+        previous=_previous_preparation(db, analysis, text_sha256)
+    )
+    if guesses is None:
+        logger.info(f"Speculative Step 2 skipped for analysis {analysis.id}: no confident guess")
+        return None
+    logger.info(
+        f"Speculative Step 2 started for analysis {analysis.id} "
+        f"({guesses['agreement_type']}, {guesses['user_role']}, {guesses['negotiability']})"
+    )
+    return SpeculativeStep2(prepared["redacted_text"], guesses, llm_router, output_language)
 
-        # Create event: Analysis started
-        create_event(
-            db,
-            analysis.id,
-            event_type="status_change",
-            message="Analysis started",
-            data={"status": "running"}
-        )
 
-        # ===== STEP 0: Text Extraction (if needed) =====
-        extraction_metadata = {}
+def _speculative_step2_result(
+    db: Session,
+    analysis: Analysis,
+    speculation: SpeculativeStep2,
+    preparation_result: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Result of the speculative Step 2, if its guesses hold and it succeeded
 
-        if not contract.extracted_text:
-            create_event(
-                db,
-                analysis.id,
-                event_type="progress",
-                message="Extracting text from document",
-                data={"step": "extraction", "progress": 10}
+    Returns:
+        None if Step 2 must be re-issued (the speculation is discarded)
+    """
+    if not speculation.holds(preparation_result):
+        logger.info(f"Speculative Step 2 of analysis {analysis.id} discarded: Step 1 guesses did not hold")
+        speculation.discard()
+        return None
+
+    try:
+        result = _wait_for_llm(db, speculation.future, speculation.llm_router, analysis, timeout=180)
+    except TRANSIENT_ERRORS + CANCELLATION_ERRORS:
+        raise
+    except Exception as e:
+        # Including the timeout: the regular Step 2 gets a full one of its own
+        logger.warning(f"Speculative Step 2 of analysis {analysis.id} failed, re-issuing: {e}")
+        speculation.discard()
+        return None
+
+    logger.info(f"Speculative Step 2 of analysis {analysis.id} kept")
+    return speculation.adopt(result, preparation_result)
+
+
+def _run_combined_stage(
+    db: Session,
+    analysis: Analysis,
+    prepared: Dict[str, Any],
+    output_language: str,
+    llm_router: LLMRouter,
+    raw_responses: Dict[str, str]
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Step 1 and Step 2 in one LLM call, checkpointed as both stages
+
+    Returns:
+        (preparation_result, analysis_result), or None if the two steps must
+        run instead (incomplete response, LLM failure)
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Analyzing short contract in a single pass",
+        data={"step": "preparation", "progress": 38}
+    )
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(
+                run_combined_analysis,
+                contract_text=prepared["redacted_text"],  # ⚠️ IMPORTANT: Use redacted text, not original
+                detected_language=prepared["detected_language"],
+                quality_score=prepared["quality_score"],
+                llm_router=llm_router,
+                output_language=output_language,
+                on_response=lambda text: raw_responses.__setitem__(RAW_COMBINED, text)
             )
+            preparation_result, analysis_result = _wait_for_llm(db, future, llm_router, analysis, timeout=180)
+    except TRANSIENT_ERRORS + CANCELLATION_ERRORS:
+        raise
+    except Exception as e:
+        # Including incomplete responses and the timeout
+        logger.warning(f"Combined analysis of analysis {analysis.id} failed, running Step 1 and Step 2: {e}")
+        raw_responses.pop(RAW_COMBINED, None)
+        return None
+
+    logger.info(f"Combined analysis completed: {preparation_result.get('agreement_type', 'Unknown')}")
+
+    analysis.preparation_result = preparation_result
+    _save_checkpoint(db, analysis, STAGE_STEP1, raw_responses=raw_responses, prompt_version=prompt_version())
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Document preparation completed",
+        data={"step": "preparation", "progress": 40, "result": preparation_result}
+    )
 
-            try:
-                # Build full file path
-                file_path = Path(settings.UPLOAD_DIR) / contract.file_path
-
-                # Extract text using quality-aware parser
-                extraction_result = extract_text(str(file_path))
-
-                # Store extraction metadata for quality calculation
-                extraction_metadata = {
-                    'quality_score': extraction_result.get('quality_score', 1.0),
-                    'is_scanned': extraction_result.get('is_scanned', False),
-                    'format': extraction_result.get('format', 'unknown')
-                }
-
-                # Update contract with extracted text
-                contract.extracted_text = extraction_result['text']
-                if 'pages' in extraction_result:
-                    contract.page_count = extraction_result['pages']
-                elif 'page_count' in extraction_result:
-                    contract.page_count = extraction_result['page_count']
-                elif 'paragraph_count' in extraction_result:
-                    contract.page_count = extraction_result['paragraph_count'] // 20  # Rough estimate
-
-                db.commit()
-
-                quality_msg = f"quality: {extraction_metadata['quality_score']:.0%}"
-                if extraction_metadata['is_scanned']:
-                    quality_msg += " (scanned document)"
+    analysis.analysis_result = analysis_result
+    _save_checkpoint(db, analysis, STAGE_STEP2)
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Contract analysis completed",
+        data={"step": "analysis", "progress": 65, "result": analysis_result}
+    )
+    return preparation_result, analysis_result
 
-                create_event(
-                    db,
-                    analysis.id,
-                    event_type="progress",
-                    message=f"Extracted {len(extraction_result['text'])} characters ({quality_msg})",
-                    data={"step": "extraction", "progress": 20, **extraction_metadata}
-                )
-            except Exception as e:
-                logger.error(f"Text extraction failed: {e}")
-                # Log error but continue with empty text
-                create_event(
-                    db,
-                    analysis.id,
-                    event_type="progress",
-                    message=f"Warning: Text extraction failed: {str(e)}",
-                    data={"step": "extraction", "progress": 20, "error": str(e)}
-                )
-                contract.extracted_text = ""
-                extraction_metadata = {'quality_score': 0.5, 'is_scanned': False, 'format': 'unknown'}
-                db.commit()
-        else:
-            # Text already extracted, assume good quality for existing extractions
-            extraction_metadata = {'quality_score': 1.0, 'is_scanned': False, 'format': 'unknown'}
-
-        # ===== GDPR COMPLIANCE: PII REDACTION =====
-        # Redact personally identifiable information before sending to LLM
+
+def _load_analysis(db: Session, analysis_id: str) -> Tuple[Analysis, Contract]:
+    """Fetch the Analysis record created by the API endpoint and its contract"""
+    # ✅ BUG FIX: Parse analysis_id instead of contract_id
+    try:
+        analysis_uuid = uuid.UUID(analysis_id)
+    except ValueError:
+        raise ValueError(f"Invalid analysis_id format: {analysis_id}")
+
+    # ✅ BUG FIX: Get existing analysis record (created by API endpoint)
+    # Before: Created NEW Analysis with uuid.uuid4()
+    # After: Fetch existing Analysis by ID
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_uuid).first()
+    if not analysis:
+        raise ValueError(f"Analysis {analysis_id} not found")
+
+    # Get contract through the analysis relationship
+    contract = db.query(Contract).filter(Contract.id == analysis.contract_id).first()
+    if not contract:
+        raise ValueError(f"Contract {analysis.contract_id} not found")
+
+    return analysis, contract
+
+
+def _count_attempt(db: Session, analysis: Analysis, task_name: str) -> bool:
+    """
+    Count a run of task_name on the analysis
+
+    Returns:
+        False if the task ran too often; the analysis is then marked failed
+        and no stage must run
+    """
+    task_attempts = dict(_checkpoint(analysis).get("task_attempts", {}))
+    task_attempts[task_name] = task_attempts.get(task_name, 0) + 1
+    _save_checkpoint(db, analysis, task_attempts=task_attempts)
+
+    if task_attempts[task_name] <= MAX_TASK_ATTEMPTS:
+        return True
+
+    logger.error(f"{task_name} ran {task_attempts[task_name]} times on analysis {analysis.id}, giving up")
+    _fail_analysis(
+        db,
+        analysis,
+        RuntimeError(f"Analysis stopped after {MAX_TASK_ATTEMPTS} attempts. Please try again later.")
+    )
+    return False
+
+
+def _mark_running(db: Session, analysis: Analysis, task_name: str) -> bool:
+    """
+    Set the analysis to running and announce it on the SSE stream
+
+    Returns:
+        False if task_name exceeded MAX_TASK_ATTEMPTS (the analysis failed)
+
+    Raises:
+        AnalysisCancelled: The analysis was cancelled before it started
+    """
+    if not _count_attempt(db, analysis, task_name):
+        return False
+
+    state = _checkpoint(analysis)
+    attempts = state.get("attempts", 0) + 1
+
+    if analysis.status == "running":
+        # Redelivered after a worker crash, or retried: resume from checkpoints
+        _save_checkpoint(db, analysis, attempts=attempts)
+        completed = state.get("completed_stages", [])
         create_event(
             db,
             analysis.id,
-            event_type="progress",
-            message="Protecting personal data (GDPR compliance)",
-            data={"step": "pii_redaction", "progress": 22}
+            event_type="status_change",
+            message=f"Analysis resumed (attempt {attempts})",
+            data={"status": "running", "attempt": attempts, "completed_stages": completed}
         )
+        return True
+
+    # ✅ BUG FIX: Update analysis status to running (don't create new record)
+    # Before: analysis = Analysis(id=uuid.uuid4(), contract_id=..., status="running")
+    # After: set analysis.status = "running" (unless cancelled meanwhile)
+    _save_checkpoint(db, analysis, attempts=attempts)
+    if not _set_status(db, analysis, status="running", started_at=datetime.utcnow()):
+        raise AnalysisCancelled()
+
+    # Create event: Analysis started
+    create_event(
+        db,
+        analysis.id,
+        event_type="status_change",
+        message="Analysis started",
+        data={"status": "running"}
+    )
+    return True
 
-        original_text = contract.extracted_text or ""
-        redacted_text, pii_summary = redact_pii(original_text)
 
-        # Log PII redaction summary
-        if pii_summary:
-            logger.info(f"PII redaction summary: {pii_summary}")
-            create_event(
-                db,
-                analysis.id,
-                event_type="progress",
-                message=f"Protected {sum(pii_summary.values())} personal data items",
-                data={"step": "pii_redaction", "progress": 24, "pii_summary": pii_summary}
-            )
-        else:
-            logger.info("No PII detected in contract text")
+def _prepare_document(db: Session, analysis: Analysis, contract: Contract) -> Dict[str, Any]:
+    """
+    CPU-bound stage: text extraction/OCR, PII redaction, language detection
+    and document quality
 
-        # Use redacted text for LLM analysis (NEVER send original text with PII)
-        contract_text_for_llm = redacted_text
+    Returns:
+        Dict with redacted_text, detected_language, quality_score and coverage
+        (JSON-serializable: passed on to llm_analysis through the broker)
+    """
+    _raise_if_cancelled(db, analysis)
 
-        # ===== STEP 1: Document Preparation =====
+    # ===== STEP 0: Text Extraction (if needed) =====
+    extraction_metadata = {}
+
+    if not contract.extracted_text:
         create_event(
             db,
             analysis.id,
             event_type="progress",
-            message="Starting document preparation with LLM",
-            data={"step": "preparation", "progress": 25}
+            message="Extracting text from document",
+            data={"step": "extraction", "progress": 10}
         )
 
         try:
-            # Initialize LLM router
-            llm_router = LLMRouter()
+            # Build full file path
+            file_path = Path(settings.UPLOAD_DIR) / contract.file_path
+
+            # Extract text using quality-aware parser
+            extraction_result = extract_text(str(file_path))
+
+            # Store extraction metadata for quality calculation
+            extraction_metadata = {
+                'quality_score': extraction_result.get('quality_score', 1.0),
+                'is_scanned': extraction_result.get('is_scanned', False),
+                'format': extraction_result.get('format', 'unknown')
+            }
 
-            # Detect language of contract text (use redacted text)
-            detected_language, lang_confidence = detect_language(contract_text_for_llm)
-            logger.info(f"Detected language: {detected_language} (confidence: {lang_confidence})")
+            # Update contract with extracted text
+            contract.extracted_text = extraction_result['text']
+            if 'pages' in extraction_result:
+                contract.page_count = extraction_result['pages']
+            elif 'page_count' in extraction_result:
+                contract.page_count = extraction_result['page_count']
+            elif 'paragraph_count' in extraction_result:
+                contract.page_count = extraction_result['paragraph_count'] // 20  # Rough estimate
+
+            db.commit()
+
+            quality_msg = f"quality: {extraction_metadata['quality_score']:.0%}"
+            if extraction_metadata['is_scanned']:
+                quality_msg += " (scanned document)"
 
             create_event(
                 db,
                 analysis.id,
                 event_type="progress",
-                message=f"Detected language: {detected_language}",
-                data={"step": "preparation", "progress": 30}
+                message=f"Extracted {len(extraction_result['text'])} characters ({quality_msg})",
+                data={"step": "extraction", "progress": 20, **extraction_metadata}
             )
-
-            # ===== Compute Document Quality Score =====
+        except Exception as e:
+            logger.error(f"Text extraction failed: {e}")
+            # Log error but continue with empty text
             create_event(
                 db,
                 analysis.id,
                 event_type="progress",
-                message="Assessing document quality",
-                data={"step": "preparation", "progress": 32}
+                message=f"Warning: Text extraction failed: {str(e)}",
+                data={"step": "extraction", "progress": 20, "error": str(e)}
             )
+            contract.extracted_text = ""
+            extraction_metadata = {'quality_score': 0.5, 'is_scanned': False, 'format': 'unknown'}
+            db.commit()
+    else:
+        # Text already extracted, assume good quality for existing extractions
+        extraction_metadata = {'quality_score': 1.0, 'is_scanned': False, 'format': 'unknown'}
+
+    _raise_if_cancelled(db, analysis)
+
+    # ===== GDPR COMPLIANCE: PII REDACTION =====
+    # Redact personally identifiable information before sending to LLM
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Protecting personal data (GDPR compliance)",
+        data={"step": "pii_redaction", "progress": 22}
+    )
 
-            # Detect document structure
-            structure = detect_structure(contract_text_for_llm)
-            appears_complete = structure.get('appears_complete', True)
-
-            # For now, assume no translation and all referenced documents present
-            # In future, can enhance to detect translations and missing annexes
-            is_translation = False
-            has_original = True
-            coverage = 1.0  # Assume 100% coverage for now
-
-            # Compute quality score based on extraction quality and document completeness
-            scan_quality = extraction_metadata.get('quality_score', 1.0)
-            is_scanned = extraction_metadata.get('is_scanned', False)
-
-            quality_score, quality_reason = compute_quality_score(
-                scan_quality=scan_quality,
-                is_scanned=is_scanned,
-                is_translation=is_translation,
-                has_original=has_original,
-                coverage=coverage,
-                appears_complete=appears_complete
-            )
+    original_text = contract.extracted_text or ""
+    redacted_text, pii_summary = redact_pii(original_text)
 
-            logger.info(f"Quality score: {quality_score:.2f} - {quality_reason}")
+    # Log PII redaction summary
+    if pii_summary:
+        logger.info(f"PII redaction summary: {pii_summary}")
+        create_event(
+            db,
+            analysis.id,
+            event_type="progress",
+            message=f"Protected {sum(pii_summary.values())} personal data items",
+            data={"step": "pii_redaction", "progress": 24, "pii_summary": pii_summary}
+        )
+    else:
+        logger.info("No PII detected in contract text")
 
-            create_event(
-                db,
-                analysis.id,
-                event_type="progress",
-                message=f"Document quality: {quality_score:.0%} ({quality_reason})",
-                data={"step": "preparation", "progress": 35, "quality_score": quality_score, "quality_reason": quality_reason}
-            )
+    # Use redacted text for LLM analysis (NEVER send original text with PII)
+    contract_text_for_llm = redacted_text
 
-            # Run Step 1 preparation analysis with LLM (using redacted text)
-            # Use ThreadPoolExecutor to enforce hard timeout on LLM call
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+    # Language and quality were already computed for this exact text
+    text_sha256 = _text_hash(contract_text_for_llm)
+    _check_text_hash(db, analysis, text_sha256)
+    if STAGE_PREPARE in _completed_stages(analysis):
+        create_event(
+            db,
+            analysis.id,
+            event_type="progress",
+            message="Language and quality assessment restored from checkpoint",
+            data={"step": "preparation", "progress": 35}
+        )
+        return {"redacted_text": contract_text_for_llm, **_checkpoint(analysis)["prepared"]}
+
+    # ===== STEP 1: Document Preparation =====
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Starting document preparation with LLM",
+        data={"step": "preparation", "progress": 25}
+    )
+
+    # Detect language of contract text (use redacted text)
+    detected_language, lang_confidence = detect_language(contract_text_for_llm)
+    logger.info(f"Detected language: {detected_language} (confidence: {lang_confidence})")
+
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message=f"Detected language: {detected_language}",
+        data={"step": "preparation", "progress": 30}
+    )
+
+    # ===== Compute Document Quality Score =====
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Assessing document quality",
+        data={"step": "preparation", "progress": 32}
+    )
+
+    # Detect document structure
+    structure = detect_structure(contract_text_for_llm)
+    appears_complete = structure.get('appears_complete', True)
+
+    # For now, assume no translation and all referenced documents present
+    # In future, can enhance to detect translations and missing annexes
+    is_translation = False
+    has_original = True
+    coverage = 1.0  # Assume 100% coverage for now
+
+    # Compute quality score based on extraction quality and document completeness
+    scan_quality = extraction_metadata.get('quality_score', 1.0)
+    is_scanned = extraction_metadata.get('is_scanned', False)
+
+    quality_score, quality_reason = compute_quality_score(
+        scan_quality=scan_quality,
+        is_scanned=is_scanned,
+        is_translation=is_translation,
+        has_original=has_original,
+        coverage=coverage,
+        appears_complete=appears_complete
+    )
+
+    logger.info(f"Quality score: {quality_score:.2f} - {quality_reason}")
+
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message=f"Document quality: {quality_score:.0%} ({quality_reason})",
+        data={"step": "preparation", "progress": 35, "quality_score": quality_score, "quality_reason": quality_reason}
+    )
+
+    prepared = {
+        "detected_language": detected_language,
+        "quality_score": quality_score,
+        "coverage": coverage
+    }
+    _save_checkpoint(db, analysis, STAGE_PREPARE, prepared=prepared)
+    _raise_if_cancelled(db, analysis)
+
+    return {"redacted_text": contract_text_for_llm, **prepared}
+
+
+def _run_llm_stages(
+    db: Session,
+    analysis: Analysis,
+    contract: Contract,
+    prepared: Dict[str, Any],
+    output_language: str
+) -> Dict[str, Any]:
+    """
+    I/O-bound stage: Step 1 and Step 2 LLM calls, formatting and deadlines
+    """
+    contract_text_for_llm = prepared["redacted_text"]
+    detected_language = prepared["detected_language"]
+    quality_score = prepared["quality_score"]
+    coverage = prepared["coverage"]
+
+    # Use ThreadPoolExecutor to enforce hard timeout on LLM calls
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+    _raise_if_cancelled(db, analysis)
+
+    # Step checkpoints only hold for the text they were computed from
+    text_sha256 = _text_hash(contract_text_for_llm)
+    _check_text_hash(db, analysis, text_sha256)
+    completed = _completed_stages(analysis)
+    raw_responses = dict(_checkpoint(analysis).get("raw_responses", {}))
+
+    llm_router = None
+    speculation = None
+
+    # Short contracts: both steps in one call, unless a stage is already checkpointed
+    combined = None
+    if STAGE_STEP1 not in completed and use_combined_analysis(contract_text_for_llm):
+        llm_router = LLMRouter(cancel_check=lambda: is_cancelled(analysis.id))
+        combined = _run_combined_stage(db, analysis, prepared, output_language, llm_router, raw_responses)
+
+    if combined is not None:
+        preparation_result = combined[0]
+    elif STAGE_STEP1 in completed:
+        preparation_result = analysis.preparation_result
+        create_event(
+            db,
+            analysis.id,
+            event_type="progress",
+            message="Document preparation restored from checkpoint",
+            data={"step": "preparation", "progress": 40, "result": preparation_result}
+        )
+    else:
+        step1_failed = False
+        try:
+            # Initialize LLM router
+            llm_router = LLMRouter(cancel_check=lambda: is_cancelled(analysis.id))
 
+            # Step 2 on guessed Step 1 data, in flight alongside Step 1 (shares its router,
+            # so a cancellation aborts both)
+            speculation = _start_speculative_step2(db, analysis, prepared, text_sha256, llm_router, output_language)
+
+            # Run Step 1 preparation analysis with LLM (using redacted text)
             with ThreadPoolExecutor(max_workers=1) as executor:
                 future = executor.submit(
                     run_step1_preparation,
                     contract_text=contract_text_for_llm,  # ⚠️ IMPORTANT: Use redacted text, not original
                     detected_language=detected_language,
                     quality_score=quality_score,
-                    llm_router=llm_router
+                    llm_router=llm_router,
+                    on_response=lambda text: raw_responses.__setitem__(STAGE_STEP1, text)
                 )
 
                 try:
                     # Wait max 180 seconds (3 minutes) for LLM preparation
-                    preparation_result = future.result(timeout=180)
+                    preparation_result = _wait_for_llm(db, future, llm_router, analysis, timeout=180)
                 except FuturesTimeoutError:
                     logger.error("Step 1 preparation timed out after 180 seconds")
                     raise RuntimeError("Preparation timed out - LLM service may be slow or unavailable. Please try again.")
 
             logger.info(f"Step 1 completed: {preparation_result.get('agreement_type', 'Unknown')}")
 
+        except TRANSIENT_ERRORS + CANCELLATION_ERRORS:
+            # Retried by the task (resuming at this stage), or cancelled:
+            # the speculative Step 2 must not keep running meanwhile
+            if speculation is not None:
+                speculation.discard()
+            raise
         except Exception as e:
             logger.error(f"Step 1 preparation failed: {e}", exc_info=True)
+            step1_failed = True
 
             # Send error event to SSE
             create_event(
@@ -331,9 +793,15 @@ def analyze_contract_task(
                 data={"step": "preparation", "progress": 35, "error": str(e)}
             )
 
-        # Store directly as dict (JSON column)
+        # Store directly as dict (JSON column); a fallback is not a checkpoint
         analysis.preparation_result = preparation_result
-        db.commit()
+        _save_checkpoint(
+            db,
+            analysis,
+            None if step1_failed else STAGE_STEP1,
+            raw_responses=raw_responses,
+            prompt_version=prompt_version()
+        )
 
         create_event(
             db,
@@ -343,7 +811,21 @@ def analyze_contract_task(
             data={"step": "preparation", "progress": 40, "result": preparation_result}
         )
 
-        # ===== STEP 2: Contract Analysis =====
+    _raise_if_cancelled(db, analysis)
+
+    # ===== STEP 2: Contract Analysis =====
+    if combined is not None:
+        analysis_result = combined[1]
+    elif STAGE_STEP2 in completed:
+        analysis_result = analysis.analysis_result
+        create_event(
+            db,
+            analysis.id,
+            event_type="progress",
+            message="Contract analysis restored from checkpoint",
+            data={"step": "analysis", "progress": 65, "result": analysis_result}
+        )
+    else:
         create_event(
             db,
             analysis.id,
@@ -352,34 +834,47 @@ def analyze_contract_task(
             data={"step": "analysis", "progress": 45}
         )
 
+        step2_failed = False
         try:
-            # Run Step 2 analysis with LLM (reuse llm_router from Step 1)
-            if 'llm_router' not in locals():
-                llm_router = LLMRouter()
-
-            # Use ThreadPoolExecutor to enforce hard timeout on LLM call
-            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
-
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(
-                    run_step2_analysis,
-                    contract_text=contract_text_for_llm,  # ⚠️ IMPORTANT: Use redacted text, not original
-                    preparation_data=preparation_result,
-                    llm_router=llm_router,
-                    output_language=output_language  # Pass output language for bilingual quotes
-                )
-
-                try:
-                    # Wait max 180 seconds (3 minutes) for LLM analysis
-                    analysis_result = future.result(timeout=180)
-                except FuturesTimeoutError:
-                    logger.error("Step 2 analysis timed out after 180 seconds")
-                    raise RuntimeError("Analysis timed out - LLM service may be slow or unavailable. Please try again.")
+            analysis_result = None
+            if speculation is not None:
+                analysis_result = _speculative_step2_result(db, analysis, speculation, preparation_result)
+                if analysis_result is not None:
+                    raw_responses[STAGE_STEP2] = speculation.raw_response
+                else:
+                    # Discarding may have aborted the shared router
+                    llm_router = None
+
+            if analysis_result is None:
+                # Run Step 2 analysis with LLM (reuse llm_router from Step 1)
+                if llm_router is None:
+                    llm_router = LLMRouter(cancel_check=lambda: is_cancelled(analysis.id))
+
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    future = executor.submit(
+                        run_step2_analysis,
+                        contract_text=contract_text_for_llm,  # ⚠️ IMPORTANT: Use redacted text, not original
+                        preparation_data=preparation_result,
+                        llm_router=llm_router,
+                        output_language=output_language,  # Pass output language for bilingual quotes
+                        on_response=lambda text: raw_responses.__setitem__(STAGE_STEP2, text)
+                    )
+
+                    try:
+                        # Wait max 180 seconds (3 minutes) for LLM analysis
+                        analysis_result = _wait_for_llm(db, future, llm_router, analysis, timeout=180)
+                    except FuturesTimeoutError:
+                        logger.error("Step 2 analysis timed out after 180 seconds")
+                        raise RuntimeError("Analysis timed out - LLM service may be slow or unavailable. Please try again.")
 
             logger.info(f"Step 2 completed: Found {len(analysis_result.get('obligations', []))} obligations, {len(analysis_result.get('risks', []))} risks")
 
+        except TRANSIENT_ERRORS + CANCELLATION_ERRORS:
+            # Retried by the task (resuming at this stage), or cancelled
+            raise
         except Exception as e:
             logger.error(f"Step 2 analysis failed: {e}", exc_info=True)
+            step2_failed = True
 
             # Send error event to SSE
             create_event(
@@ -406,9 +901,14 @@ def analyze_contract_task(
                 data={"step": "analysis", "progress": 60, "error": str(e)}
             )
 
-        # Store directly as dict (JSON column)
+        # Store directly as dict (JSON column); a fallback is not a checkpoint
         analysis.analysis_result = analysis_result
-        db.commit()
+        _save_checkpoint(
+            db,
+            analysis,
+            None if step2_failed else STAGE_STEP2,
+            raw_responses=raw_responses
+        )
 
         create_event(
             db,
@@ -418,225 +918,324 @@ def analyze_contract_task(
             data={"step": "analysis", "progress": 65, "result": analysis_result}
         )
 
-        # ===== STEP 3: Format Output =====
-        create_event(
-            db,
-            analysis.id,
-            event_type="progress",
-            message="Formatting results",
-            data={"step": "formatting", "progress": 85}
-        )
+    # ===== STEP 3: Format Output =====
+    create_event(
+        db,
+        analysis.id,
+        event_type="progress",
+        message="Formatting results",
+        data={"step": "formatting", "progress": 85}
+    )
 
-        # TODO: Import and use formatter from prototype
-        # from prototype.src.formatter import format_analysis
-        # formatted_output = format_analysis(preparation_result, analysis_result, output_language)
-
-        # Create structured JSON output
-        formatted_output = {
-            "agreement_type": {
-                "title": "Agreement Type",
-                "content": preparation_result['agreement_type']
-            },
-            "parties": {
-                "title": "Parties",
-                "content": preparation_result['parties'] if preparation_result['parties'] else ["Not specified"]
-            },
-            "jurisdiction": {
-                "title": "Jurisdiction",
-                "content": preparation_result['jurisdiction']
-            },
-            "obligations": {
-                "title": "Your Obligations",
-                "content": analysis_result['obligations'] if analysis_result['obligations'] else ["No obligations identified"]
-            },
-            "rights": {
-                "title": "Your Rights",
-                "content": analysis_result['rights'] if analysis_result['rights'] else ["No rights identified"]
-            },
-            "risks": {
-                "title": "Risks & Concerns",
-                "content": analysis_result['risks'] if analysis_result['risks'] else ["No risks identified"]
-            },
-            "payment_terms": {
-                "title": "Payment Terms",
-                "content": analysis_result.get('payment_terms', {})
-            },
-            "suggestions": {
-                "title": "Suggested Changes",
-                "content": analysis_result.get('suggestions', [])
-            },
-            "mitigations": {
-                "title": "Risk Mitigations",
-                "content": analysis_result.get('mitigations', [])
-            },
-            "calendar": {
-                "title": "Key Dates & Deadlines",
-                "content": analysis_result.get('calendar', [])
-            },
-            "about_summary": analysis_result.get('about_summary', '')
-        }
+    # TODO: Import and use formatter from prototype
+    # from prototype.src.formatter import format_analysis
+    # formatted_output = format_analysis(preparation_result, analysis_result, output_language)
+
+    # Create structured JSON output
+    formatted_output = {
+        "agreement_type": {
+            "title": "Agreement Type",
+            "content": preparation_result['agreement_type']
+        },
+        "parties": {
+            "title": "Parties",
+            "content": preparation_result['parties'] if preparation_result['parties'] else ["Not specified"]
+        },
+        "jurisdiction": {
+            "title": "Jurisdiction",
+            "content": preparation_result['jurisdiction']
+        },
+        "obligations": {
+            "title": "Your Obligations",
+            "content": analysis_result['obligations'] if analysis_result['obligations'] else ["No obligations identified"]
+        },
+        "rights": {
+            "title": "Your Rights",
+            "content": analysis_result['rights'] if analysis_result['rights'] else ["No rights identified"]
+        },
+        "risks": {
+            "title": "Risks & Concerns",
+            "content": analysis_result['risks'] if analysis_result['risks'] else ["No risks identified"]
+        },
+        "payment_terms": {
+            "title": "Payment Terms",
+            "content": analysis_result.get('payment_terms', {})
+        },
+        "suggestions": {
+            "title": "Suggested Changes",
+            "content": analysis_result.get('suggestions', [])
+        },
+        "mitigations": {
+            "title": "Risk Mitigations",
+            "content": analysis_result.get('mitigations', [])
+        },
+        "calendar": {
+            "title": "Key Dates & Deadlines",
+            "content": analysis_result.get('calendar', [])
+        },
+        "about_summary": analysis_result.get('about_summary', '')
+    }
+
+    # Calculate and store screening result
+    llm_screening = analysis_result.get('screening_result', 'recommended_to_address')
+    quality_score_value = preparation_result.get('quality_score', quality_score)  # Use calculated quality_score
+    coverage_score_value = preparation_result.get('coverage_score', coverage)  # Use calculated coverage
+
+    final_screening = determine_final_screening_result(
+        llm_screening,
+        quality_score_value,
+        coverage_score_value
+    )
 
-        # Calculate and store screening result
-        llm_screening = analysis_result.get('screening_result', 'recommended_to_address')
-        quality_score_value = preparation_result.get('quality_score', quality_score)  # Use calculated quality_score
-        coverage_score_value = preparation_result.get('coverage_score', coverage)  # Use calculated coverage
+    # Calculate confidence level using quality module
+    confidence, should_proceed = compute_confidence_level(quality_score_value)
 
-        final_screening = determine_final_screening_result(
-            llm_screening,
-            quality_score_value,
-            coverage_score_value
-        )
+    logger.info(f"Confidence level: {confidence} (quality: {quality_score_value:.2f}, screening: {final_screening})")
 
-        # Calculate confidence level using quality module
-        confidence, should_proceed = compute_confidence_level(quality_score_value)
-
-        logger.info(f"Confidence level: {confidence} (quality: {quality_score_value:.2f}, screening: {final_screening})")
-
-        # Store quality metrics to database
-        analysis.screening_result = final_screening
-        analysis.quality_score = int(quality_score_value * 100)  # Convert 0.9 -> 90
-        analysis.confidence_level = confidence
-
-        # Store directly as dict (JSON column)
-        analysis.formatted_output = formatted_output
-
-        # ===== ELI5: Generate Simplified Version =====
-        # OPTIMIZATION: Disabled pre-generation to speed up analysis by 50%
-        # ELI5 is now generated on-demand via /api/analyses/{id}/simplify endpoint
-        # This reduces analysis time from ~60s to ~30s
-        #
-        # To re-enable pre-generation (adds 15-30s to analysis):
-        # Uncomment the code below
-        #
-        # create_event(
-        #     db,
-        #     analysis.id,
-        #     event_type="progress",
-        #     message="Generating simplified version (ELI5)",
-        #     data={"step": "eli5", "progress": 90}
-        # )
-        #
-        # try:
-        #     from ..services.llm_analysis.eli5_service import simplify_full_analysis
-        #
-        #     # Generate ELI5 simplified version
-        #     simplified_output = simplify_full_analysis(
-        #         analysis_result=formatted_output,
-        #         sections_to_simplify=['obligations', 'rights', 'risks', 'mitigations', 'about_summary']
-        #     )
-        #
-        #     # Store ELI5 version
-        #     analysis.formatted_output_eli5 = simplified_output
-        #     logger.info("ELI5 simplified version generated successfully")
-        #
-        #     create_event(
-        #         db,
-        #         analysis.id,
-        #         event_type="progress",
-        #         message="Simplified version ready",
-        #         data={"step": "eli5", "progress": 95}
-        #     )
-        # except Exception as e:
-        #     logger.error(f"ELI5 generation failed: {e}", exc_info=True)
-        #     # Don't fail the whole analysis if ELI5 fails
-        #     create_event(
-        #         db,
-        #         analysis.id,
-        #         event_type="progress",
-        #         message=f"Note: Simplified version not available",
-        #         data={"step": "eli5", "progress": 95, "error": str(e)}
-        #     )
-
-        logger.info("ELI5 pre-generation skipped (on-demand mode enabled)")
-
-        analysis.status = "succeeded"
-        analysis.completed_at = datetime.utcnow()
-        db.commit()
+    # Store quality metrics to database
+    analysis.screening_result = final_screening
+    analysis.quality_score = int(quality_score_value * 100)  # Convert 0.9 -> 90
+    analysis.confidence_level = confidence
 
-        # Extract and store deadlines
-        try:
-            from ..services.deadline_service import extract_deadlines_from_analysis
-            deadlines = extract_deadlines_from_analysis(
-                analysis_id=analysis.id,
-                contract_id=analysis.contract_id,
-                user_id=contract.user_id,
-                analysis_result=analysis_result,
-                db=db
-            )
-            logger.info(f"Extracted {len(deadlines)} deadlines from analysis")
-        except Exception as e:
-            logger.error(f"Failed to extract deadlines: {e}", exc_info=True)
-            # Don't fail the whole analysis if deadline extraction fails
+    # Store directly as dict (JSON column)
+    analysis.formatted_output = formatted_output
 
-        # Create final event
-        create_event(
-            db,
-            analysis.id,
-            event_type="status_change",
-            message="Analysis completed successfully",
-            data={
-                "status": "succeeded",
-                "progress": 100,
-                "formatted_output": formatted_output
-            }
-        )
+    # ELI5 is not generated here (it doubled the analysis time): it is
+    # pre-generated in the background once the analysis succeeded, when the
+    # LLM queue is idle (tasks/eli5.py), or on demand via /simplify
+    db.commit()
+    _raise_if_cancelled(db, analysis)
 
-        return {
-            "analysis_id": str(analysis.id),
+    # Extract and store deadlines (replacing those of an earlier attempt)
+    try:
+        from ..services.deadline_service import extract_deadlines_from_analysis
+        db.query(Deadline).filter(Deadline.analysis_id == analysis.id).delete(synchronize_session=False)
+        deadlines = extract_deadlines_from_analysis(
+            analysis_id=analysis.id,
+            contract_id=analysis.contract_id,
+            user_id=contract.user_id,
+            analysis_result=analysis_result,
+            db=db
+        )
+        logger.info(f"Extracted {len(deadlines)} deadlines from analysis")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to extract deadlines: {e}", exc_info=True)
+        # Don't fail the whole analysis if deadline extraction fails
+
+    if not _set_status(db, analysis, status="succeeded", completed_at=datetime.utcnow()):
+        raise AnalysisCancelled()
+
+    # Create final event
+    create_event(
+        db,
+        analysis.id,
+        event_type="status_change",
+        message="Analysis completed successfully",
+        data={
             "status": "succeeded",
-            "preparation_result": preparation_result,
-            "analysis_result": analysis_result
+            "progress": 100,
+            "formatted_output": formatted_output
         }
+    )
 
-    except Exception as e:
-        # Handle errors
-        error_message = str(e)
-        error_traceback = traceback.format_exc()
-
-        # Update analysis status
-        if 'analysis' in locals() and analysis:
-            analysis.status = "failed"
-            analysis.error_message = error_message
-            analysis.error_traceback = error_traceback
-            analysis.completed_at = datetime.utcnow()
-            db.commit()
+    from .eli5 import schedule_eli5_pregeneration
+    schedule_eli5_pregeneration(str(analysis.id))
+
+    return {
+        "analysis_id": str(analysis.id),
+        "status": "succeeded",
+        "preparation_result": preparation_result,
+        "analysis_result": analysis_result
+    }
+
+
+def _fail_analysis(db: Session, analysis: Optional[Analysis], error: Exception) -> None:
+    """Mark the analysis failed and notify the SSE stream"""
+    if analysis is None:
+        return
+
+    error_message = str(error)
+    error_traceback = traceback.format_exc()
+
+    db.rollback()
+    if not _set_status(
+        db,
+        analysis,
+        status="failed",
+        error_message=error_message,
+        error_traceback=error_traceback,
+        completed_at=datetime.utcnow()
+    ):
+        # Cancelled meanwhile: the cancellation stands
+        return
+
+    # Create error event
+    create_event(
+        db,
+        analysis.id,
+        event_type="error",
+        message=f"Analysis failed: {error_message}",
+        data={"status": "failed", "error": error_message}
+    )
 
-            # Create error event
-            create_event(
-                db,
-                analysis.id,
-                event_type="error",
-                message=f"Analysis failed: {error_message}",
-                data={"status": "failed", "error": error_message}
-            )
 
+def _cancelled(db: Session, analysis: Optional[Analysis]) -> Dict[str, Any]:
+    """Stop a cancelled analysis (the cancel endpoint already notified the SSE stream)"""
+    db.rollback()
+    if analysis is not None and analysis.status != "cancelled":
+        # Cancelled while this task was marking it running
+        analysis.status = "cancelled"
+        analysis.completed_at = analysis.completed_at or datetime.utcnow()
+        db.commit()
+    logger.info(f"Analysis {analysis.id if analysis else '?'} cancelled, stopping")
+    return {"analysis_id": str(analysis.id) if analysis else None, "status": "cancelled"}
+
+
+def _retry_or_fail(task: Task, db: Session, analysis: Optional[Analysis], error: Exception) -> None:
+    """
+    Retry transient failures (resuming from the last checkpoint), otherwise
+    mark the analysis failed
+
+    Raises celery.exceptions.Retry when a retry is scheduled.
+    """
+    if isinstance(error, TRANSIENT_ERRORS) and task.request.retries < task.max_retries:
+        db.rollback()
+        logger.warning(f"Transient failure in {task.name}, retrying: {error!r}")
+        if analysis is not None:
+            try:
+                create_event(
+                    db,
+                    analysis.id,
+                    event_type="progress",
+                    message="Temporary problem, retrying from the last completed step",
+                    data={"retry": task.request.retries + 1, "error": str(error)}
+                )
+            except Exception:
+                db.rollback()
+        raise task.retry(exc=error, countdown=settings.ANALYSIS_RETRY_DELAY)
+
+    _fail_analysis(db, analysis, error)
+
+
+# acks_late + reject_on_worker_lost: a message is acknowledged only once the
+# task finished, so work lost with a crashed worker is redelivered (on Redis
+# after the visibility timeout) and resumes from the checkpoints.
+ANALYSIS_TASK_OPTIONS = {
+    "bind": True,
+    "base": DatabaseTask,
+    "acks_late": True,
+    "reject_on_worker_lost": True,
+    "max_retries": settings.ANALYSIS_MAX_RETRIES,
+}
+
+
+@celery_app.task(name="analyze_contract", **ANALYSIS_TASK_OPTIONS)
+def analyze_contract_task(
+    self,
+    analysis_id: str,  # ✅ BUG FIX: Receive analysis_id instead of contract_id
+    output_language: str = "english"
+) -> Dict[str, Any]:
+    """
+    Analyze a contract asynchronously, all stages in this task.
+
+    ✅ BUG FIX APPLIED:
+    - This task now receives analysis_id (not contract_id)
+    - It fetches the existing Analysis record (doesn't create a new one)
+    - This ensures the SSE stream polls for events with the correct analysis_id
+
+    The API dispatches prepare_contract -> llm_analysis instead (see
+    tasks/dispatch.py); this task is kept for direct runs (benchmarks, scripts).
+
+    Args:
+        analysis_id: UUID of the Analysis record (created by API endpoint)
+        output_language: Language for output (default: "english")
+
+    Returns:
+        Dict with analysis results
+    """
+    db = self.session
+    analysis = None
+
+    try:
+        analysis, contract = _load_analysis(db, analysis_id)
+        if analysis.status in FINISHED_STATUSES:
+            return _finished_result(analysis)
+        if not _mark_running(db, analysis, self.name):
+            return _finished_result(analysis)
+        prepared = _prepare_document(db, analysis, contract)
+        return _run_llm_stages(db, analysis, contract, prepared, output_language)
+    except CANCELLATION_ERRORS:
+        return _cancelled(db, analysis)
+    except Exception as e:
+        _retry_or_fail(self, db, analysis, e)
         # Re-raise for Celery error handling
         raise
 
 
-@celery_app.task(name="cleanup_old_analyses")
-def cleanup_old_analyses():
+@celery_app.task(name="prepare_contract", **ANALYSIS_TASK_OPTIONS)
+def prepare_contract_task(
+    self,
+    analysis_id: str,
+    output_language: str = "english"
+) -> Dict[str, Any]:
     """
-    Periodic task to clean up old analysis records.
+    CPU stage of an analysis (queue "cpu", prefork pool).
 
-    This can be scheduled with Celery Beat to run daily.
+    Args:
+        analysis_id: UUID of the Analysis record (created by API endpoint)
+        output_language: Language for output, passed on to the LLM stage
+
+    Returns:
+        Input for llm_analysis_task (chained by dispatch_analysis)
     """
-    db = SessionLocal()
+    db = self.session
+    analysis = None
+
     try:
-        # Delete analyses older than 30 days
-        from datetime import timedelta
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
+        analysis, contract = _load_analysis(db, analysis_id)
+        if analysis.status in FINISHED_STATUSES:
+            # llm_analysis sees the status and returns right away
+            return {"analysis_id": analysis_id, "output_language": output_language}
+        if not _mark_running(db, analysis, self.name):
+            # llm_analysis sees the status and returns right away
+            return {"analysis_id": analysis_id, "output_language": output_language}
+        prepared = _prepare_document(db, analysis, contract)
+    except CANCELLATION_ERRORS:
+        # llm_analysis sees the status and returns right away
+        _cancelled(db, analysis)
+        return {"analysis_id": analysis_id, "output_language": output_language}
+    except Exception as e:
+        _retry_or_fail(self, db, analysis, e)
+        raise
 
-        deleted_count = db.query(Analysis).filter(
-            Analysis.created_at < cutoff_date,
-            Analysis.status.in_(["succeeded", "failed"])
-        ).delete()
+    prepared.update(analysis_id=analysis_id, output_language=output_language)
+    return prepared
 
-        db.commit()
 
-        return {
-            "deleted_count": deleted_count,
-            "cutoff_date": cutoff_date.isoformat()
-        }
-    finally:
-        db.close()
+@celery_app.task(name="llm_analysis", **ANALYSIS_TASK_OPTIONS)
+def llm_analysis_task(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LLM stage of an analysis (queue "llm", threads pool).
+
+    Args:
+        prepared: Result of prepare_contract_task
+
+    Returns:
+        Dict with analysis results
+    """
+    db = self.session
+    analysis = None
+
+    try:
+        analysis, contract = _load_analysis(db, prepared["analysis_id"])
+        if analysis.status in FINISHED_STATUSES:
+            return _finished_result(analysis)
+        if not _count_attempt(db, analysis, self.name):
+            return _finished_result(analysis)
+        return _run_llm_stages(db, analysis, contract, prepared, prepared["output_language"])
+    except CANCELLATION_ERRORS:
+        return _cancelled(db, analysis)
+    except Exception as e:
+        _retry_or_fail(self, db, analysis, e)
+        raise
@@ -0,0 +1,50 @@
+"""
+Celery tasks for multi-document batches (see tasks/dispatch.py).
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+import logging
+import uuid
+
+from sqlalchemy import func
+
+from ..celery_app import celery_app
+from ..database import SessionLocal
+from ..models import Analysis, AnalysisBatch
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="finalize_batch")
+def finalize_batch_task(batch_id: str) -> Dict[str, Any]:
+    """
+    Chord callback: record that every document of a batch finished
+
+    Args:
+        batch_id: UUID of the AnalysisBatch record
+
+    Returns:
+        Dict of analysis status -> count
+    """
+    db = SessionLocal()
+    try:
+        batch = db.query(AnalysisBatch).filter(AnalysisBatch.id == uuid.UUID(batch_id)).first()
+        if batch is None:
+            logger.warning(f"Batch {batch_id} not found")
+            return {}
+
+        counts = dict(
+            db.query(Analysis.status, func.count())
+            .filter(Analysis.batch_id == batch.id)
+            .group_by(Analysis.status)
+            .all()
+        )
+        if batch.completed_at is None:
+            batch.completed_at = datetime.utcnow()
+            db.commit()
+
+        logger.info(f"Batch {batch_id} finished: {counts}")
+        return counts
+    finally:
+        db.close()
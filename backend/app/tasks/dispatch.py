@@ -0,0 +1,170 @@
+"""
+Analysis dispatch: queue routing and priority.
+
+Each analysis runs as a chain of two tasks on separate queues, so each
+worker pool can be scaled on its own bottleneck:
+- "cpu": prepare_contract (text extraction/OCR, PII redaction) on a
+  prefork pool, concurrency ~ CPU cores
+- "llm": llm_analysis (LLM calls, waiting on the network) on a threads
+  pool with high concurrency
+
+Priority favours premium users and small documents, so a 2-page premium
+analysis doesn't wait behind a 100-page OCR job. Values follow the Redis
+transport: 0 is the highest priority, 9 the lowest.
+
+Batches (POST /batches) run on their own "batch" queue, served by a small
+worker pool: however many documents a customer submits, at most that many
+of them are in flight (LLM calls included), and interactive analyses on
+"cpu"/"llm" are not held up behind them. Within the batch queue, later
+documents of a large batch get a lower priority, so a small batch submitted
+meanwhile is not stuck behind all of it.
+
+Task IDs are derived from the analysis ID, so the tasks of an analysis can
+be revoked (POST /analyses/{id}/cancel) without storing them anywhere.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from celery import chain, chord
+from celery.result import AsyncResult
+
+from ..celery_app import celery_app
+from .analyze_contract import prepare_contract_task, llm_analysis_task
+from .batches import finalize_batch_task
+
+logger = logging.getLogger(__name__)
+
+QUEUE_CPU = "cpu"
+QUEUE_LLM = "llm"
+QUEUE_BATCH = "batch"
+
+TIER_PRIORITY = {"premium": 0, "free": 4}
+
+# (max pages, added priority); larger documents get +4
+SIZE_PRIORITY = ((5, 0), (20, 1), (50, 2))
+LARGE_DOCUMENT_PRIORITY = 4
+
+# Page estimate when the page count is not known yet (before extraction).
+# Generous on purpose: scanned PDFs are large per page and need OCR.
+APPROX_BYTES_PER_PAGE = 100 * 1024
+
+# Batch documents lose one priority step per this many earlier documents
+BATCH_PRIORITY_STEP = 10
+
+
+def analysis_priority(tier: str, page_count: Optional[int] = None, file_size: Optional[int] = None) -> int:
+    """
+    Celery priority for an analysis (0 = highest)
+
+    Args:
+        tier: User tier ("free" or "premium")
+        page_count: Page count, if already extracted
+        file_size: File size in bytes, used when page_count is unknown
+
+    Returns:
+        Priority between 0 and 9
+    """
+    pages = page_count if page_count else (file_size or 0) // APPROX_BYTES_PER_PAGE + 1
+
+    size_priority = LARGE_DOCUMENT_PRIORITY
+    for max_pages, priority in SIZE_PRIORITY:
+        if pages <= max_pages:
+            size_priority = priority
+            break
+
+    return min(9, TIER_PRIORITY.get(tier, TIER_PRIORITY["free"]) + size_priority)
+
+
+def analysis_task_ids(analysis_id: str) -> Tuple[str, str]:
+    """Celery task IDs of the prepare_contract and llm_analysis tasks of an analysis"""
+    return f"{analysis_id}-prepare", f"{analysis_id}-llm"
+
+
+def analysis_workflow(
+    analysis_id: str,
+    output_language: str,
+    priority: int,
+    cpu_queue: str = QUEUE_CPU,
+    llm_queue: str = QUEUE_LLM
+) -> chain:
+    """prepare_contract -> llm_analysis signature for an analysis"""
+    prepare_id, llm_id = analysis_task_ids(analysis_id)
+    return chain(
+        prepare_contract_task.si(analysis_id=analysis_id, output_language=output_language).set(
+            queue=cpu_queue, priority=priority, task_id=prepare_id
+        ),
+        llm_analysis_task.s().set(queue=llm_queue, priority=priority, task_id=llm_id),
+    )
+
+
+def dispatch_analysis(
+    analysis_id: str,
+    output_language: str,
+    tier: str,
+    page_count: Optional[int] = None,
+    file_size: Optional[int] = None
+) -> AsyncResult:
+    """
+    Queue prepare_contract -> llm_analysis for an analysis
+
+    Args:
+        analysis_id: UUID of the Analysis record
+        output_language: Language for output
+        tier: Tier of the contract owner
+        page_count: Contract page count, if known
+        file_size: Contract file size in bytes
+
+    Returns:
+        AsyncResult of the last task in the chain
+    """
+    priority = analysis_priority(tier, page_count, file_size)
+    return analysis_workflow(analysis_id, output_language, priority).apply_async()
+
+
+def dispatch_batch(
+    batch_id: str,
+    documents: List[Tuple[str, Optional[int], Optional[int]]],
+    output_language: str,
+    tier: str
+) -> AsyncResult:
+    """
+    Queue a batch: a chord of per-document workflows on the "batch" queue,
+    then finalize_batch
+
+    Args:
+        batch_id: UUID of the AnalysisBatch record
+        documents: (analysis_id, page_count, file_size) per document
+        output_language: Language for output
+        tier: Tier of the batch owner
+
+    Returns:
+        AsyncResult of finalize_batch
+    """
+    header = [
+        analysis_workflow(
+            analysis_id,
+            output_language,
+            min(9, analysis_priority(tier, page_count, file_size) + index // BATCH_PRIORITY_STEP),
+            cpu_queue=QUEUE_BATCH,
+            llm_queue=QUEUE_BATCH
+        )
+        for index, (analysis_id, page_count, file_size) in enumerate(documents)
+    ]
+    # Also called if a document's task fails for good (the chord body is skipped then)
+    finalize = finalize_batch_task.si(batch_id=batch_id)
+    return chord(header)(finalize.on_error(finalize_batch_task.si(batch_id=batch_id)))
+
+
+def revoke_analysis(analysis_id: str) -> None:
+    """
+    Revoke the queued tasks of an analysis
+
+    Workers drop revoked tasks when they receive them. A task that already
+    started is stopped cooperatively instead (see services/analysis_cancellation.py).
+    """
+    try:
+        celery_app.control.revoke(list(analysis_task_ids(analysis_id)))
+    except Exception as e:
+        # Brokers without broadcast support: the tasks still see the status
+        logger.warning(f"Revoking tasks of analysis {analysis_id} failed: {e}")
@@ -0,0 +1,282 @@
+"""
+Celery tasks for ELI5 simplification.
+
+simplify_analysis runs POST /analyses/{id}/simplify as a job on the "llm"
+queue, so API workers never wait on the LLM. There is at most one job per
+analysis at a time (a claim in Redis holding the job ID, see
+services/eli5_generation.py): a request that finds one in flight attaches to
+it and gets its job ID instead of queueing another. Jobs report progress as
+"eli5" analysis events (one per simplified section, then the result), which
+GET /analyses/{id}/simplify/stream relays over SSE.
+
+pregenerate_eli5 is the speculative variant. ELI5 used to be generated
+inside the analysis, which doubled its duration; after an analysis succeeds,
+pregenerate_eli5 is queued on the "llm" queue at the lowest priority so the
+toggle usually finds a cached result. It only uses idle capacity: it is not
+queued, and a queued one backs off, while the "llm" queue has more than
+ELI5_PREGENERATE_MAX_QUEUE messages waiting or the provider's rate-limit
+headroom is below ELI5_PREGENERATE_MIN_HEADROOM or the tokens left in its
+window (where reported) don't cover the job. It holds the same claim,
+so requests arriving meanwhile attach to it.
+"""
+
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, undefer
+
+from ..celery_app import celery_app
+from ..config import settings
+from ..models import Analysis
+from ..services import eli5_generation
+from ..services.llm_analysis.eli5_service import estimate_simplification_tokens, simplify_full_analysis
+from ..services.llm_analysis.llm_router import rate_limit_headroom, rate_limit_remaining_tokens
+from .analyze_contract import DatabaseTask, create_event
+from .dispatch import QUEUE_LLM
+
+logger = logging.getLogger(__name__)
+
+# analysis_events.event_type of simplification progress; data holds the job
+# ID and the SSE event kind ("progress", "section", "status_change", "error")
+ELI5_EVENT_TYPE = "eli5"
+
+# Someone is waiting on an on-demand job: ahead of most analyses
+SIMPLIFY_PRIORITY = 1
+PREGENERATE_PRIORITY = 9
+
+
+def llm_queue_depth() -> Optional[int]:
+    """Messages waiting on the "llm" queue (None if the broker can't tell)"""
+    try:
+        with celery_app.connection_for_read() as connection:
+            with connection.channel() as channel:
+                return channel.queue_declare(queue=QUEUE_LLM, passive=True).message_count
+    except Exception as e:
+        logger.debug(f"Reading the depth of the {QUEUE_LLM} queue failed: {e}")
+        return None
+
+
+def has_idle_capacity(required_tokens: Optional[int] = None) -> bool:
+    """
+    Whether the "llm" queue and the provider's rate limit leave room for speculative work
+
+    Args:
+        required_tokens: Tokens the work would use, checked against the
+            tokens left in the provider's rate-limit window (if reported)
+    """
+    depth = llm_queue_depth()
+    if depth is not None and depth > settings.ELI5_PREGENERATE_MAX_QUEUE:
+        logger.debug(f"No idle capacity: {depth} messages on the {QUEUE_LLM} queue")
+        return False
+    headroom = rate_limit_headroom()
+    if headroom is not None and headroom < settings.ELI5_PREGENERATE_MIN_HEADROOM:
+        logger.debug(f"No idle capacity: {headroom:.0%} rate-limit headroom")
+        return False
+    remaining_tokens = rate_limit_remaining_tokens()
+    if required_tokens and remaining_tokens is not None and remaining_tokens < required_tokens:
+        logger.debug(f"No idle capacity: {remaining_tokens} rate-limit tokens left, {required_tokens} needed")
+        return False
+    return True
+
+
+def dispatch_simplification(analysis_id: str, sections: Optional[List[str]] = None) -> Tuple[str, bool]:
+    """
+    Queue a simplify_analysis job, or attach to the one in flight
+
+    Args:
+        analysis_id: UUID of the Analysis record
+        sections: Sections to simplify (default: all)
+
+    Returns:
+        (job ID, whether it attached to a job already in flight)
+    """
+    job_id = f"{analysis_id}-eli5-{uuid.uuid4().hex[:8]}"
+    # Two attempts: the holder may release its claim between claim() and claimed_by()
+    for _ in range(2):
+        if eli5_generation.claim(analysis_id, job_id):
+            simplify_analysis_task.apply_async(
+                kwargs={"analysis_id": analysis_id, "sections": sections},
+                task_id=job_id,
+                queue=QUEUE_LLM,
+                priority=SIMPLIFY_PRIORITY
+            )
+            return job_id, False
+        holder = eli5_generation.claimed_by(analysis_id)
+        if holder is not None:
+            return holder, True
+    raise RuntimeError(f"Could not claim the simplification of analysis {analysis_id}")
+
+
+def schedule_eli5_pregeneration(analysis_id: str) -> bool:
+    """
+    Queue pregenerate_eli5 for a succeeded analysis, if there is idle capacity
+
+    Never raises: the analysis succeeded whatever happens here.
+
+    Returns:
+        Whether the task was queued
+    """
+    if not settings.ELI5_PREGENERATE:
+        return False
+    try:
+        if not has_idle_capacity():
+            logger.info(f"ELI5 pre-generation for analysis {analysis_id} skipped (no idle capacity)")
+            return False
+        pregenerate_eli5_task.apply_async(
+            kwargs={"analysis_id": analysis_id}, queue=QUEUE_LLM, priority=PREGENERATE_PRIORITY
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Queueing ELI5 pre-generation for analysis {analysis_id} failed: {e}")
+        return False
+
+
+def _job_event(db: Session, analysis_id: uuid.UUID, job_id: str, kind: str, message: str, **data) -> None:
+    create_event(db, analysis_id, ELI5_EVENT_TYPE, message, {"job_id": job_id, "kind": kind, **data})
+
+
+def _load_for_simplification(db: Session, analysis_uuid: uuid.UUID) -> Optional[Analysis]:
+    return db.query(Analysis).options(
+        undefer(Analysis.formatted_output),
+        undefer(Analysis.formatted_output_eli5)
+    ).filter(Analysis.id == analysis_uuid).first()
+
+
+def _simplify_with_events(
+    db: Session,
+    analysis_uuid: uuid.UUID,
+    job_id: str,
+    formatted_output: Dict[str, Any],
+    sections: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    simplify_full_analysis, with an "eli5" event per completed section
+
+    Renews the job's claim at the start and after each section.
+    """
+    eli5_generation.refresh(analysis_uuid, job_id)
+    _job_event(db, analysis_uuid, job_id, "progress", "Simplifying analysis", status="running")
+
+    def on_section(key: str, value: Any) -> None:
+        eli5_generation.refresh(analysis_uuid, job_id)
+        _job_event(db, analysis_uuid, job_id, "section", f"Simplified {key}", section=key, content=value)
+
+    return simplify_full_analysis(
+        analysis_result=formatted_output,
+        sections_to_simplify=sections,
+        use_batch=True,
+        on_section=on_section
+    )
+
+
+def _finish_job(db: Session, analysis_uuid: uuid.UUID, job_id: str, simplified: Dict[str, Any], cached: bool) -> None:
+    _job_event(
+        db, analysis_uuid, job_id, "status_change", "Simplified version ready",
+        status="success", cached=cached, simplified_analysis=simplified
+    )
+
+
+@celery_app.task(name="simplify_analysis", bind=True, base=DatabaseTask, ignore_result=True)
+def simplify_analysis_task(self, analysis_id: str, sections: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    On-demand ELI5 job (queue "llm"), queued by dispatch_simplification
+
+    Args:
+        analysis_id: UUID of the Analysis record
+        sections: Sections to simplify (default: all)
+
+    Returns:
+        Dict with the job outcome
+    """
+    db = self.session
+    job_id = self.request.id
+    analysis_uuid = uuid.UUID(analysis_id)
+
+    try:
+        # Claimed when queued: renew it now the job runs
+        eli5_generation.refresh(analysis_uuid, job_id)
+        analysis = _load_for_simplification(db, analysis_uuid)
+        if analysis is None or analysis.status != "succeeded" or not analysis.formatted_output:
+            if analysis is not None:
+                _job_event(db, analysis_uuid, job_id, "error", "No analysis results to simplify", status="failed")
+            return {"analysis_id": analysis_id, "job_id": job_id, "status": "skipped"}
+
+        if analysis.formatted_output_eli5:
+            # Stored by another job after this one was queued
+            _finish_job(db, analysis_uuid, job_id, analysis.formatted_output_eli5, cached=True)
+            return {"analysis_id": analysis_id, "job_id": job_id, "status": "cached"}
+
+        formatted_output = analysis.formatted_output
+        db.commit()  # Don't hold the connection during the LLM calls
+
+        try:
+            simplified = _simplify_with_events(db, analysis_uuid, job_id, formatted_output, sections)
+            eli5_generation.store_result(analysis_uuid, simplified)
+        except Exception as e:
+            logger.error(f"Simplification job {job_id} failed: {e}", exc_info=True)
+            db.rollback()
+            _job_event(db, analysis_uuid, job_id, "error", f"Simplification failed: {e}", status="failed")
+            return {"analysis_id": analysis_id, "job_id": job_id, "status": "failed"}
+
+        _finish_job(db, analysis_uuid, job_id, simplified, cached=False)
+        return {"analysis_id": analysis_id, "job_id": job_id, "status": "succeeded"}
+    finally:
+        eli5_generation.release(analysis_uuid, job_id)
+
+
+@celery_app.task(
+    name="pregenerate_eli5",
+    bind=True,
+    base=DatabaseTask,
+    ignore_result=True,
+    max_retries=settings.ELI5_PREGENERATE_RETRIES,
+)
+def pregenerate_eli5_task(self, analysis_id: str) -> Dict[str, Any]:
+    """
+    Simplify a succeeded analysis in the background (queue "llm", lowest priority)
+
+    Args:
+        analysis_id: UUID of the Analysis record
+
+    Returns:
+        Dict with the outcome ("stored", "skipped", "in_flight", "busy")
+    """
+    db = self.session
+    job_id = self.request.id
+    analysis_uuid = uuid.UUID(analysis_id)
+
+    analysis = _load_for_simplification(db, analysis_uuid)
+    if analysis is None or analysis.status != "succeeded" or not analysis.formatted_output:
+        return {"analysis_id": analysis_id, "status": "skipped"}
+    if analysis.formatted_output_eli5:
+        return {"analysis_id": analysis_id, "status": "skipped"}
+    formatted_output = analysis.formatted_output
+    db.commit()  # Don't hold the connection during the LLM calls
+
+    if not has_idle_capacity(estimate_simplification_tokens(formatted_output)):
+        if self.request.retries >= self.max_retries:
+            logger.info(f"ELI5 pre-generation for analysis {analysis_id} given up (no idle capacity)")
+            return {"analysis_id": analysis_id, "status": "busy"}
+        raise self.retry(countdown=settings.ELI5_PREGENERATE_RETRY_DELAY)
+
+    if not eli5_generation.claim(analysis_uuid, job_id):
+        # An on-demand job is running
+        return {"analysis_id": analysis_id, "status": "in_flight"}
+
+    try:
+        simplified = _simplify_with_events(db, analysis_uuid, job_id, formatted_output)
+        # An on-demand result stored meanwhile wins
+        stored = eli5_generation.store_result(analysis_uuid, simplified, overwrite=False)
+        _finish_job(db, analysis_uuid, job_id, simplified, cached=False)
+    except Exception as e:
+        # Speculative: requests attached meanwhile are told, nothing else fails
+        logger.warning(f"ELI5 pre-generation for analysis {analysis_id} failed: {e}")
+        db.rollback()
+        _job_event(db, analysis_uuid, job_id, "error", f"Simplification failed: {e}", status="failed")
+        return {"analysis_id": analysis_id, "status": "failed"}
+    finally:
+        eli5_generation.release(analysis_uuid, job_id)
+
+    logger.info(f"ELI5 pre-generated for analysis {analysis_id} (stored: {stored})")
+    return {"analysis_id": analysis_id, "status": "stored" if stored else "skipped"}
@@ -0,0 +1,63 @@
+"""
+Celery tasks for data retention.
+
+analysis_events and audit_logs are partitioned by month, so expiring them is
+a DROP of whole partitions rather than a row-by-row DELETE.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any
+import logging
+
+from ..celery_app import celery_app
+from ..config import settings
+from ..database import SessionLocal
+from ..models import Analysis
+from ..services.partitions import ensure_partitions, drop_expired_partitions
+
+logger = logging.getLogger(__name__)
+
+# Table -> retention in months
+PARTITION_RETENTION = {
+    "analysis_events": lambda: settings.ANALYSIS_EVENTS_RETENTION_MONTHS,
+    "audit_logs": lambda: settings.AUDIT_LOG_RETENTION_MONTHS,
+}
+
+
+@celery_app.task(name="maintain_partitions")
+def maintain_partitions() -> Dict[str, Any]:
+    """
+    Periodic retention task (Celery Beat, daily).
+
+    - Creates the next PARTITION_MONTHS_AHEAD monthly partitions
+    - Drops partitions older than each table's retention
+    - Deletes finished analyses older than ANALYSIS_RETENTION_DAYS in one
+      statement; their events have mostly been dropped with old partitions
+      already, so the FK cascade has little left to do
+    """
+    db = SessionLocal()
+    try:
+        created, dropped = [], []
+        for table, retention in PARTITION_RETENTION.items():
+            created += ensure_partitions(db, table, months_ahead=settings.PARTITION_MONTHS_AHEAD)
+            dropped += drop_expired_partitions(db, table, retention_months=retention())
+
+        cutoff_date = datetime.utcnow() - timedelta(days=settings.ANALYSIS_RETENTION_DAYS)
+        deleted_count = db.query(Analysis).filter(
+            Analysis.created_at < cutoff_date,
+            Analysis.status.in_(["succeeded", "failed", "cancelled"])
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        logger.info(
+            f"Retention: created {len(created)} partitions, dropped {len(dropped)}, "
+            f"deleted {deleted_count} analyses"
+        )
+        return {
+            "partitions_created": created,
+            "partitions_dropped": dropped,
+            "deleted_count": deleted_count,
+            "cutoff_date": cutoff_date.isoformat()
+        }
+    finally:
+        db.close()
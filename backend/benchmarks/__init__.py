@@ -0,0 +1,4 @@
+"""
+Offline benchmark suite
+Runs the analysis pipeline against a synthetic corpus and the fake LLM provider
+"""
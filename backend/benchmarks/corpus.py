@@ -0,0 +1,233 @@
+"""
+Synthetic contract corpus for benchmarks
+
+Generates deterministic lease-style contracts of a given page count as
+plain text, PDF and DOCX. The text contains typical section headings and
+a sprinkling of PII (emails, phones, IBANs, names) so that structure
+detection and PII redaction do realistic work.
+"""
+
+import random
+from pathlib import Path
+from typing import List
+
+from docx import Document
+
+# Roughly one printed page of contract text
+CHARS_PER_PAGE = 2800
+LINE_WIDTH = 90
+LINES_PER_PAGE = 45
+
+SECTION_TITLES = [
+    "Parties", "Definitions", "Term", "Payment", "Deposit", "Obligations",
+    "Rights", "Termination", "Liability", "Confidentiality", "Notice",
+    "Force Majeure", "Assignment", "Dispute Resolution", "Governing Law",
+    "Entire Agreement",
+]
+
+CLAUSES = [
+    "The Tenant shall pay the rent monthly in advance on the first day of each month.",
+    "The Landlord may terminate this Agreement on 14 days notice if the Tenant is in breach.",
+    "The Tenant may terminate this Agreement by giving 30 days written notice to the Landlord.",
+    "The Tenant shall keep the Property in good and clean condition throughout the Term.",
+    "Any dispute arising under this Agreement shall be resolved by arbitration in London.",
+    "This Agreement shall be governed by the laws of England and Wales.",
+    "The deposit of 3,000 GBP shall be held in a government-approved protection scheme.",
+    "Neither party shall be liable for delays caused by events of force majeure.",
+    "The Landlord may review the rent annually with one month notice to the Tenant.",
+    "The Tenant shall not assign or sublet the Property without prior written consent.",
+    "All notices must be delivered in writing to the addresses set out in Schedule 1.",
+    "The parties agree to keep the terms of this Agreement confidential.",
+]
+
+FIRST_NAMES = ["John", "Maria", "Ivan", "Claire", "Petar", "Anna", "David", "Sophie"]
+LAST_NAMES = ["Smith", "Petrovic", "Ivanov", "Dubois", "Jones", "Novak", "Martin", "Brown"]
+
+
+def _pii_sentence(rng: random.Random) -> str:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return f"Contact Mr. {first} {last} at {first.lower()}.{last.lower()}@example.com."
+    if kind == 1:
+        return f"Telephone: +44 20 {rng.randrange(1000, 9999)} {rng.randrange(1000, 9999)}."
+    if kind == 2:
+        return f"Payments to IBAN GB{rng.randrange(10, 99)}NWBK{rng.randrange(10**13, 10**14)}."
+    return f"Signed by Ms. {first} {last}, born 12/03/1985."
+
+
+def generate_contract_text(pages: int, seed: int = 0) -> str:
+    """
+    Generate contract text of approximately `pages` pages
+
+    Args:
+        pages: Target page count
+        seed: RNG seed (same seed and pages give identical text)
+
+    Returns:
+        Contract text
+    """
+    rng = random.Random(seed * 1000 + pages)
+    target_chars = pages * CHARS_PER_PAGE
+
+    parts: List[str] = ["RESIDENTIAL LEASE AGREEMENT", ""]
+    size = sum(len(p) + 1 for p in parts)
+    section = 0
+
+    while size < target_chars:
+        title = SECTION_TITLES[section % len(SECTION_TITLES)]
+        heading = f"{section + 1}. {title}"
+        paragraph_sentences = [rng.choice(CLAUSES) for _ in range(rng.randrange(4, 9))]
+        if rng.random() < 0.5:
+            paragraph_sentences.insert(rng.randrange(len(paragraph_sentences)), _pii_sentence(rng))
+        paragraph = " ".join(paragraph_sentences)
+
+        parts.extend([heading, paragraph, ""])
+        size += len(heading) + len(paragraph) + 3
+        section += 1
+
+    return "\n".join(parts)
+
+
+def _wrap(text: str, width: int = LINE_WIDTH) -> List[str]:
+    lines: List[str] = []
+    for paragraph in text.split("\n"):
+        current = ""
+        for word in paragraph.split(" "):
+            if current and len(current) + 1 + len(word) > width:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        lines.append(current)
+    return lines
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(text: str, path: Path) -> int:
+    """
+    Write text to a minimal, text-based PDF (Helvetica, no dependencies)
+
+    Args:
+        text: Text to lay out
+        path: Output file path
+
+    Returns:
+        Number of pages written
+    """
+    lines = _wrap(text)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[""]]
+
+    # Object numbers: 1 catalog, 2 pages tree, 3 font, then (page, content) pairs
+    objects: List[bytes] = []
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_obj = 4 + index * 2
+        content_obj = page_obj + 1
+        kids.append(f"{page_obj} 0 R")
+
+        stream_lines = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+        stream_lines.extend(f"({_pdf_escape(line)}) '" for line in page_lines)
+        stream_lines.append("ET")
+        stream = "\n".join(stream_lines).encode("latin-1", errors="replace")
+
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>".encode()
+        )
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+
+    header_objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    all_objects = header_objects + objects
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(all_objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(all_objects) + 1}\n".encode()
+    output += b"0000000000 65535 f \n"
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += (
+        f"trailer\n<< /Size {len(all_objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+
+    path.write_bytes(bytes(output))
+    return len(pages)
+
+
+def write_docx(text: str, path: Path) -> int:
+    """
+    Write text to a DOCX file, one paragraph per line
+
+    Args:
+        text: Text to write
+        path: Output file path
+
+    Returns:
+        Number of paragraphs written
+    """
+    document = Document()
+    paragraphs = 0
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+        if line[0].isdigit() and ". " in line[:5]:
+            document.add_heading(line, level=2)
+        else:
+            document.add_paragraph(line)
+        paragraphs += 1
+    document.save(str(path))
+    return paragraphs
+
+
+def build_corpus(output_dir: Path, page_counts: List[int], formats: List[str], seed: int = 0) -> List[dict]:
+    """
+    Generate the benchmark corpus
+
+    Args:
+        output_dir: Directory for generated files
+        page_counts: Page counts to generate (e.g. [1, 10, 50, 200])
+        formats: File formats ("pdf", "docx")
+        seed: RNG seed
+
+    Returns:
+        List of dicts with name, path, format, pages and chars
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    documents = []
+
+    for pages in page_counts:
+        text = generate_contract_text(pages, seed=seed)
+        for fmt in formats:
+            path = output_dir / f"contract_{pages}p.{fmt}"
+            if fmt == "pdf":
+                write_pdf(text, path)
+            elif fmt == "docx":
+                write_docx(text, path)
+            else:
+                raise ValueError(f"Unsupported corpus format: {fmt}")
+
+            documents.append({
+                "name": f"{pages}p.{fmt}",
+                "path": path,
+                "format": fmt,
+                "pages": pages,
+                "chars": len(text),
+            })
+
+    return documents
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Load test for the API and SSE analysis streams.
+
+Each virtual user registers, then in a loop uploads a synthetic contract,
+starts an analysis and holds the /analyses/{id}/stream SSE connection open
+until the analysis finishes. `--concurrency` virtual users run at once, so
+that is also the number of SSE streams held open.
+
+Run it against a local stack that uses the fake LLM provider, e.g.:
+
+    # Terminal 1 - API (SQLite or Postgres)
+    export LLM_PROVIDER=fake FAKE_LLM_LATENCY=2 FAKE_LLM_JITTER=0.5
+    uvicorn app.main:app --workers 1
+
+    # Terminal 2 - Celery worker (same environment)
+    celery -A app.celery_app worker --loglevel=warning
+
+    # Terminal 3
+    python benchmarks/load_test.py --concurrency 50 --iterations 2 --output load.json
+    python benchmarks/load_test.py --concurrency 50 --compare load.json
+
+The report contains request latency percentiles per endpoint, SSE
+time-to-first-event and time-to-completion, analysis throughput, error
+rates and DB pool wait times (from GET /admin/db-pool).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.corpus import generate_contract_text, write_docx, write_pdf
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """Summarize a list of seconds as millisecond percentiles"""
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1) if values else 0.0,
+        "mean_ms": round(statistics.mean(values) * 1000, 1) if values else 0.0,
+    }
+
+
+class LoadTestStats:
+    """Collects measurements from all virtual users"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.error_samples: List[str] = []
+        self.stream_first_event: List[float] = []
+        self.stream_completion: List[float] = []
+        self.stream_events = 0
+        self.analyses_succeeded = 0
+        self.analyses_failed = 0
+        self.open_streams = 0
+        self.max_open_streams = 0
+        self.pool_samples: List[dict] = []
+
+    def record_error(self, endpoint: str, message: str) -> None:
+        self.errors[endpoint] += 1
+        if len(self.error_samples) < 20:
+            self.error_samples.append(f"{endpoint}: {message}")
+
+
+class VirtualUser:
+    """One simulated user: register, then upload -> analyze -> stream in a loop"""
+
+    def __init__(self, client: httpx.AsyncClient, stats: LoadTestStats, contract_file: Path, stream_timeout: float):
+        self.client = client
+        self.stats = stats
+        self.contract_file = contract_file
+        self.stream_timeout = stream_timeout
+        self.token: Optional[str] = None
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record_error(endpoint, f"{type(e).__name__}: {e}")
+            return None
+        self.stats.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.stats.record_error(endpoint, f"HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        return response
+
+    @property
+    def _headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def register(self) -> bool:
+        response = await self._request(
+            "register", "POST", "/api/v1/auth/register",
+            json={"email": f"loadtest-{uuid.uuid4().hex[:12]}@example.com", "password": "LoadTest123!"}
+        )
+        if response is None:
+            return False
+        self.token = response.json()["access_token"]
+        return True
+
+    async def run_iteration(self) -> None:
+        content_type = (
+            "application/pdf" if self.contract_file.suffix == ".pdf"
+            else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
+        response = await self._request(
+            "upload", "POST", "/api/v1/contracts/upload",
+            headers=self._headers,
+            files={"file": (self.contract_file.name, self.contract_file.read_bytes(), content_type)}
+        )
+        if response is None:
+            return
+        contract_id = response.json()["contract_id"]
+
+        response = await self._request(
+            "create_analysis", "POST", "/api/v1/analyses",
+            headers=self._headers,
+            json={"contract_id": contract_id, "output_language": "english"}
+        )
+        if response is None:
+            return
+        analysis_id = response.json()["id"]
+
+        await self.stream(analysis_id)
+
+    async def stream(self, analysis_id: str) -> None:
+        start = time.perf_counter()
+        first_event_at = None
+        final_status = None
+
+        self.stats.open_streams += 1
+        self.stats.max_open_streams = max(self.stats.max_open_streams, self.stats.open_streams)
+        try:
+            async with self.client.stream(
+                "GET", f"/api/v1/analyses/{analysis_id}/stream",
+                headers=self._headers,
+                timeout=httpx.Timeout(self.stream_timeout, connect=10.0)
+            ) as response:
+                if response.status_code >= 400:
+                    self.stats.record_error("stream", f"HTTP {response.status_code}")
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    if first_event_at is None:
+                        first_event_at = time.perf_counter()
+                        self.stats.stream_first_event.append(first_event_at - start)
+                    self.stats.stream_events += 1
+
+                    event = json.loads(line[len("data: "):])
+                    status = event.get("payload", {}).get("status")
+                    if event.get("kind") == "status_change" and status in ("succeeded", "failed"):
+                        final_status = status
+                    elif status == "timeout":
+                        final_status = "timeout"
+        except (httpx.HTTPError, json.JSONDecodeError) as e:
+            self.stats.record_error("stream", f"{type(e).__name__}: {e}")
+            return
+        finally:
+            self.stats.open_streams -= 1
+
+        self.stats.stream_completion.append(time.perf_counter() - start)
+        if final_status == "succeeded":
+            self.stats.analyses_succeeded += 1
+        else:
+            self.stats.analyses_failed += 1
+            self.stats.record_error("analysis", f"{analysis_id} ended with status {final_status}")
+
+
+async def sample_pool(client: httpx.AsyncClient, stats: LoadTestStats, interval: float, stop: asyncio.Event) -> None:
+    """Poll /admin/db-pool while the test runs"""
+    while not stop.is_set():
+        try:
+            response = await client.get("/admin/db-pool", timeout=5.0)
+            if response.status_code == 200:
+                stats.pool_samples.append({"t": time.perf_counter(), **response.json()})
+        except httpx.HTTPError:
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def summarize_pool(samples: List[dict]) -> Optional[dict]:
+    if len(samples) < 2:
+        return None
+    first, last = samples[0], samples[-1]
+    checkouts = last["checkouts"] - first["checkouts"]
+    wait_total = last["wait_total_ms"] - first["wait_total_ms"]
+    return {
+        "pool_size": last["pool_size"],
+        "max_overflow": last["max_overflow"],
+        "max_checked_out": max(s["checked_out"] for s in samples),
+        "max_overflow_used": max(0, max(s["overflow"] for s in samples)),
+        "checkouts": checkouts,
+        "timeouts": last["timeouts"] - first["timeouts"],
+        "wait_avg_ms": round(wait_total / checkouts, 3) if checkouts else 0.0,
+        "wait_max_ms": last["wait_max_ms"],
+    }
+
+
+async def run_load_test(args) -> dict:
+    stats = LoadTestStats()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="legally-load-"))
+    contract_file = work_dir / f"contract_{args.pages}p.{args.format}"
+    text = generate_contract_text(args.pages)
+    if args.format == "pdf":
+        write_pdf(text, contract_file)
+    else:
+        write_docx(text, contract_file)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2 + 10, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.request_timeout) as client:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_pool(client, stats, args.pool_interval, stop))
+
+        async def virtual_user(index: int) -> None:
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up * index / args.concurrency)
+            user = VirtualUser(client, stats, contract_file, args.stream_timeout)
+            if not await user.register():
+                return
+            for _ in range(args.iterations):
+                await user.run_iteration()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(args.concurrency)))
+        duration = time.perf_counter() - start
+
+        stop.set()
+        await sampler
+
+    total_requests = sum(len(v) for v in stats.latencies.values()) + sum(stats.errors.values())
+    total_errors = sum(stats.errors.values())
+    completed = stats.analyses_succeeded + stats.analyses_failed
+
+    return {
+        "config": {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+            "pages": args.pages,
+            "format": args.format,
+            "ramp_up": args.ramp_up,
+        },
+        "duration_s": round(duration, 2),
+        "throughput": {
+            "analyses_per_min": round(completed / duration * 60, 2) if duration else 0.0,
+            "requests_per_s": round(total_requests / duration, 2) if duration else 0.0,
+        },
+        "analyses": {
+            "succeeded": stats.analyses_succeeded,
+            "failed": stats.analyses_failed,
+        },
+        "requests": {endpoint: latency_summary(values) for endpoint, values in sorted(stats.latencies.items())},
+        "streams": {
+            "max_open": stats.max_open_streams,
+            "events_received": stats.stream_events,
+            "time_to_first_event": latency_summary(stats.stream_first_event),
+            "time_to_completion": latency_summary(stats.stream_completion),
+        },
+        "errors": {
+            "total": total_errors,
+            "rate": round(total_errors / total_requests, 4) if total_requests else 0.0,
+            "by_endpoint": dict(stats.errors),
+            "samples": stats.error_samples,
+        },
+        "db_pool": summarize_pool(stats.pool_samples),
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    def delta(current: float, previous: Optional[float]) -> str:
+        if previous in (None, 0):
+            return ""
+        return f"  ({(current / previous - 1):+.0%} vs baseline)"
+
+    print("=" * 78)
+    print(f"Load test: {report['config']['concurrency']} concurrent users x "
+          f"{report['config']['iterations']} iterations against {report['config']['base_url']}")
+    print("=" * 78)
+
+    base_throughput = (baseline or {}).get("throughput", {})
+    print(f"\nDuration: {report['duration_s']}s")
+    print(f"Analyses/min: {report['throughput']['analyses_per_min']}"
+          f"{delta(report['throughput']['analyses_per_min'], base_throughput.get('analyses_per_min'))}")
+    print(f"Requests/s:   {report['throughput']['requests_per_s']}")
+    print(f"Analyses:     {report['analyses']['succeeded']} succeeded, {report['analyses']['failed']} failed")
+
+    print("\nRequest latency:")
+    base_requests = (baseline or {}).get("requests", {})
+    for endpoint, summary in report["requests"].items():
+        previous = base_requests.get(endpoint, {}).get("p95_ms")
+        print(f"   {endpoint:<16} p50 {summary['p50_ms']:>8.1f}ms  p95 {summary['p95_ms']:>8.1f}ms  "
+              f"p99 {summary['p99_ms']:>8.1f}ms  n={summary['count']}{delta(summary['p95_ms'], previous)}")
+
+    streams = report["streams"]
+    base_streams = (baseline or {}).get("streams", {})
+    print(f"\nSSE streams (max open: {streams['max_open']}, events: {streams['events_received']}):")
+    for key in ("time_to_first_event", "time_to_completion"):
+        summary = streams[key]
+        previous = base_streams.get(key, {}).get("p95_ms")
+        print(f"   {key:<20} p50 {summary['p50_ms']:>9.1f}ms  p95 {summary['p95_ms']:>9.1f}ms"
+              f"{delta(summary['p95_ms'], previous)}")
+
+    errors = report["errors"]
+    print(f"\nErrors: {errors['total']} (rate {errors['rate']:.2%}) {errors['by_endpoint'] or ''}")
+    for sample in errors["samples"][:5]:
+        print(f"   - {sample}")
+
+    pool = report["db_pool"]
+    if pool:
+        print(f"\nDB pool: size {pool['pool_size']} + overflow {pool['max_overflow']}, "
+              f"max checked out {pool['max_checked_out']}, timeouts {pool['timeouts']}")
+        print(f"   checkout wait avg {pool['wait_avg_ms']}ms, max {pool['wait_max_ms']}ms")
+    else:
+        print("\nDB pool: no samples (is GET /admin/db-pool reachable?)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the Legally AI API and SSE streams")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent virtual users / SSE streams")
+    parser.add_argument("--iterations", type=int, default=1, help="Analyses per virtual user")
+    parser.add_argument("--pages", type=int, default=5, help="Pages in the synthetic contract")
+    parser.add_argument("--format", choices=["pdf", "docx"], default="docx", help="Contract file format")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which to start users")
+    parser.add_argument("--request-timeout", type=float, default=30.0, help="Timeout for plain requests")
+    parser.add_argument("--stream-timeout", type=float, default=660.0, help="Read timeout for SSE streams")
+    parser.add_argument("--pool-interval", type=float, default=1.0, help="Seconds between DB pool samples")
+    parser.add_argument("--output", help="Write JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report written to {args.output}")
+
+    return 0 if report["errors"]["total"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
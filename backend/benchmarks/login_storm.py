@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag under a login storm.
+
+Fires a burst of concurrent POST /auth/login requests at the app in-process
+(httpx ASGI transport, throwaway SQLite database) while a ticker coroutine
+measures how late the event loop wakes it up. bcrypt running on the loop
+shows up directly as lag; with the password hashing pool the loop stays
+responsive and excess logins are rejected with 429.
+
+By default both configurations are run, each in its own process because the
+pool size is read at import time:
+- inline: PASSWORD_HASH_WORKERS=0 (bcrypt on the event loop, old behaviour)
+- pool:   PASSWORD_HASH_WORKERS=--workers
+
+Usage:
+    python benchmarks/login_storm.py
+    python benchmarks/login_storm.py --logins 200 --workers 4 --queue 32 --output storm.json
+    python benchmarks/login_storm.py --mode pool   # single configuration
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+EMAIL = "storm@example.com"
+PASSWORD = "StormPassw0rd!"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Milliseconds summary of a list of seconds"""
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 1),
+        "p95_ms": round(percentile(values, 95) * 1000, 1),
+        "p99_ms": round(percentile(values, 99) * 1000, 1),
+        "max_ms": round(max(values, default=0) * 1000, 1),
+    }
+
+
+async def storm(logins: int, tick: float) -> Dict:
+    import httpx
+    from app.database import init_db
+    from app.main import app
+    from app.core.security import get_password_hash_stats
+
+    init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        response.raise_for_status()
+
+        lags: List[float] = []
+        stop = asyncio.Event()
+
+        async def ticker():
+            while not stop.is_set():
+                expected = time.perf_counter() + tick
+                await asyncio.sleep(tick)
+                lags.append(max(0.0, time.perf_counter() - expected))
+
+        async def login():
+            started = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            return response.status_code, time.perf_counter() - started
+
+        ticker_task = asyncio.create_task(ticker())
+        await asyncio.sleep(tick * 5)  # Baseline ticks before the burst
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*[login() for _ in range(logins)])
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        await ticker_task
+
+    statuses: Dict[str, int] = {}
+    for code, _ in results:
+        statuses[str(code)] = statuses.get(str(code), 0) + 1
+    succeeded = [duration for code, duration in results if code == 200]
+
+    return {
+        "workers": int(os.environ.get("PASSWORD_HASH_WORKERS", "0")),
+        "logins": logins,
+        "elapsed_s": round(elapsed, 2),
+        "statuses": statuses,
+        "loop_lag": summarize(lags),
+        "login_latency": summarize(succeeded),
+        "pool": get_password_hash_stats(),
+    }
+
+
+def run_single(args) -> Dict:
+    """Run one configuration in this process"""
+    work_dir = Path(tempfile.mkdtemp(prefix="login-storm-"))
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'storm.db'}"
+    os.environ["UPLOAD_DIR"] = str(work_dir / "uploads")
+    os.environ["USER_CACHE_REDIS"] = "false"
+    os.environ["AUDIT_DURABILITY"] = "sync"
+    os.environ["PASSWORD_HASH_WORKERS"] = "0" if args.mode == "inline" else str(args.workers)
+    os.environ["PASSWORD_HASH_QUEUE"] = str(args.queue)
+    return asyncio.run(storm(args.logins, args.tick))
+
+
+def run_both(args) -> Dict[str, Dict]:
+    """Run inline and pool configurations in separate processes"""
+    reports = {}
+    for mode in ("inline", "pool"):
+        command = [
+            sys.executable, __file__, "--mode", mode, "--json",
+            "--logins", str(args.logins), "--workers", str(args.workers),
+            "--queue", str(args.queue), "--tick", str(args.tick),
+        ]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        reports[mode] = json.loads(output.strip().splitlines()[-1])
+    return reports
+
+
+def print_report(reports: Dict[str, Dict]) -> None:
+    print(f"\n{'':10} {'loop lag p50':>13} {'p99':>9} {'max':>9} {'login p50':>11} {'p95':>9}   statuses")
+    for mode, report in reports.items():
+        lag, login = report["loop_lag"], report["login_latency"]
+        print(
+            f"{mode:10} {lag['p50_ms']:>11.1f}ms {lag['p99_ms']:>7.1f}ms {lag['max_ms']:>7.1f}ms "
+            f"{login['p50_ms']:>9.1f}ms {login['p95_ms']:>7.1f}ms   {report['statuses']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag under a login storm")
+    parser.add_argument("--logins", type=int, default=100, help="Concurrent login requests")
+    parser.add_argument("--workers", type=int, default=4, help="Password hashing pool size (pool mode)")
+    parser.add_argument("--queue", type=int, default=32, help="Waiting hashes before 429 (pool mode)")
+    parser.add_argument("--tick", type=float, default=0.01, help="Ticker interval in seconds")
+    parser.add_argument("--mode", choices=["both", "inline", "pool"], default="both")
+    parser.add_argument("--json", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.mode == "both":
+        reports = run_both(args)
+    else:
+        report = run_single(args)
+        if args.json:
+            print(json.dumps(report))
+            return
+        reports = {args.mode: report}
+
+    print(f"🔐 Login storm: {args.logins} concurrent logins, ticker every {args.tick * 1000:.0f}ms")
+    print_report(reports)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(reports, indent=2))
+        print(f"\n💾 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark harness for the contract analysis pipeline.
+
+Runs entirely without network access:
+- LLM calls go to the fake provider (LLM_PROVIDER=fake)
+- The database is a throwaway SQLite file
+- Documents come from the synthetic corpus (benchmarks/corpus.py)
+
+Stages benchmarked per document:
+- parse            extract_text() on the PDF/DOCX file
+- structure        detect_structure()
+- pii_redaction    redact_pii()
+- language         detect_language()
+- eli5_batch       simplify_full_analysis(use_batch=True) on a canned analysis
+- pipeline         the full analyze_contract_task, split into its
+                   extraction / pii_redaction / preparation / analysis /
+                   formatting stages using the task's own progress events
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --pages 1,10,50,200 --repeat 3 --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --max-regression 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PIPELINE_STEPS = ["extraction", "pii_redaction", "preparation", "analysis", "formatting"]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def configure_environment(work_dir: Path, latency: float, jitter: float, seed: int) -> None:
+    """
+    Point the app at an offline stack. Must run before any `app` import,
+    because settings and the engine are created at import time.
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_dir / 'bench.db'}"
+    os.environ["UPLOAD_DIR"] = str(work_dir / "uploads")
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(latency)
+    os.environ["FAKE_LLM_JITTER"] = str(jitter)
+    os.environ["FAKE_LLM_SEED"] = str(seed)
+    os.environ["DEBUG"] = "False"
+    (work_dir / "uploads").mkdir(parents=True, exist_ok=True)
+
+
+def time_call(func: Callable, repeat: int) -> List[float]:
+    """Run func `repeat` times (after one warm-up call) and return durations in seconds"""
+    func()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(durations) * 1000, 2),
+        "min_ms": round(min(durations) * 1000, 2),
+        "max_ms": round(max(durations) * 1000, 2),
+        "runs": len(durations),
+    }
+
+
+def run_pipeline_once(document: dict, user_id: uuid.UUID) -> Dict[str, float]:
+    """
+    Run analyze_contract_task for one freshly-uploaded contract
+
+    Returns:
+        Dict of stage name -> seconds, plus "total"
+    """
+    import shutil
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.models import Contract, Analysis, AnalysisEvent
+    from app.tasks.analyze_contract import analyze_contract_task
+
+    db = SessionLocal()
+    try:
+        contract_id = uuid.uuid4()
+        suffix = Path(document["path"]).suffix
+        relative_path = f"{user_id}/{contract_id}{suffix}"
+        destination = Path(settings.UPLOAD_DIR) / relative_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(document["path"], destination)
+
+        contract = Contract(
+            id=contract_id,
+            user_id=user_id,
+            filename=Path(document["path"]).name,
+            mime_type="application/octet-stream",
+            file_size=destination.stat().st_size,
+            file_path=relative_path
+        )
+        analysis = Analysis(id=uuid.uuid4(), contract_id=contract_id, status="queued", output_language="english")
+        db.add_all([contract, analysis])
+        db.commit()
+        analysis_id = analysis.id
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    analyze_contract_task(analysis_id=str(analysis_id), output_language="english")
+    total = time.perf_counter() - start
+    analyze_contract_task.after_return()
+
+    # Derive per-stage timings from the task's own progress events
+    db = SessionLocal()
+    try:
+        analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+        if analysis.status != "succeeded":
+            raise RuntimeError(f"Pipeline failed for {document['name']}: {analysis.error_message}")
+
+        events = db.query(AnalysisEvent).filter(
+            AnalysisEvent.analysis_id == analysis_id
+        ).order_by(AnalysisEvent.created_at).all()
+
+        step_starts = {}
+        for event in events:
+            step = (event.data or {}).get("step")
+            if step and step not in step_starts:
+                step_starts[step] = event.created_at
+
+        ordered = sorted(step_starts.items(), key=lambda item: item[1])
+        boundaries = [ts for _, ts in ordered[1:]] + [analysis.completed_at]
+        timings = {
+            step: (end - begin).total_seconds()
+            for (step, begin), end in zip(ordered, boundaries)
+        }
+        timings["total"] = total
+        return timings
+    finally:
+        db.close()
+
+
+def benchmark_document(document: dict, repeat: int, user_id: uuid.UUID) -> Dict[str, dict]:
+    """Benchmark every stage for one document"""
+    from app.services.llm_analysis.parsers import extract_text, detect_structure
+    from app.services.llm_analysis.language import detect_language
+    from app.services.llm_analysis.eli5_service import simplify_full_analysis
+    from app.services.llm_analysis.fake_provider import FAKE_ANALYSIS_RESULT
+    from app.utils.pii_redactor import redact_pii
+
+    results: Dict[str, dict] = {}
+
+    extracted = extract_text(str(document["path"]))
+    text = extracted["text"]
+
+    # Same nested {title, content} shape the task stores in formatted_output
+    formatted_output = {
+        section: {"content": FAKE_ANALYSIS_RESULT[section]}
+        for section in ("obligations", "rights", "risks", "mitigations")
+    }
+    formatted_output["about_summary"] = FAKE_ANALYSIS_RESULT["about_summary"]
+
+    stages = {
+        "parse": lambda: extract_text(str(document["path"])),
+        "structure": lambda: detect_structure(text),
+        "pii_redaction": lambda: redact_pii(text),
+        "language": lambda: detect_language(text),
+        "eli5_batch": lambda: simplify_full_analysis(analysis_result=formatted_output, use_batch=True),
+    }
+
+    for name, func in stages.items():
+        results[name] = summarize(time_call(func, repeat))
+        results[name]["peak_rss_mb"] = peak_rss_mb()
+
+    pipeline_runs = [run_pipeline_once(document, user_id) for _ in range(repeat)]
+    for step in PIPELINE_STEPS + ["total"]:
+        durations = [run[step] for run in pipeline_runs if step in run]
+        if durations:
+            results[f"pipeline.{step}"] = summarize(durations)
+            results[f"pipeline.{step}"]["peak_rss_mb"] = peak_rss_mb()
+
+    return results
+
+
+def compare_to_baseline(current: dict, baseline: dict, max_regression: float) -> List[str]:
+    """
+    Compare median timings against a previous report
+
+    Returns:
+        List of human-readable regression messages (empty if none)
+    """
+    regressions = []
+    for doc_name, stages in current["documents"].items():
+        base_stages = baseline.get("documents", {}).get(doc_name, {})
+        for stage, stats in stages.items():
+            base = base_stages.get(stage)
+            if not base or base["median_ms"] <= 0:
+                continue
+            ratio = stats["median_ms"] / base["median_ms"] - 1
+            if ratio > max_regression:
+                regressions.append(
+                    f"{doc_name} {stage}: {base['median_ms']:.2f}ms -> {stats['median_ms']:.2f}ms (+{ratio:.0%})"
+                )
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print("=" * 78)
+    print(f"Legally AI benchmark  (fake LLM latency {report['config']['latency']}s "
+          f"± {report['config']['jitter']}s, repeat {report['config']['repeat']})")
+    print("=" * 78)
+    for doc_name, stages in report["documents"].items():
+        print(f"\n📄 {doc_name}")
+        for stage, stats in stages.items():
+            print(f"   {stage:<24} median {stats['median_ms']:>10.2f}ms   "
+                  f"min {stats['min_ms']:>10.2f}ms   peak RSS {stats['peak_rss_mb']} MB")
+    print(f"\nPeak RSS (process): {report['peak_rss_mb']} MB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark for the Legally AI analysis pipeline")
+    parser.add_argument("--pages", default="1,10,50,200", help="Comma-separated page counts (default: 1,10,50,200)")
+    parser.add_argument("--formats", default="pdf,docx", help="Comma-separated formats (default: pdf,docx)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake LLM latency in seconds (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fake LLM latency jitter in seconds (default: 0)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for corpus and fake LLM jitter")
+    parser.add_argument("--output", help="Write JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed slowdown vs baseline before failing (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="legally-bench-"))
+    configure_environment(work_dir, args.latency, args.jitter, args.seed)
+
+    # Import the app only after the environment points at the offline stack
+    from benchmarks.corpus import build_corpus
+    from app.database import SessionLocal, init_db
+    from app.models import User
+
+    init_db()
+    db = SessionLocal()
+    try:
+        user = User(id=uuid.uuid4(), email="bench@example.com", hashed_password="x", tier="premium")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+
+    page_counts = [int(p) for p in args.pages.split(",") if p.strip()]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    corpus = build_corpus(work_dir / "corpus", page_counts, formats, seed=args.seed)
+
+    report = {
+        "config": {
+            "pages": page_counts,
+            "formats": formats,
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "documents": {},
+    }
+
+    for document in corpus:
+        print(f"Benchmarking {document['name']} ({document['chars']} chars)...", flush=True)
+        report["documents"][document["name"]] = benchmark_document(document, args.repeat, user_id)
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    print_report(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare_to_baseline(report, baseline, args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.max_regression:.0%}:")
+            for message in regressions:
+                print(f"   - {message}")
+            return 1
+        print(f"\n✅ No regressions above {args.max_regression:.0%} vs {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
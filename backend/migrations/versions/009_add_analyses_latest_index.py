@@ -0,0 +1,28 @@
+"""Add composite index for latest succeeded analysis per contract
+
+Revision ID: 009_analyses_latest_idx
+Revises: 008_add_eli5
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_analyses_latest_idx'
+down_revision = '008_add_eli5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves the contract list's "latest succeeded analysis" lookup
+    op.create_index(
+        'ix_analyses_contract_status_completed',
+        'analyses',
+        ['contract_id', 'status', sa.text('completed_at DESC')]
+    )
+
+
+def downgrade():
+    op.drop_index('ix_analyses_contract_status_completed', table_name='analyses')
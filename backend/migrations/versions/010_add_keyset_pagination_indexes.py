@@ -0,0 +1,27 @@
+"""Add indexes for keyset pagination of contracts, deadlines and feedback
+
+Revision ID: 010_keyset_pagination_idx
+Revises: 009_analyses_latest_idx
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010_keyset_pagination_idx'
+down_revision = '009_analyses_latest_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (sort column, id) per user, matching the list endpoints' ORDER BY
+    op.create_index('ix_contracts_user_uploaded', 'contracts', ['user_id', 'uploaded_at', 'id'])
+    op.create_index('ix_deadlines_user_date', 'deadlines', ['user_id', 'date', 'id'])
+    op.create_index('ix_feedback_user_created', 'feedback', ['user_id', 'created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_feedback_user_created', table_name='feedback')
+    op.drop_index('ix_deadlines_user_date', table_name='deadlines')
+    op.drop_index('ix_contracts_user_uploaded', table_name='contracts')
@@ -0,0 +1,54 @@
+"""Convert analysis result columns to JSONB and add GIN indexes
+
+Revision ID: 011_analysis_results_jsonb
+Revises: 010_keyset_pagination_idx
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011_analysis_results_jsonb'
+down_revision = '010_keyset_pagination_idx'
+branch_labels = None
+depends_on = None
+
+RESULT_COLUMNS = ['preparation_result', 'analysis_result', 'formatted_output', 'formatted_output_eli5']
+
+
+def upgrade():
+    # Some older rows hold the result as a JSON *string* containing the
+    # document (see fix_json_columns.sql); unwrap those while converting
+    for column in RESULT_COLUMNS:
+        op.execute(f"""
+            ALTER TABLE analyses
+            ALTER COLUMN {column} TYPE JSONB
+            USING CASE
+                WHEN {column} IS NULL THEN NULL
+                WHEN json_typeof({column}) = 'string'
+                     AND left(ltrim({column} #>> '{{}}'), 1) IN ('{{', '[')
+                    THEN ({column} #>> '{{}}')::jsonb
+                ELSE {column}::jsonb
+            END
+        """)
+
+    # Containment queries: preparation_result @> '{"agreement_type": "lease"}'
+    op.execute(
+        "CREATE INDEX ix_analyses_preparation_result_gin "
+        "ON analyses USING gin (preparation_result jsonb_path_ops)"
+    )
+    # Risk level queries: (analysis_result -> 'risks') @> '[{"level": "high"}]'
+    op.execute(
+        "CREATE INDEX ix_analyses_risks_gin "
+        "ON analyses USING gin ((analysis_result -> 'risks') jsonb_path_ops)"
+    )
+    op.create_index('ix_analyses_screening_result', 'analyses', ['screening_result'])
+
+
+def downgrade():
+    op.drop_index('ix_analyses_screening_result', table_name='analyses')
+    op.drop_index('ix_analyses_risks_gin', table_name='analyses')
+    op.drop_index('ix_analyses_preparation_result_gin', table_name='analyses')
+
+    for column in RESULT_COLUMNS:
+        op.execute(f"ALTER TABLE analyses ALTER COLUMN {column} TYPE JSON USING {column}::json")
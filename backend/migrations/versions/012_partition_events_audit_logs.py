@@ -0,0 +1,100 @@
+"""Partition analysis_events and audit_logs by month on created_at
+
+Revision ID: 012_partition_events_audit_logs
+Revises: 011_analysis_results_jsonb
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '012_partition_events_audit_logs'
+down_revision = '011_analysis_results_jsonb'
+branch_labels = None
+depends_on = None
+
+# Months of partitions created ahead of now (PARTITION_MONTHS_AHEAD)
+MONTHS_AHEAD = 2
+
+TABLES = {
+    'analysis_events': {
+        'columns': """
+            id UUID NOT NULL,
+            analysis_id UUID NOT NULL REFERENCES analyses(id) ON DELETE CASCADE,
+            event_type VARCHAR(50) NOT NULL,
+            message TEXT,
+            data JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        """,
+        'indexes': ['analysis_id', 'created_at'],
+    },
+    'audit_logs': {
+        'columns': """
+            id UUID NOT NULL,
+            user_id UUID,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            action VARCHAR(100) NOT NULL,
+            resource_type VARCHAR(50) NOT NULL,
+            resource_id UUID,
+            status VARCHAR(20) NOT NULL,
+            details JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            duration_ms INTEGER
+        """,
+        'indexes': ['user_id', 'action', 'resource_id', 'created_at'],
+    },
+}
+
+
+def _convert(table, columns, indexes, partitioned):
+    legacy = f'{table}_legacy'
+
+    # Keep the old table (and its data) under another name while the new one is built
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+
+    if partitioned:
+        op.execute(f"""
+            CREATE TABLE {table} ({columns}, PRIMARY KEY (id, created_at))
+            PARTITION BY RANGE (created_at)
+        """)
+        # One partition per month from the oldest row up to MONTHS_AHEAD months from now
+        op.execute(f"""
+            DO $$
+            DECLARE
+                month DATE;
+                last_month DATE := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+            BEGIN
+                SELECT date_trunc('month', coalesce(min(created_at), now())) INTO month FROM {legacy};
+                WHILE month <= last_month LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+                    );
+                    month := month + interval '1 month';
+                END LOOP;
+            END $$
+        """)
+    else:
+        op.execute(f'CREATE TABLE {table} ({columns}, PRIMARY KEY (id))')
+
+    names = ', '.join(line.split()[0] for line in columns.strip().splitlines())
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+
+    # Index names are free again now the legacy table is gone
+    # (on a partitioned table these cascade to every partition)
+    for column in indexes:
+        op.create_index(f'ix_{table}_{column}', table, [column])
+
+
+def upgrade():
+    for table, spec in TABLES.items():
+        _convert(table, spec['columns'], spec['indexes'], partitioned=True)
+
+
+def downgrade():
+    # Back to plain tables; partitions are dropped along with the parent
+    for table, spec in TABLES.items():
+        _convert(table, spec['columns'], spec['indexes'], partitioned=False)
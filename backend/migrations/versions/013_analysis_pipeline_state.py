@@ -0,0 +1,24 @@
+"""Add pipeline_state checkpoint column to analyses
+
+Revision ID: 013_analysis_pipeline_state
+Revises: 012_partition_events_audit_logs
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '013_analysis_pipeline_state'
+down_revision = '012_partition_events_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('analyses', sa.Column('pipeline_state', postgresql.JSONB(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('analyses', 'pipeline_state')
@@ -0,0 +1,47 @@
+"""Add analysis_batches table and analyses.batch_id
+
+Revision ID: 014_analysis_batches
+Revises: 013_analysis_pipeline_state
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '014_analysis_batches'
+down_revision = '013_analysis_pipeline_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'analysis_batches',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('output_language', sa.String(length=50), nullable=False),
+        sa.Column('document_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_analysis_batches_user_id', 'analysis_batches', ['user_id'])
+
+    op.add_column('analyses', sa.Column('batch_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_analyses_batch_id', 'analyses', 'analysis_batches',
+        ['batch_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index('ix_analyses_batch_id', 'analyses', ['batch_id'])
+
+
+def downgrade():
+    op.drop_index('ix_analyses_batch_id', table_name='analyses')
+    op.drop_constraint('fk_analyses_batch_id', 'analyses', type_='foreignkey')
+    op.drop_column('analyses', 'batch_id')
+
+    op.drop_index('ix_analysis_batches_user_id', table_name='analysis_batches')
+    op.drop_table('analysis_batches')
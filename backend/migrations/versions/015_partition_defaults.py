@@ -0,0 +1,49 @@
+"""Add DEFAULT partitions to analysis_events and audit_logs
+
+Revision ID: 015_partition_defaults
+Revises: 014_analysis_batches
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '015_partition_defaults'
+down_revision = '014_analysis_batches'
+branch_labels = None
+depends_on = None
+
+# Rows no monthly partition covers land here instead of failing the insert;
+# partition maintenance moves them out (services/partitions.py)
+TABLES = ('analysis_events', 'audit_logs')
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f'CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade():
+    # Audit rows are compliance data: move the rows of the default partitions
+    # into monthly partitions (created as needed) before dropping them
+    for table in TABLES:
+        op.execute(f"""
+            DO $$
+            DECLARE
+                month DATE;
+            BEGIN
+                IF to_regclass('{table}_default') IS NULL THEN
+                    RETURN;
+                END IF;
+                -- Detached, so partitions covering its rows can be created
+                ALTER TABLE {table} DETACH PARTITION {table}_default;
+                FOR month IN SELECT DISTINCT date_trunc('month', created_at) FROM {table}_default LOOP
+                    EXECUTE format(
+                        'CREATE TABLE IF NOT EXISTS %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+                    );
+                END LOOP;
+                INSERT INTO {table} SELECT * FROM {table}_default;
+                DROP TABLE {table}_default;
+            END $$
+        """)
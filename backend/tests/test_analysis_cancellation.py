@@ -0,0 +1,154 @@
+"""
+Tests for cancelling analyses: the cancel endpoint, conditional status
+writes and aborting the LLM call in flight (fake LLM provider)
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.api import analyses as analyses_api
+from app.models import Analysis, AnalysisEvent
+from app.services.analysis_cancellation import AnalysisCancelled
+from app.services.llm_analysis.llm_router import LLMCallCancelled, LLMRouter
+from app.tasks import analyze_contract
+
+
+@pytest.fixture
+def revoked(monkeypatch):
+    """Analysis IDs whose Celery tasks the endpoint revoked (no broker here)"""
+    revoked = []
+    monkeypatch.setattr(analyses_api, "revoke_analysis", revoked.append)
+    return revoked
+
+
+def _analysis(db, contract, status):
+    analysis = Analysis(id=uuid.uuid4(), contract_id=contract.id, status=status, output_language="english")
+    db.add(analysis)
+    db.commit()
+    return analysis
+
+
+def _slow_router(latency=5.0):
+    router = LLMRouter(provider="fake")
+    router.client.latency = latency
+    return router
+
+
+@pytest.mark.parametrize("status", ["queued", "running"])
+def test_cancel_marks_the_analysis_cancelled(client, db, contract, revoked, status):
+    analysis = _analysis(db, contract, status)
+
+    response = client.post(f"/api/v1/analyses/{analysis.id}/cancel")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    db.expire_all()
+    assert db.get(Analysis, analysis.id).status == "cancelled"
+    assert db.query(AnalysisEvent).filter(AnalysisEvent.analysis_id == analysis.id).one().data == {"status": "cancelled"}
+    assert revoked == [str(analysis.id)]
+
+
+@pytest.mark.parametrize("status", ["succeeded", "failed", "cancelled"])
+def test_cancel_of_a_finished_analysis_is_a_409(client, db, contract, revoked, status):
+    analysis = _analysis(db, contract, status)
+
+    response = client.post(f"/api/v1/analyses/{analysis.id}/cancel")
+
+    assert response.status_code == 409
+    assert status in response.json()["detail"]
+    db.expire_all()
+    assert db.get(Analysis, analysis.id).status == status
+    assert revoked == []
+
+
+def test_cancel_of_an_unknown_analysis_is_a_404(client, revoked):
+    assert client.post(f"/api/v1/analyses/{uuid.uuid4()}/cancel").status_code == 404
+
+
+def test_set_status_never_overwrites_a_cancellation(db, contract):
+    analysis = _analysis(db, contract, "cancelled")
+
+    assert not analyze_contract._set_status(db, analysis, status="succeeded")
+
+    db.expire_all()
+    assert db.get(Analysis, analysis.id).status == "cancelled"
+
+
+def test_set_status_writes_and_reloads(db, contract):
+    analysis = _analysis(db, contract, "queued")
+
+    assert analyze_contract._set_status(db, analysis, status="running")
+
+    assert analysis.status == "running"
+
+
+def test_raise_if_cancelled_reads_the_database_status(db, contract):
+    analysis = _analysis(db, contract, "running")
+    analyze_contract._raise_if_cancelled(db, analysis)
+
+    db.query(Analysis).filter(Analysis.id == analysis.id).update({"status": "cancelled"})
+    db.commit()
+
+    with pytest.raises(AnalysisCancelled):
+        analyze_contract._raise_if_cancelled(db, analysis)
+
+
+def test_abort_cancels_the_call_in_flight():
+    router = _slow_router()
+    errors = []
+
+    def call():
+        try:
+            router.call("Explain this clause.")
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=call)
+    start = time.monotonic()
+    thread.start()
+    time.sleep(0.1)
+    router.abort()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 2
+    assert len(errors) == 1 and isinstance(errors[0], LLMCallCancelled)
+
+
+def test_aborted_router_refuses_new_calls():
+    router = _slow_router(latency=0)
+    router.abort()
+
+    with pytest.raises(LLMCallCancelled):
+        router.call("Explain this clause.")
+
+
+def test_wait_for_llm_aborts_when_the_analysis_is_cancelled(db, contract, monkeypatch):
+    monkeypatch.setattr(analyze_contract, "CANCEL_POLL_INTERVAL", 0.05)
+    analysis = _analysis(db, contract, "running")
+    router = _slow_router()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(router.call, "Explain this clause.")
+        db.query(Analysis).filter(Analysis.id == analysis.id).update({"status": "cancelled"})
+        db.commit()
+
+        with pytest.raises(AnalysisCancelled):
+            analyze_contract._wait_for_llm(db, future, router, analysis, timeout=10)
+
+        with pytest.raises(LLMCallCancelled):
+            future.result(timeout=2)
+
+
+def test_wait_for_llm_returns_the_result(db, contract):
+    analysis = _analysis(db, contract, "running")
+    router = _slow_router(latency=0)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(router.call, "Explain this clause.")
+
+        assert analyze_contract._wait_for_llm(db, future, router, analysis, timeout=10)
@@ -0,0 +1,211 @@
+"""
+Tests for stage checkpoints: resuming a redelivered or retried analysis,
+discarding checkpoints of a different text, and the attempt limit
+(fake LLM provider, SQLite)
+"""
+
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.models import Analysis, AnalysisEvent
+from app.services.llm_analysis import token_budget
+from app.services.llm_analysis.fake_provider import FAKE_ANALYSIS_RESULT, FAKE_PREPARATION_RESULT
+from app.tasks import analyze_contract
+from app.tasks.analyze_contract import (
+    MAX_TASK_ATTEMPTS,
+    STAGE_PREPARE,
+    STAGE_STEP1,
+    STAGE_STEP2,
+    DatabaseTask,
+    llm_analysis_task,
+)
+
+
+TEXT = "The tenant shall pay rent of 1,500 GBP on the first day of each month."
+
+PREPARED = {"detected_language": "en", "quality_score": 0.9, "coverage": 1.0}
+
+
+@pytest.fixture
+def pipeline(database, monkeypatch):
+    """Tasks run in-process on the test database, LLM calls go to the fake provider"""
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    monkeypatch.setattr(token_budget, "TIKTOKEN_AVAILABLE", False)
+    monkeypatch.setattr(settings, "ELI5_PREGENERATE", False)
+    monkeypatch.setattr(analyze_contract, "SessionLocal", database[0])
+    DatabaseTask._local.session = None
+    yield
+    DatabaseTask._local.session = None
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Names of the LLM stage functions the task called"""
+    calls = []
+    for name in ("run_combined_analysis", "run_step1_preparation", "run_step2_analysis"):
+        def record(*args, _name=name, _run=getattr(analyze_contract, name), **kwargs):
+            calls.append(_name)
+            return _run(*args, **kwargs)
+        monkeypatch.setattr(analyze_contract, name, record)
+    return calls
+
+
+def _running_analysis(db, contract, state, **columns):
+    analysis = Analysis(
+        id=uuid.uuid4(),
+        contract_id=contract.id,
+        status="running",
+        output_language="english",
+        pipeline_state=state,
+        **columns
+    )
+    db.add(analysis)
+    db.commit()
+    return analysis
+
+
+def _run_llm_stage(analysis):
+    try:
+        return llm_analysis_task(
+            {"redacted_text": TEXT, **PREPARED, "analysis_id": str(analysis.id), "output_language": "english"}
+        )
+    finally:
+        llm_analysis_task.after_return()
+
+
+def _reload(db, analysis):
+    db.expire_all()
+    return db.get(Analysis, analysis.id)
+
+
+def test_resumes_at_step2_after_step1_was_checkpointed(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(
+        db,
+        contract,
+        {
+            "text_sha256": analyze_contract._text_hash(TEXT),
+            "prepared": PREPARED,
+            "completed_stages": [STAGE_PREPARE, STAGE_STEP1],
+            "raw_responses": {STAGE_STEP1: "{}"},
+        },
+        preparation_result=FAKE_PREPARATION_RESULT
+    )
+
+    result = _run_llm_stage(analysis)
+
+    assert result["status"] == "succeeded"
+    assert llm_calls == ["run_step2_analysis"]
+    analysis = _reload(db, analysis)
+    assert analysis.analysis_result["screening_result"] == FAKE_ANALYSIS_RESULT["screening_result"]
+    assert analysis.pipeline_state["completed_stages"] == [STAGE_PREPARE, STAGE_STEP1, STAGE_STEP2]
+    assert set(analysis.pipeline_state["raw_responses"]) == {STAGE_STEP1, STAGE_STEP2}
+    messages = [event.message for event in db.query(AnalysisEvent).filter(AnalysisEvent.analysis_id == analysis.id)]
+    assert "Document preparation restored from checkpoint" in messages
+
+
+def test_completed_llm_stages_are_not_run_again(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(
+        db,
+        contract,
+        {
+            "text_sha256": analyze_contract._text_hash(TEXT),
+            "prepared": PREPARED,
+            "completed_stages": [STAGE_PREPARE, STAGE_STEP1, STAGE_STEP2],
+        },
+        preparation_result=FAKE_PREPARATION_RESULT,
+        analysis_result=FAKE_ANALYSIS_RESULT
+    )
+
+    assert _run_llm_stage(analysis)["status"] == "succeeded"
+    assert llm_calls == []
+
+
+def test_checkpoints_of_a_different_text_are_discarded(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(
+        db,
+        contract,
+        {
+            "text_sha256": analyze_contract._text_hash("An earlier redaction of the text."),
+            "prepared": PREPARED,
+            "completed_stages": [STAGE_PREPARE, STAGE_STEP1, STAGE_STEP2],
+            "raw_responses": {STAGE_STEP1: "{}", STAGE_STEP2: "{}"},
+        },
+        preparation_result={"agreement_type": "stale"},
+        analysis_result={"risks": []}
+    )
+
+    result = _run_llm_stage(analysis)
+
+    # Short text: both steps run again, in one combined call
+    assert result["status"] == "succeeded"
+    assert llm_calls == ["run_combined_analysis"]
+    analysis = _reload(db, analysis)
+    assert analysis.preparation_result["agreement_type"] == FAKE_PREPARATION_RESULT["agreement_type"]
+    assert analysis.pipeline_state["text_sha256"] == analyze_contract._text_hash(TEXT)
+    assert set(analysis.pipeline_state["raw_responses"]) == {analyze_contract.RAW_COMBINED}
+
+
+def test_check_text_hash_resets_stages(db, contract):
+    analysis = _running_analysis(
+        db,
+        contract,
+        {"text_sha256": "old", "completed_stages": [STAGE_PREPARE, STAGE_STEP1], "raw_responses": {STAGE_STEP1: "{}"}, "attempts": 2}
+    )
+
+    analyze_contract._check_text_hash(db, analysis, "new")
+
+    state = _reload(db, analysis).pipeline_state
+    assert state == {"text_sha256": "new", "completed_stages": [], "raw_responses": {}, "attempts": 2}
+
+
+def test_check_text_hash_keeps_stages_of_the_same_text(db, contract):
+    state = {"text_sha256": "same", "completed_stages": [STAGE_PREPARE]}
+    analysis = _running_analysis(db, contract, state)
+
+    analyze_contract._check_text_hash(db, analysis, "same")
+
+    assert analyze_contract._completed_stages(_reload(db, analysis)) == [STAGE_PREPARE]
+
+
+def test_save_checkpoint_records_a_stage_once(db, contract):
+    analysis = _running_analysis(db, contract, None)
+
+    analyze_contract._save_checkpoint(db, analysis, STAGE_PREPARE, prepared=PREPARED)
+    analyze_contract._save_checkpoint(db, analysis, STAGE_PREPARE)
+
+    state = _reload(db, analysis).pipeline_state
+    assert state == {"prepared": PREPARED, "completed_stages": [STAGE_PREPARE]}
+
+
+def test_task_runs_are_counted(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(db, contract, {"task_attempts": {"prepare_contract": 1}})
+
+    _run_llm_stage(analysis)
+
+    state = _reload(db, analysis).pipeline_state
+    assert state["task_attempts"] == {"prepare_contract": 1, "llm_analysis": 1}
+
+
+def test_gives_up_after_max_task_attempts(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(db, contract, {"task_attempts": {"llm_analysis": MAX_TASK_ATTEMPTS}})
+
+    result = _run_llm_stage(analysis)
+
+    assert result["status"] == "failed"
+    assert llm_calls == []
+    analysis = _reload(db, analysis)
+    assert analysis.status == "failed"
+    assert f"after {MAX_TASK_ATTEMPTS} attempts" in analysis.error_message
+    assert analysis.pipeline_state["task_attempts"] == {"llm_analysis": MAX_TASK_ATTEMPTS + 1}
+
+
+def test_finished_analyses_are_left_alone(db, contract, pipeline, llm_calls):
+    analysis = _running_analysis(db, contract, None)
+    analysis.status = "succeeded"
+    db.commit()
+
+    assert _run_llm_stage(analysis)["status"] == "succeeded"
+    assert llm_calls == []
+    assert _reload(db, analysis).pipeline_state is None
@@ -0,0 +1,69 @@
+"""
+Tests for the SQL filters over JSONB analysis results
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.analysis_search import NO_AUTO_RENEWAL_VALUES, build_analysis_filters
+
+
+def _compile(condition):
+    compiled = condition.compile(dialect=postgresql.dialect())
+    return str(compiled), list(compiled.params.values())
+
+
+def test_no_criteria_no_conditions():
+    assert build_analysis_filters() == []
+
+
+def test_risk_level_matches_the_gin_index():
+    [condition] = build_analysis_filters(risk_level="high")
+
+    sql, params = _compile(condition)
+
+    # Literal key, not a bind parameter, or the planner can't use ix_analyses_risks_gin
+    assert sql.startswith("(analyses.analysis_result -> 'risks') @> ")
+    assert params == [[{"level": "high"}]]
+
+
+def test_agreement_type_is_lowercased_containment():
+    [condition] = build_analysis_filters(agreement_type="Lease")
+
+    sql, params = _compile(condition)
+
+    assert sql.startswith("analyses.preparation_result @> ")
+    assert params == [{"agreement_type": "lease"}]
+
+
+@pytest.mark.parametrize("auto_renewal, operator", [(True, " NOT IN "), (False, " IS NULL OR ")])
+def test_auto_renewal(auto_renewal, operator):
+    [condition] = build_analysis_filters(auto_renewal=auto_renewal)
+
+    sql, params = _compile(condition)
+
+    assert operator in sql
+    assert params == ["auto_renewal", list(NO_AUTO_RENEWAL_VALUES)]
+
+
+def test_screening_result():
+    [condition] = build_analysis_filters(screening_result="high_risk")
+
+    sql, params = _compile(condition)
+
+    assert sql.startswith("analyses.screening_result = ")
+    assert params == ["high_risk"]
+
+
+def test_criteria_combine():
+    conditions = build_analysis_filters(
+        risk_level="low", agreement_type="nda", auto_renewal=False, screening_result="no_major_issues"
+    )
+
+    assert len(conditions) == 4
+
+
+@pytest.mark.parametrize("criteria", [{"risk_level": "critical"}, {"screening_result": "fine"}])
+def test_unknown_values_are_rejected(criteria):
+    with pytest.raises(ValueError, match="Invalid"):
+        build_analysis_filters(**criteria)
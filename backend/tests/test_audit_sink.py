@@ -0,0 +1,322 @@
+"""
+Tests for the audit sink: batching, queue overflow, the Redis spill-over
+stream and its consumer group (on an in-memory stand-in for the few stream
+commands the sink uses)
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+import redis
+
+from app.models import AuditLog
+from app.services import audit_sink as audit_sink_module
+from app.services.audit_sink import DEAD_LETTER_STREAM, SPILL_GROUP, SPILL_STREAM, AuditSink
+
+
+def _bytes(value):
+    return value.encode() if isinstance(value, str) else value
+
+
+class FakeStreams:
+    """Redis streams with one consumer group each, as far as the sink uses them"""
+
+    def __init__(self):
+        self.streams = {}  # stream -> {entry id: fields}
+        self.groups = {}  # stream -> (delivered entry ids, {pending entry id: (consumer, delivered at)})
+        self._ids = itertools.count(1)
+
+    def xadd(self, stream, fields):
+        entry_id = f"{next(self._ids)}-0".encode()
+        self.streams.setdefault(stream, {})[entry_id] = {_bytes(key): _bytes(value) for key, value in fields.items()}
+        return entry_id
+
+    def xgroup_create(self, stream, group, id="0", mkstream=False):
+        if stream in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(stream, {})
+        self.groups[stream] = (set(), {})
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, count):
+        _, pending = self.groups[stream]
+        now = time.monotonic()
+        claimed = [
+            entry_id for entry_id, (_, delivered_at) in pending.items()
+            if (now - delivered_at) * 1000 >= min_idle_time
+        ][:count]
+        for entry_id in claimed:
+            pending[entry_id] = (consumer, now)
+        return [b"0-0", [(entry_id, self.streams[stream][entry_id]) for entry_id in claimed], []]
+
+    def xreadgroup(self, group, consumer, streams, count):
+        [stream] = streams
+        delivered, pending = self.groups[stream]
+        entries = [
+            (entry_id, fields) for entry_id, fields in self.streams[stream].items() if entry_id not in delivered
+        ][:count]
+        for entry_id, _ in entries:
+            delivered.add(entry_id)
+            pending[entry_id] = (consumer, time.monotonic())
+        return [[stream.encode(), entries]] if entries else []
+
+    def xack(self, stream, group, *entry_ids):
+        for entry_id in entry_ids:
+            self.groups[stream][1].pop(entry_id, None)
+
+    def xdel(self, stream, *entry_ids):
+        for entry_id in entry_ids:
+            self.streams[stream].pop(entry_id, None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def pending(self, stream):
+        return self.groups[stream][1]
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self._calls.append((name, args, kwargs))
+
+    def execute(self):
+        for name, args, kwargs in self._calls:
+            getattr(self._client, name)(*args, **kwargs)
+
+
+@pytest.fixture
+def audit_db(database, monkeypatch):
+    monkeypatch.setattr(audit_sink_module, "SessionLocal", database[0])
+    return database[0]
+
+
+@pytest.fixture
+def streams():
+    return FakeStreams()
+
+
+def _sink(streams=None, **options):
+    sink = AuditSink(redis_url="redis://test" if streams else None, **options)
+    sink._redis = streams
+    return sink
+
+
+def _without_flusher(sink, monkeypatch):
+    """Keep records in the queue until the test flushes them"""
+    monkeypatch.setattr(sink, "start", lambda: None)
+    return sink
+
+
+def _record(action="contract_view"):
+    return {
+        "id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "ip_address": "127.0.0.1",
+        "user_agent": "pytest",
+        "action": action,
+        "resource_type": "contract",
+        "resource_id": uuid.uuid4(),
+        "status": "success",
+        "details": {"filename": "lease.pdf"},
+        "duration_ms": None,
+        "created_at": datetime.utcnow(),
+    }
+
+
+def _stored(audit_db):
+    session = audit_db()
+    try:
+        return session.query(AuditLog).all()
+    finally:
+        session.close()
+
+
+def test_flush_writes_the_queue_in_batches(audit_db, monkeypatch):
+    sink = _without_flusher(_sink(batch_size=2), monkeypatch)
+    records = [_record() for _ in range(5)]
+    for record in records:
+        sink.submit(record)
+
+    assert sink.flush() == 5
+
+    assert {row.id for row in _stored(audit_db)} == {record["id"] for record in records}
+    stats = sink.stats()
+    assert (stats["enqueued"], stats["written"], stats["batches"], stats["queue_depth"]) == (5, 5, 3, 0)
+
+
+def test_flusher_thread_writes_submitted_records(audit_db):
+    sink = _sink(flush_interval=0.05)
+    sink.submit(_record())
+    sink.stop()
+
+    assert len(_stored(audit_db)) == 1
+
+
+def test_full_queue_without_redis_drops_instead_of_writing_inline(audit_db, monkeypatch):
+    sink = _without_flusher(_sink(max_queue=1), monkeypatch)
+    sink.submit(_record())
+    monkeypatch.setattr(sink, "_insert", lambda *args, **kwargs: pytest.fail("Inserted on the request path"))
+
+    sink.submit(_record())
+
+    stats = sink.stats()
+    assert (stats["enqueued"], stats["failed"], stats["spilled"]) == (1, 1, 0)
+
+
+def test_full_queue_spills_to_redis_and_flush_drains_it(audit_db, streams, monkeypatch):
+    sink = _without_flusher(_sink(streams, max_queue=1), monkeypatch)
+    queued, spilled = _record(), _record()
+    sink.submit(queued)
+    sink.submit(spilled)
+
+    assert sink.stats()["spilled"] == 1
+    assert len(streams.streams[SPILL_STREAM]) == 1
+
+    assert sink.flush() == 2
+
+    assert {row.id for row in _stored(audit_db)} == {queued["id"], spilled["id"]}
+    assert streams.streams[SPILL_STREAM] == {}
+    assert streams.pending(SPILL_STREAM) == {}
+
+
+def test_records_spilled_by_another_process_are_drained(audit_db, streams, monkeypatch):
+    producer = _without_flusher(_sink(streams, max_queue=1), monkeypatch)
+    producer.submit(_record())
+    spilled = _record()
+    producer.submit(spilled)
+
+    # A process that never spilled anything itself
+    consumer = _sink(streams)
+    assert consumer.flush() == 1
+
+    assert [row.id for row in _stored(audit_db)] == [spilled["id"]]
+
+
+def test_flusher_polls_the_spill_stream(audit_db, streams, monkeypatch):
+    monkeypatch.setattr(audit_sink_module, "SPILL_POLL_INTERVAL", 0.05)
+    sink = _sink(streams, flush_interval=0.02)
+    sink.start()
+    try:
+        # Spilled by another process while this one's flusher runs
+        spilled = _record()
+        _sink(streams)._spill(spilled)
+
+        deadline = time.monotonic() + 2
+        while not _stored(audit_db) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        # Before stop(), whose final flush drains the stream anyway
+        stored = _stored(audit_db)
+    finally:
+        sink.stop()
+
+    assert [row.id for row in stored] == [spilled["id"]]
+
+
+def test_crashed_consumers_entries_are_claimed(audit_db, streams, monkeypatch):
+    monkeypatch.setattr(audit_sink_module, "SPILL_CLAIM_IDLE_MS", 0)
+    spilled = _record()
+    _sink(streams)._spill(spilled)
+    # Delivered to a consumer that died before inserting and acknowledging
+    streams.xgroup_create(SPILL_STREAM, SPILL_GROUP)
+    streams.xreadgroup(SPILL_GROUP, "crashed", {SPILL_STREAM: ">"}, count=10)
+
+    assert _sink(streams).flush() == 1
+
+    assert [row.id for row in _stored(audit_db)] == [spilled["id"]]
+    assert streams.pending(SPILL_STREAM) == {}
+
+
+def test_spilled_records_already_written_are_skipped(audit_db, streams, monkeypatch):
+    record = _record()
+    sink = _without_flusher(_sink(streams), monkeypatch)
+    sink.submit(record)
+    sink.flush()
+    # Inserted, but the crash came before the acknowledgement
+    sink._spill(record)
+
+    sink.flush()
+
+    assert len(_stored(audit_db)) == 1
+    assert streams.streams[SPILL_STREAM] == {}
+    assert DEAD_LETTER_STREAM not in streams.streams
+
+
+def test_unreadable_spill_entries_go_to_the_dead_letter_stream(audit_db, streams):
+    streams.xadd(SPILL_STREAM, {"record": "not json"})
+    good = _record()
+    sink = _sink(streams)
+    sink._spill(good)
+
+    assert sink.flush() == 1
+
+    assert [row.id for row in _stored(audit_db)] == [good["id"]]
+    [dead] = streams.streams[DEAD_LETTER_STREAM].values()
+    assert dead[b"record"] == b"not json"
+    assert sink.stats()["dead_lettered"] == 1
+    assert streams.streams[SPILL_STREAM] == {}
+
+
+def test_failed_batch_spills(audit_db, streams, monkeypatch):
+    sink = _without_flusher(_sink(streams), monkeypatch)
+    sink.submit(_record())
+    insert = sink._insert
+
+    def failing_insert(records, ignore_duplicates=False):
+        if not ignore_duplicates:
+            raise RuntimeError("Database rejected the batch")
+        insert(records, ignore_duplicates=True)
+
+    monkeypatch.setattr(sink, "_insert", failing_insert)
+
+    # Written on the second try, from the spill stream
+    assert sink.flush() == 1
+    assert sink.stats()["spilled"] == 1
+    assert len(_stored(audit_db)) == 1
+
+
+def test_sync_mode_writes_before_returning_outside_an_event_loop(audit_db):
+    sink = _sink(mode="sync")
+
+    sink.submit(_record())
+
+    assert len(_stored(audit_db)) == 1
+    assert sink.stats()["sync_writes"] == 1
+
+
+def test_sync_mode_never_writes_on_the_event_loop(audit_db, monkeypatch):
+    sink = _sink(mode="sync")
+    written = threading.Event()
+    threads = []
+    insert = sink._insert
+
+    def recording_insert(records, ignore_duplicates=False):
+        threads.append(threading.current_thread())
+        insert(records, ignore_duplicates)
+        written.set()
+
+    monkeypatch.setattr(sink, "_insert", recording_insert)
+
+    async def endpoint():
+        sink.submit(_record())
+        await asyncio.get_running_loop().run_in_executor(None, written.wait, 2)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(endpoint())
+
+    assert written.is_set()
+    assert threads and threads[0] is not loop_thread
+    assert len(_stored(audit_db)) == 1
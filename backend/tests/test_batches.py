@@ -0,0 +1,186 @@
+"""
+Tests for batch submissions: zip extraction (corrupt archives, size and
+document limits), the free-tier quota and queueing the batch
+"""
+
+import io
+import uuid
+import zipfile
+
+import pytest
+
+from app.api import batches as batches_api
+from app.config import settings
+from app.models import Analysis, AnalysisBatch, Contract, User
+from app.services.audit_sink import audit_sink
+from app.tasks import dispatch
+from app.tasks.dispatch import BATCH_PRIORITY_STEP, QUEUE_BATCH, dispatch_batch
+
+
+PDF = b"%PDF-1.4 lease"
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    path = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """dispatch_batch() calls of the endpoint (no broker here)"""
+    calls = []
+    monkeypatch.setattr(batches_api, "dispatch_batch", lambda **kwargs: calls.append(kwargs))
+    return calls
+
+
+@pytest.fixture
+def audited(monkeypatch):
+    records = []
+    monkeypatch.setattr(audit_sink, "submit", records.append)
+    return records
+
+
+@pytest.fixture
+def premium(db, user):
+    """The signed-in user on the premium tier (no analysis quota)"""
+    db.query(User).filter(User.id == user.id).update({"tier": "premium"})
+    db.commit()
+    user.tier = "premium"
+    return user
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _corrupt_last_member(archive, members):
+    """Damage the compressed data of the last member (the earlier ones still extract)"""
+    *_, (name, data) = members.items()
+    data_start = archive.index(name.encode(), 30) + len(name)
+    damaged = bytearray(archive)
+    for offset in range(data_start + 2, data_start + 12):
+        damaged[offset] ^= 0xFF
+    return bytes(damaged)
+
+
+def _post(client, files):
+    return client.post(
+        "/api/v1/batches",
+        files=[("files", (name, data, content_type)) for name, data, content_type in files]
+    )
+
+
+def _stored_files(upload_dir):
+    return [path for path in upload_dir.rglob("*") if path.is_file()]
+
+
+def test_batch_of_files_and_zip_archives(client, db, premium, upload_dir, dispatched, audited):
+    archive = _zip({"leases/a.pdf": PDF, "leases/b.docx": b"docx", "notes.txt": b"text", "__MACOSX/._a.pdf": b""})
+
+    response = _post(client, [("main.pdf", PDF, "application/pdf"), ("more.zip", archive, "application/zip")])
+
+    assert response.status_code == 201
+    body = response.json()
+    assert [document["filename"] for document in body["documents"]] == ["main.pdf", "a.pdf", "b.docx"]
+    assert body["skipped"] == [{"filename": "notes.txt", "reason": "File type .txt not allowed"}]
+    assert len(_stored_files(upload_dir)) == 3
+
+    batch = db.get(AnalysisBatch, uuid.UUID(body["id"]))
+    assert batch.document_count == 3
+    assert db.query(Analysis).filter(Analysis.batch_id == batch.id, Analysis.status == "queued").count() == 3
+    [call] = dispatched
+    assert call["batch_id"] == body["id"]
+    assert [analysis_id for analysis_id, _, _ in call["documents"]] == [d["analysis_id"] for d in body["documents"]]
+    assert len(audited) == 3
+
+
+def test_corrupt_zip_is_a_400_and_leaves_no_files(client, db, premium, upload_dir, dispatched):
+    members = {"a.pdf": PDF * 100, "b.pdf": PDF * 100}
+    archive = _corrupt_last_member(_zip(members), members)
+
+    response = _post(client, [("main.pdf", PDF, "application/pdf"), ("broken.zip", archive, "application/zip")])
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid zip archive"
+    assert _stored_files(upload_dir) == []
+    assert db.query(Contract).count() == 0
+    assert dispatched == []
+
+
+def test_not_a_zip_is_a_400(client, premium, upload_dir, dispatched):
+    response = _post(client, [("broken.zip", b"not a zip archive", "application/zip")])
+
+    assert response.status_code == 400
+    assert _stored_files(upload_dir) == []
+
+
+def test_oversized_zip_members_are_skipped(client, premium, upload_dir, dispatched, audited, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+    archive = _zip({"small.pdf": PDF, "large.pdf": b"0" * (1024 * 1024 + 1)})
+
+    response = _post(client, [("leases.zip", archive, "application/zip")])
+
+    assert response.status_code == 201
+    body = response.json()
+    assert [document["filename"] for document in body["documents"]] == ["small.pdf"]
+    assert body["skipped"] == [{"filename": "large.pdf", "reason": "File size exceeds 1MB limit"}]
+    assert [path.stat().st_size for path in _stored_files(upload_dir)] == [len(PDF)]
+
+
+def test_documents_over_the_batch_limit_are_skipped(client, premium, upload_dir, dispatched, audited, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_DOCUMENTS", 2)
+    archive = _zip({"b.pdf": PDF, "c.pdf": PDF})
+
+    response = _post(client, [("a.pdf", PDF, "application/pdf"), ("more.zip", archive, "application/zip")])
+
+    body = response.json()
+    assert [document["filename"] for document in body["documents"]] == ["a.pdf", "b.pdf"]
+    assert body["skipped"] == [{"filename": "c.pdf", "reason": "Too many documents in batch"}]
+    assert len(_stored_files(upload_dir)) == 2
+
+
+def test_free_tier_batch_over_the_remaining_analyses_is_a_402(client, db, user, upload_dir, dispatched):
+    archive = _zip({f"{index}.pdf": PDF for index in range(user.analyses_remaining + 1)})
+
+    response = _post(client, [("leases.zip", archive, "application/zip")])
+
+    assert response.status_code == 402
+    assert f"only {user.analyses_remaining} free analyses remain" in response.json()["detail"]
+    assert _stored_files(upload_dir) == []
+    assert db.query(AnalysisBatch).count() == 0
+    assert dispatched == []
+
+
+def test_batch_without_supported_documents_is_a_400(client, premium, upload_dir, dispatched):
+    response = _post(client, [("notes.txt", b"text", "text/plain")])
+
+    assert response.status_code == 400
+    assert "No supported documents" in response.json()["detail"]
+
+
+def test_dispatch_batch_queues_a_chord_on_the_batch_queue(monkeypatch):
+    chords = []
+
+    def fake_chord(header):
+        chords.append(header)
+        return lambda body: body
+
+    monkeypatch.setattr(dispatch, "chord", fake_chord)
+    documents = [(str(uuid.uuid4()), 2, None) for _ in range(BATCH_PRIORITY_STEP + 1)]
+
+    finalize = dispatch_batch("batch-1", documents, "english", "premium")
+
+    [header] = chords
+    assert len(header) == len(documents)
+    prepare, llm = header[0].tasks
+    assert (prepare.options["queue"], llm.options["queue"]) == (QUEUE_BATCH, QUEUE_BATCH)
+    assert prepare.options["task_id"] == f"{documents[0][0]}-prepare"
+    # Later documents of a large batch lose a priority step
+    assert [workflow.tasks[0].options["priority"] for workflow in header[::BATCH_PRIORITY_STEP]] == [0, 1]
+    assert finalize.kwargs == {"batch_id": "batch-1"}
@@ -0,0 +1,77 @@
+"""
+Tests for the combined Step 1 + Step 2 call: selection by size and
+validation of the response
+"""
+
+import pytest
+
+from app.services.llm_analysis import combined_analysis, token_budget
+from app.services.llm_analysis.combined_analysis import (
+    ANALYSIS_REQUIRED_FIELDS,
+    PREPARATION_REQUIRED_FIELDS,
+    IncompleteCombinedResponse,
+    _validate,
+    use_combined_analysis,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_tokenizer(monkeypatch):
+    monkeypatch.setattr(token_budget, "TIKTOKEN_AVAILABLE", False)
+
+
+def _complete_result():
+    return {
+        "preparation": {field: "value" for field in PREPARATION_REQUIRED_FIELDS},
+        "analysis": {field: "value" for field in ANALYSIS_REQUIRED_FIELDS},
+    }
+
+
+def test_validate_returns_both_parts():
+    result = _complete_result()
+
+    preparation, analysis = _validate(result)
+
+    assert preparation is result["preparation"]
+    assert analysis is result["analysis"]
+
+
+@pytest.mark.parametrize("result", [
+    {},
+    {"preparation": {}},
+    {"preparation": "text", "analysis": {}},
+    {"preparation": {}, "analysis": []},
+])
+def test_validate_requires_both_objects(result):
+    with pytest.raises(IncompleteCombinedResponse, match="preparation or analysis object"):
+        _validate(result)
+
+
+def test_validate_lists_missing_fields():
+    result = _complete_result()
+    del result["preparation"]["parties"]
+    del result["analysis"]["risks"]
+
+    with pytest.raises(IncompleteCombinedResponse) as error:
+        _validate(result)
+
+    assert str(error.value) == "Combined response lacks preparation.parties, analysis.risks"
+
+
+def test_incomplete_response_is_a_value_error():
+    assert issubclass(IncompleteCombinedResponse, ValueError)
+
+
+def test_short_contracts_use_the_combined_call(monkeypatch):
+    monkeypatch.setattr(combined_analysis, "COMBINED_ANALYSIS_MAX_TOKENS", 100)
+
+    assert use_combined_analysis("a" * 350)  # 100 tokens
+    assert not use_combined_analysis("a" * 354)
+    assert not use_combined_analysis("д" * 202)  # 101 tokens
+    assert not use_combined_analysis("")
+
+
+def test_combined_call_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(combined_analysis, "COMBINED_ANALYSIS_MAX_TOKENS", 0)
+
+    assert not use_combined_analysis("Short contract.")
@@ -0,0 +1,107 @@
+"""
+Tests for JSON-mode ELI5 batches, the per-item cache and the shared router
+"""
+
+import json
+
+import pytest
+
+from app.config import settings
+from app.services.eli5_cache import ELI5Cache, item_key
+from app.services.llm_analysis import eli5_service
+from app.services.llm_analysis.eli5_service import _parse_batch_response, get_shared_router
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    """Caches built in a test keep their counters in-process"""
+    monkeypatch.setattr(settings, "REDIS_URL", "")
+
+
+def test_parse_batch_response_by_item_id():
+    response = json.dumps({"1": "You pay rent monthly.", "2": "You can leave with 30 days notice."})
+
+    assert _parse_batch_response(response, ["1", "2"]) == {
+        "1": "You pay rent monthly.",
+        "2": "You can leave with 30 days notice.",
+    }
+
+
+def test_parse_batch_response_unwraps_items():
+    response = json.dumps({"items": {"a": "Simple text."}})
+
+    assert _parse_batch_response(response, ["a"]) == {"a": "Simple text."}
+
+
+def test_parse_batch_response_strips_item_labels():
+    response = json.dumps({"1": "  Item 1: You pay rent monthly. "})
+
+    assert _parse_batch_response(response, ["1"]) == {"1": "You pay rent monthly."}
+
+
+def test_parse_batch_response_leaves_out_invalid_items():
+    response = json.dumps({"1": "", "2": None, "3": ["list"], "4": "Fine.", "5": "Not requested."})
+
+    assert _parse_batch_response(response, ["1", "2", "3", "4", "6"]) == {"4": "Fine."}
+
+
+@pytest.mark.parametrize("response", ["not json", None, "[]", '"text"', '{"items": []}'])
+def test_parse_batch_response_rejects_malformed_responses(response):
+    assert _parse_batch_response(response, ["1"]) == {}
+
+
+def test_item_key_depends_on_section_text_and_version():
+    key = item_key("risks", "Late fee of 5%", "v1")
+
+    assert key == item_key("risks", "Late fee of 5%", "v1")
+    assert key != item_key("obligations", "Late fee of 5%", "v1")
+    assert key != item_key("risks", "Late fee of 6%", "v1")
+    assert key != item_key("risks", "Late fee of 5%", "v2")
+
+
+def test_cache_hits_and_misses():
+    cache = ELI5Cache(ttl=60, max_size=10)
+    cache.set_many({"a": "Simple A"})
+
+    assert cache.get_many(["a", "b", "a"]) == {"a": "Simple A"}
+
+    stats = cache.stats()
+    assert stats["scope"] == "this process"
+    assert (stats["hits"], stats["misses"], stats["stored"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ELI5Cache(ttl=60, max_size=2)
+    cache.set_many({"a": "A", "b": "B"})
+    cache.get_many(["a"])
+    cache.set_many({"c": "C"})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": "A", "c": "C"}
+
+
+def test_disabled_cache():
+    cache = ELI5Cache(ttl=0)
+    cache.set_many({"a": "A"})
+
+    assert cache.get_many(["a"]) == {}
+
+
+def test_shared_router_is_reused(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    monkeypatch.setattr(eli5_service, "_shared_router", None)
+
+    assert get_shared_router() is get_shared_router()
+
+
+def test_aborted_shared_router_is_replaced(monkeypatch):
+    monkeypatch.setenv("LLM_PROVIDER", "fake")
+    monkeypatch.setattr(eli5_service, "_shared_router", None)
+    aborted = get_shared_router()
+    aborted.abort()
+
+    router = get_shared_router()
+
+    assert router is not aborted
+    assert not router.aborted
+    assert router.call("Explain this clause.")
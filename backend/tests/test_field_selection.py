@@ -0,0 +1,99 @@
+"""
+Tests for `?fields=` on the analysis and contract detail endpoints: only
+the listed fields are returned, and large columns are only loaded when
+listed
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import inspect
+
+from app.api import analyses as analyses_api
+from app.models import Analysis
+
+
+PREPARATION = {"agreement_type": "residential_lease"}
+
+
+@pytest.fixture
+def analysis(db, contract):
+    analysis = Analysis(
+        id=uuid.uuid4(),
+        contract_id=contract.id,
+        status="succeeded",
+        output_language="english",
+        screening_result="low_risk",
+        preparation_result=PREPARATION,
+        analysis_result={"risks": []}
+    )
+    db.add(analysis)
+    db.commit()
+    return analysis
+
+
+@pytest.fixture
+def loaded_columns(monkeypatch):
+    """Large analysis columns that were loaded for the response"""
+    loaded = []
+    build = analyses_api.build_analysis_response
+
+    def recording_build(analysis, heavy_fields=analyses_api.HEAVY_FIELDS):
+        unloaded = inspect(analysis).unloaded
+        loaded.extend(name for name in analyses_api.HEAVY_FIELDS if name not in unloaded)
+        return build(analysis, heavy_fields)
+
+    monkeypatch.setattr(analyses_api, "build_analysis_response", recording_build)
+    return loaded
+
+
+def test_analysis_without_fields_returns_everything(client, analysis, loaded_columns):
+    body = client.get(f"/api/v1/analyses/{analysis.id}").json()
+
+    assert body["status"] == "succeeded"
+    assert body["preparation_result"] == PREPARATION
+    assert body["analysis_result"] == {"risks": []}
+    assert sorted(loaded_columns) == sorted(analyses_api.HEAVY_FIELDS)
+
+
+def test_analysis_returns_only_the_listed_fields(client, analysis, loaded_columns):
+    response = client.get(f"/api/v1/analyses/{analysis.id}", params={"fields": "status,screening_result"})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": str(analysis.id), "status": "succeeded", "screening_result": "low_risk"}
+    assert loaded_columns == []
+
+
+def test_analysis_loads_only_the_listed_large_fields(client, analysis, loaded_columns):
+    response = client.get(f"/api/v1/analyses/{analysis.id}", params={"fields": "status,preparation_result"})
+
+    assert response.json() == {"id": str(analysis.id), "status": "succeeded", "preparation_result": PREPARATION}
+    assert loaded_columns == ["preparation_result"]
+
+
+def test_unknown_fields_are_a_400(client, analysis, contract):
+    response = client.get(f"/api/v1/analyses/{analysis.id}", params={"fields": "status,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+    assert client.get(f"/api/v1/contracts/{contract.id}", params={"fields": "owner"}).status_code == 400
+
+
+def test_contract_without_fields_returns_everything(client, contract):
+    body = client.get(f"/api/v1/contracts/{contract.id}").json()
+
+    assert body["filename"] == "lease.pdf"
+    assert body["extracted_text"] == contract.extracted_text
+
+
+def test_contract_returns_only_the_listed_fields(client, contract):
+    response = client.get(f"/api/v1/contracts/{contract.id}", params={"fields": "filename,page_count"})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": str(contract.id), "filename": "lease.pdf", "page_count": None}
+
+
+def test_contract_text_is_returned_when_listed(client, contract):
+    response = client.get(f"/api/v1/contracts/{contract.id}", params={"fields": "extracted_text"})
+
+    assert response.json() == {"id": str(contract.id), "extracted_text": contract.extracted_text}
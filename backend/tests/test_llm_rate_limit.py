@@ -0,0 +1,96 @@
+"""
+Tests for the rate-limit bookkeeping of the LLM router
+"""
+
+import pytest
+
+from app.services.llm_analysis import llm_router, token_budget
+from app.services.llm_analysis.combined_analysis import run_combined_analysis
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limit(monkeypatch):
+    monkeypatch.setattr(
+        llm_router, "_rate_limit", {"headroom": None, "remaining_tokens": None, "tokens_reset_at": None, "updated": 0.0}
+    )
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66),
+    ("1m30s", 90.0),
+    ("6m0s", 360.0),
+    ("250ms", 0.25),
+    ("1h", 3600.0),
+])
+def test_parse_duration(value, seconds):
+    assert llm_router._parse_duration(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", ["", None, "soon"])
+def test_parse_duration_unparsable(value):
+    assert llm_router._parse_duration(value) is None
+
+
+def test_no_wait_without_rate_limit_headers():
+    assert llm_router.rate_limit_wait(50000) == 0.0
+
+
+def test_no_wait_when_the_window_has_room():
+    llm_router._record_rate_limit({
+        "x-ratelimit-remaining-tokens": "9000",
+        "x-ratelimit-limit-tokens": "12000",
+        "x-ratelimit-reset-tokens": "20s",
+    })
+
+    assert llm_router.rate_limit_remaining_tokens() == 9000
+    assert llm_router.rate_limit_wait(5000) == 0.0
+
+
+def test_waits_for_the_window_to_reset():
+    llm_router._record_rate_limit({
+        "x-ratelimit-remaining-tokens": "1000",
+        "x-ratelimit-limit-tokens": "12000",
+        "x-ratelimit-reset-tokens": "20s",
+    })
+
+    assert 19.0 < llm_router.rate_limit_wait(5000) <= 20.0
+
+
+def test_waits_for_the_reading_to_go_stale_without_reset_header():
+    llm_router._record_rate_limit({
+        "x-ratelimit-remaining-tokens": "1000",
+        "x-ratelimit-limit-tokens": "12000",
+    })
+
+    assert 59.0 < llm_router.rate_limit_wait(5000, max_age=60.0) <= 60.0
+
+
+def test_combined_analysis_waits_for_the_token_window(monkeypatch):
+    monkeypatch.setattr(token_budget, "TIKTOKEN_AVAILABLE", False)
+    monkeypatch.setattr(llm_router._shared_usage, "redis_url", None)
+    router = llm_router.LLMRouter(provider="fake")
+    events = []
+
+    def sleep(seconds):
+        # The window resets while the router backs off
+        events.append("wait")
+        llm_router._record_rate_limit({"x-ratelimit-remaining-tokens": "12000", "x-ratelimit-limit-tokens": "12000"})
+
+    def call_with_json(**kwargs):
+        events.append("call")
+        return send(**kwargs)
+
+    send = router.call_with_json
+    monkeypatch.setattr(llm_router.time, "sleep", sleep)
+    monkeypatch.setattr(router, "call_with_json", call_with_json)
+    llm_router._record_rate_limit({
+        "x-ratelimit-remaining-tokens": "10",
+        "x-ratelimit-limit-tokens": "12000",
+        "x-ratelimit-reset-tokens": "20s",
+    })
+
+    preparation, analysis = run_combined_analysis("The tenant shall pay rent monthly.", "en", 0.9, router)
+
+    assert events == ["wait", "call"]
+    assert preparation["agreement_type"] == "lease"
+    assert analysis["screening_result"] == "recommended_to_address"
@@ -0,0 +1,111 @@
+"""
+Tests for keyset cursors and the conditions selecting the rows after them
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, MetaData, Table, Uuid, create_engine, select
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_asc_nulls_last, keyset_desc
+
+
+metadata = MetaData()
+items = Table(
+    "items",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("due_at", DateTime, nullable=True),
+)
+
+
+@pytest.fixture
+def rows():
+    """25 rows with duplicate timestamps and some NULL due dates"""
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    values = [
+        {
+            "id": uuid.uuid4(),
+            "created_at": base + timedelta(minutes=index // 3),
+            "due_at": None if index % 4 == 0 else base + timedelta(days=index // 2),
+        }
+        for index in range(25)
+    ]
+    with engine.begin() as connection:
+        connection.execute(items.insert(), values)
+    yield engine, values
+    engine.dispose()
+
+
+def _paginate(engine, order_by, condition, sort_key, page_size=7):
+    """All rows, page by page, following the cursors"""
+    seen, cursor = [], None
+    with engine.connect() as connection:
+        while True:
+            query = select(items).order_by(*order_by).limit(page_size + 1)
+            if cursor:
+                query = query.where(condition(cursor))
+            page = connection.execute(query).all()
+            seen.extend(page[:page_size])
+            if len(page) <= page_size:
+                return seen
+            last = page[page_size - 1]
+            cursor = encode_cursor(getattr(last, sort_key), last.id)
+
+
+def test_cursor_round_trip():
+    row_id = uuid.uuid4()
+    value = datetime(2026, 10, 19, 8, 30, 15, 123456)
+
+    cursor = encode_cursor(value, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (value, row_id)
+
+
+def test_cursor_round_trip_without_sort_value():
+    row_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(None, row_id)) == (None, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor(None, uuid.uuid4())[:-4]])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_keyset_desc_visits_every_row_once(rows):
+    engine, values = rows
+    expected = sorted(values, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+
+    seen = _paginate(
+        engine,
+        (items.c.created_at.desc(), items.c.id.desc()),
+        lambda cursor: keyset_desc(items.c.created_at, items.c.id, cursor),
+        "created_at",
+    )
+
+    assert [row.id for row in seen] == [row["id"] for row in expected]
+
+
+def test_keyset_asc_nulls_last_visits_every_row_once(rows):
+    engine, values = rows
+    expected = sorted(values, key=lambda row: (row["due_at"] is None, row["due_at"] or datetime.min, row["id"]))
+
+    seen = _paginate(
+        engine,
+        (items.c.due_at.asc().nullslast(), items.c.id.asc()),
+        lambda cursor: keyset_asc_nulls_last(items.c.due_at, items.c.id, cursor),
+        "due_at",
+        page_size=4,
+    )
+
+    assert [row.id for row in seen] == [row["id"] for row in expected]
@@ -0,0 +1,163 @@
+"""
+Tests for monthly partition maintenance and the retention task
+
+The partition DDL is PostgreSQL only: it is checked on a session that
+records the statements instead of running them.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models import Analysis
+from app.services import partitions
+from app.services.partitions import add_months, drop_expired_partitions, ensure_partitions, partition_name
+from app.tasks import maintenance
+
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+class RecordingSession:
+    """Session stand-in for a PostgreSQL database: records SQL, moves `moved_rows` rows"""
+
+    def __init__(self, moved_rows=0):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.statements = []
+        self.commits = 0
+        self._moved_rows = moved_rows
+
+    def execute(self, statement, params=None):
+        self.statements.append(" ".join(str(statement).split()))
+        return SimpleNamespace(rowcount=self._moved_rows)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    """Existing monthly partitions and the months the DEFAULT partition holds rows of"""
+    state = SimpleNamespace(existing={}, in_default=[])
+    monkeypatch.setattr(partitions, "is_partitioned", lambda db, table: True)
+    monkeypatch.setattr(partitions, "list_partitions", lambda db, table: dict(state.existing))
+    monkeypatch.setattr(partitions, "default_partition_months", lambda db, table: list(state.in_default))
+    return state
+
+
+@pytest.mark.parametrize("month, months, expected", [
+    (date(2026, 10, 1), 2, date(2026, 12, 1)),
+    (date(2026, 11, 1), 3, date(2027, 2, 1)),
+    (date(2026, 1, 1), -1, date(2025, 12, 1)),
+    (date(2026, 10, 1), -22, date(2024, 12, 1)),
+])
+def test_add_months(month, months, expected):
+    assert add_months(month, months) == expected
+
+
+def test_partition_name():
+    assert partition_name("audit_logs", date(2026, 3, 1)) == "audit_logs_p202603"
+
+
+def test_ensure_partitions_creates_the_coming_months(partitioned):
+    partitioned.existing = {date(2026, 10, 1): "audit_logs_p202610"}
+    db = RecordingSession()
+
+    created = ensure_partitions(db, "audit_logs", months_ahead=2, now=NOW)
+
+    assert created == ["audit_logs_p202611", "audit_logs_p202612"]
+    assert db.statements == [
+        'CREATE TABLE IF NOT EXISTS "audit_logs_default" PARTITION OF "audit_logs" DEFAULT',
+        'CREATE TABLE IF NOT EXISTS "audit_logs_p202611" PARTITION OF "audit_logs" '
+        "FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')",
+        'CREATE TABLE IF NOT EXISTS "audit_logs_p202612" PARTITION OF "audit_logs" '
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+    ]
+    assert db.commits == 1
+
+
+def test_ensure_partitions_moves_rows_out_of_the_default_partition(partitioned):
+    # Maintenance missed August: its rows went to the DEFAULT partition
+    partitioned.existing = {date(2026, 10, 1): "audit_logs_p202610"}
+    partitioned.in_default = [date(2026, 8, 1)]
+    db = RecordingSession(moved_rows=42)
+
+    created = ensure_partitions(db, "audit_logs", months_ahead=0, now=NOW)
+
+    assert created == ["audit_logs_p202608"]
+    assert db.statements[1:] == [
+        'ALTER TABLE "audit_logs" DETACH PARTITION "audit_logs_default"',
+        'CREATE TABLE "audit_logs_p202608" PARTITION OF "audit_logs" '
+        "FOR VALUES FROM ('2026-08-01') TO ('2026-09-01')",
+        'WITH moved AS (DELETE FROM "audit_logs_default" '
+        "WHERE created_at >= '2026-08-01' AND created_at < '2026-09-01' RETURNING *) "
+        'INSERT INTO "audit_logs" SELECT * FROM moved',
+        'ALTER TABLE "audit_logs" ATTACH PARTITION "audit_logs_default" DEFAULT',
+    ]
+
+
+def test_drop_expired_partitions_keeps_the_retention_window(partitioned):
+    partitioned.existing = {
+        date(2026, month, 1): f"analysis_events_p2026{month:02d}" for month in range(7, 12)
+    }
+    db = RecordingSession()
+
+    dropped = drop_expired_partitions(db, "analysis_events", retention_months=1, now=NOW)
+
+    assert dropped == ["analysis_events_p202607", "analysis_events_p202608"]
+    assert db.statements == [
+        'DROP TABLE IF EXISTS "analysis_events_p202607"',
+        'DROP TABLE IF EXISTS "analysis_events_p202608"',
+    ]
+
+
+def test_plain_tables_are_left_alone(db):
+    # SQLite (benchmarks, tests): no partitions to manage
+    assert ensure_partitions(db, "audit_logs", months_ahead=2) == []
+    assert drop_expired_partitions(db, "audit_logs", retention_months=0) == []
+
+
+def test_maintain_partitions_uses_each_tables_retention(database, monkeypatch):
+    monkeypatch.setattr(maintenance, "SessionLocal", database[0])
+    monkeypatch.setattr(settings, "ANALYSIS_EVENTS_RETENTION_MONTHS", 3)
+    monkeypatch.setattr(settings, "AUDIT_LOG_RETENTION_MONTHS", 12)
+    monkeypatch.setattr(settings, "PARTITION_MONTHS_AHEAD", 2)
+    calls = []
+    monkeypatch.setattr(
+        maintenance, "ensure_partitions",
+        lambda db, table, months_ahead: calls.append(("ensure", table, months_ahead)) or [f"{table}_new"]
+    )
+    monkeypatch.setattr(
+        maintenance, "drop_expired_partitions",
+        lambda db, table, retention_months: calls.append(("drop", table, retention_months)) or []
+    )
+
+    result = maintenance.maintain_partitions()
+
+    assert calls == [
+        ("ensure", "analysis_events", 2),
+        ("drop", "analysis_events", 3),
+        ("ensure", "audit_logs", 2),
+        ("drop", "audit_logs", 12),
+    ]
+    assert result["partitions_created"] == ["analysis_events_new", "audit_logs_new"]
+
+
+def test_maintain_partitions_deletes_old_finished_analyses(database, db, contract, monkeypatch):
+    monkeypatch.setattr(maintenance, "SessionLocal", database[0])
+    old = datetime.utcnow() - timedelta(days=settings.ANALYSIS_RETENTION_DAYS + 1)
+    analyses = {
+        status: Analysis(id=uuid.uuid4(), contract_id=contract.id, status=status, created_at=old)
+        for status in ("succeeded", "failed", "cancelled", "running")
+    }
+    recent = Analysis(id=uuid.uuid4(), contract_id=contract.id, status="succeeded", created_at=datetime.utcnow())
+    db.add_all([*analyses.values(), recent])
+    db.commit()
+
+    result = maintenance.maintain_partitions()
+
+    assert result["deleted_count"] == 3
+    assert {row.id for row in db.query(Analysis.id)} == {analyses["running"].id, recent.id}
@@ -0,0 +1,87 @@
+"""
+Tests for the bounded password hashing pool: logins are shed with a 429
+once the pool and its queue are full
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from anyio.from_thread import start_blocking_portal
+
+from app.config import settings
+from app.core import security
+from app.core.exceptions import PasswordHashingBusy
+from app.core.security import get_password_hash, get_password_hash_stats
+from app.models import User
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """One worker and one queue slot; setting the returned event releases blocked operations"""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE", 1)
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(security, "_password_executor", executor)
+    release = threading.Event()
+    yield release
+    release.set()
+    executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def portal():
+    """Event loop in a thread of its own, for operations that stay pending during the test"""
+    with start_blocking_portal() as portal:
+        yield portal
+
+
+def _fill(release, portal):
+    """Occupy the worker and the queue slot with operations waiting for `release`"""
+    return [
+        portal.start_task_soon(security._run_password_op, release.wait, 5)
+        for _ in range(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE)
+    ]
+
+
+def _wait_until_pending(count):
+    deadline = time.monotonic() + 2
+    while get_password_hash_stats()["pending"] < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_run_password_op_rejects_once_the_pool_is_full(pool, portal):
+    blocked = _fill(pool, portal)
+    _wait_until_pending(len(blocked))
+    rejected = get_password_hash_stats()["rejected"]
+
+    with pytest.raises(PasswordHashingBusy) as busy:
+        portal.call(security._run_password_op, get_password_hash, "secret")
+
+    assert busy.value.status_code == 429
+    assert busy.value.headers == {"Retry-After": "1"}
+    assert get_password_hash_stats()["rejected"] == rejected + 1
+
+    pool.set()
+    assert [future.result(timeout=5) for future in blocked] == [True, True]
+    # Capacity is back once the blocked operations finished
+    assert portal.call(security._run_password_op, len, "secret") == 6
+
+
+def test_login_is_a_429_with_retry_after_when_the_pool_is_full(client, db, user, pool, portal):
+    db.query(User).filter(User.id == user.id).update({"hashed_password": get_password_hash("secret")})
+    db.commit()
+    blocked = _fill(pool, portal)
+    _wait_until_pending(len(blocked))
+
+    response = client.post("/api/v1/auth/login", json={"email": user.email, "password": "secret"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+    pool.set()
+    for future in blocked:
+        future.result(timeout=5)
+    response = client.post("/api/v1/auth/login", json={"email": user.email, "password": "secret"})
+    assert response.status_code == 200
@@ -0,0 +1,88 @@
+"""
+Tests for compiled prompt templates
+"""
+
+import pytest
+
+from app.services.llm_analysis.prompt_templates import DYNAMIC_MARKER, PromptTemplate, get_prompt_template
+
+
+TEXT = f"""Instructions for the analysis.
+Return JSON like {{"risks": [{{"level": "high"}}]}}.
+{DYNAMIC_MARKER}
+Role: {{user_role}}
+Type: {{agreement_type}}
+
+CONTRACT:
+{{contract_text}}
+"""
+
+
+def test_render_fills_every_placeholder():
+    template = PromptTemplate("test", TEXT)
+
+    prompt = template.render(user_role="tenant", agreement_type="lease", contract_text="The rent is 100 EUR.")
+
+    assert prompt == "Role: tenant\nType: lease\n\nCONTRACT:\nThe rent is 100 EUR."
+
+
+def test_static_prefix_and_placeholders():
+    template = PromptTemplate("test", TEXT)
+
+    assert template.static_prefix == 'Instructions for the analysis.\nReturn JSON like {"risks": [{"level": "high"}]}.'
+    assert template.placeholders == {"user_role", "agreement_type", "contract_text"}
+
+
+def test_values_are_inserted_verbatim():
+    template = PromptTemplate("test", TEXT)
+
+    prompt = template.render(user_role="tenant", agreement_type="lease", contract_text="Signed by {user_role}.")
+
+    assert prompt.endswith("Signed by {user_role}.")
+
+
+def test_render_requires_every_placeholder():
+    template = PromptTemplate("test", TEXT)
+
+    with pytest.raises(KeyError, match="agreement_type"):
+        template.render(user_role="tenant", contract_text="...")
+
+
+def test_template_without_marker_is_all_dynamic():
+    template = PromptTemplate("test", "Analyze: {contract_text}")
+
+    assert template.static_prefix == ""
+    assert template.render(contract_text="text") == "Analyze: text"
+
+
+def test_partial_keeps_other_placeholders():
+    template = PromptTemplate("test", TEXT).partial(user_role="landlord")
+
+    assert template.placeholders == {"agreement_type", "contract_text"}
+    assert template.render(agreement_type="lease", contract_text="x").startswith("Role: landlord\n")
+
+
+def test_partial_changes_the_version():
+    template = PromptTemplate("test", TEXT)
+
+    assert template.partial(user_role="tenant").version != template.version
+    assert PromptTemplate("test", TEXT).version == template.version
+
+
+def test_render_refuses_placeholders_in_static_prefix():
+    template = PromptTemplate("test", f"Answer in {{output_language}}.\n{DYNAMIC_MARKER}\n{{contract_text}}")
+
+    with pytest.raises(ValueError, match="output_language"):
+        template.render(contract_text="x", output_language="English")
+
+    filled = template.partial(output_language="English")
+    assert filled.static_prefix == "Answer in English."
+    assert filled.render(contract_text="x") == "x"
+
+
+@pytest.mark.parametrize("prompt_type", ["preparation", "analysis"])
+def test_shipped_templates_compile(prompt_type):
+    template = get_prompt_template(prompt_type)
+
+    assert "contract_text" in template.placeholders
+    assert template.static_prefix
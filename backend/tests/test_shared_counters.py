@@ -0,0 +1,131 @@
+"""
+Tests for counters summed over all processes in Redis (on an in-memory
+stand-in for the hash commands they use)
+"""
+
+import time
+
+from app.services.shared_counters import SharedCounters
+
+
+class FakeHashes:
+    """HINCRBY / HGETALL of a Redis server, optionally slow or down"""
+
+    def __init__(self, delay=0.0):
+        self.hashes = {}
+        self.delay = delay
+        self.down = False
+        self.round_trips = 0
+
+    def _round_trip(self):
+        self.round_trips += 1
+        time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("Redis unavailable")
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def hgetall(self, key):
+        self._round_trip()
+        return {name.encode(): str(value).encode() for name, value in self.hashes.get(key, {}).items()}
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._increments = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def hincrby(self, key, name, amount):
+        self._increments.append((key, name, amount))
+
+    def execute(self):
+        self._client._round_trip()
+        for key, name, amount in self._increments:
+            counters = self._client.hashes.setdefault(key, {})
+            counters[name] = counters.get(name, 0) + amount
+
+
+def _counters(client, flush_interval=60.0):
+    counters = SharedCounters("test", redis_url="redis://test", flush_interval=flush_interval)
+    counters._redis = client
+    return counters
+
+
+def test_incr_does_not_wait_for_redis():
+    client = FakeHashes(delay=0.5)
+    counters = _counters(client)
+
+    started = time.perf_counter()
+    for _ in range(10):
+        counters.incr(calls=1, prompt_tokens=100)
+
+    assert time.perf_counter() - started < 0.1
+    assert client.round_trips == 0
+
+
+def test_buffered_amounts_are_sent_in_one_pipeline():
+    client = FakeHashes()
+    counters = _counters(client)
+    counters.incr(calls=1, prompt_tokens=100, cached_prompt_tokens=0)
+    counters.incr(calls=1, prompt_tokens=50)
+
+    counters.flush()
+
+    assert client.round_trips == 1
+    assert client.hashes == {"counters:test": {"calls": 2, "prompt_tokens": 150}}
+
+
+def test_flusher_thread_sends_periodically():
+    client = FakeHashes()
+    counters = _counters(client, flush_interval=0.02)
+    counters.incr(hits=3)
+
+    deadline = time.monotonic() + 2
+    while not client.hashes and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert client.hashes == {"counters:test": {"hits": 3}}
+
+
+def test_amounts_are_kept_while_redis_is_down():
+    client = FakeHashes()
+    counters = _counters(client)
+    counters.incr(misses=2)
+    client.down = True
+    counters.flush()
+    client.down = False
+    counters.incr(misses=1)
+
+    counters.flush()
+
+    assert client.hashes == {"counters:test": {"misses": 3}}
+
+
+def test_read_includes_this_process_buffered_amounts():
+    client = FakeHashes()
+    client.hashes["counters:test"] = {"calls": 5}
+    counters = _counters(client)
+    counters.incr(calls=1)
+
+    assert counters.read() == {"calls": 6}
+
+
+def test_read_without_redis():
+    counters = SharedCounters("test")
+    counters.incr(calls=1)
+
+    assert counters.read() is None
+
+
+def test_read_when_redis_is_down():
+    client = FakeHashes()
+    client.down = True
+
+    assert _counters(client).read() is None
@@ -0,0 +1,96 @@
+"""
+Tests for the guesses behind a speculative Step 2 and the check whether
+they hold once Step 1 returns
+"""
+
+import pytest
+
+from app.services.llm_analysis.speculation import guess_agreement_type, guess_preparation_data, guesses_hold
+
+
+GUESSES = {
+    "agreement_type": "lease",
+    "user_role": "tenant",
+    "negotiability": "medium",
+    "detected_jurisdiction": "US",
+    "governing_language": "English",
+}
+
+LEASE_TEXT = (
+    "RESIDENTIAL LEASE AGREEMENT. The landlord leases the premises to the tenant. "
+    "The tenant shall pay rent on the first day of each month."
+)
+
+
+def test_identical_data_holds():
+    assert guesses_hold(GUESSES, dict(GUESSES))
+
+
+@pytest.mark.parametrize("changes", [
+    {"agreement_type": "LEASE"},
+    {"user_role": "Residential tenant"},
+    {"negotiability": "high"},
+    {"governing_language": "english"},
+])
+def test_differences_step2_does_not_act_on_are_tolerated(changes):
+    assert guesses_hold(GUESSES, {**GUESSES, **changes})
+
+
+@pytest.mark.parametrize("changes", [
+    {"agreement_type": "employment"},
+    {"user_role": "landlord"},
+    {"user_role": ""},
+    {"negotiability": "low"},
+    {"governing_language": "Russian"},
+    {"detected_jurisdiction": "UK"},
+    {"error": "Step 1 failed"},
+])
+def test_differences_step2_acts_on_discard_the_guesses(changes):
+    assert not guesses_hold(GUESSES, {**GUESSES, **changes})
+
+
+def test_missing_governing_language_counts_as_unknown():
+    guesses = {**GUESSES, "governing_language": "unknown"}
+    actual = {key: value for key, value in GUESSES.items() if key != "governing_language"}
+
+    assert guesses_hold(guesses, actual)
+    assert not guesses_hold(GUESSES, actual)
+
+
+def test_guess_agreement_type_from_keywords():
+    assert guess_agreement_type(LEASE_TEXT) == "lease"
+
+
+@pytest.mark.parametrize("text", ["This agreement is made between two parties.", "The employee shall pay rent."])
+def test_no_agreement_type_without_a_clear_winner(text):
+    assert guess_agreement_type(text) is None
+
+
+def test_guess_preparation_data_reuses_an_earlier_step1_result():
+    previous = {
+        "agreement_type": "employment",
+        "user_role": "employee",
+        "negotiability": "low",
+        "governing_language": "German",
+    }
+
+    guesses = guess_preparation_data(LEASE_TEXT, "en", 0.9, previous=previous)
+
+    assert guesses["agreement_type"] == "employment"
+    assert guesses["user_role"] == "employee"
+    assert guesses["negotiability"] == "low"
+    assert guesses["governing_language"] == "German"
+    assert guesses["quality_score"] == 0.9
+
+
+def test_guess_preparation_data_ignores_a_failed_step1_result():
+    previous = {"agreement_type": "employment", "user_role": "employee", "error": "timeout"}
+
+    guesses = guess_preparation_data(LEASE_TEXT, "en", 0.9, previous=previous)
+
+    assert guesses["agreement_type"] == "lease"
+    assert guesses["user_role"] == "tenant"
+
+
+def test_guess_preparation_data_without_a_guess():
+    assert guess_preparation_data("This agreement is made between two parties.", "en", 0.9) is None
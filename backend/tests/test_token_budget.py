@@ -0,0 +1,73 @@
+"""
+Tests for token counting and prompt budgets, without a tokenizer
+(the character-ratio fallback used when tiktoken is unavailable)
+"""
+
+import pytest
+
+from app.services.llm_analysis import token_budget
+
+
+@pytest.fixture(autouse=True)
+def no_tokenizer(monkeypatch):
+    monkeypatch.setattr(token_budget, "TIKTOKEN_AVAILABLE", False)
+
+
+def test_count_tokens_empty_text():
+    assert token_budget.count_tokens("") == 0
+
+
+def test_count_tokens_weights_non_ascii_heavier():
+    latin = "a" * 70
+    cyrillic = "д" * 70
+
+    assert token_budget.count_tokens(latin) == 20  # 3.5 characters per token
+    assert token_budget.count_tokens(cyrillic) == 35  # 2 characters per token
+
+
+def test_truncate_returns_text_that_fits():
+    text = "The tenant shall pay rent monthly."
+
+    assert token_budget.truncate_to_tokens(text, 1000) is text
+
+
+def test_truncate_to_zero_tokens():
+    assert token_budget.truncate_to_tokens("anything", 0) == ""
+
+
+@pytest.mark.parametrize("text", ["lorem ipsum dolor " * 200, "договор аренды " * 200, "rent / аренда " * 200])
+@pytest.mark.parametrize("max_tokens", [1, 17, 250])
+def test_truncate_keeps_the_longest_prefix_within_budget(text, max_tokens):
+    truncated = token_budget.truncate_to_tokens(text, max_tokens)
+
+    assert text.startswith(truncated)
+    assert token_budget.count_tokens(truncated) <= max_tokens
+    assert token_budget.count_tokens(text[:len(truncated) + 1]) > max_tokens
+
+
+def test_prompt_budget_leaves_room_for_completion_and_margin(monkeypatch):
+    monkeypatch.setattr(token_budget, "LLM_CONTEXT_WINDOW", 0)
+
+    budget = token_budget.prompt_budget("fake-llm", max_tokens=8000, max_prompt_tokens=0)
+
+    assert budget == int((32768 - 8000) * (1 - token_budget.SAFETY_MARGIN))
+
+
+def test_prompt_budget_is_capped(monkeypatch):
+    monkeypatch.setattr(token_budget, "LLM_CONTEXT_WINDOW", 0)
+    monkeypatch.setattr(token_budget, "LLM_MAX_PROMPT_TOKENS", 24000)
+
+    assert token_budget.prompt_budget("llama-3.3-70b-versatile", max_tokens=8000) == 24000
+    assert token_budget.prompt_budget("fake-llm", max_tokens=30000) == int(2768 * (1 - token_budget.SAFETY_MARGIN))
+
+
+def test_context_window_override(monkeypatch):
+    monkeypatch.setattr(token_budget, "LLM_CONTEXT_WINDOW", 4096)
+
+    assert token_budget.context_window("llama-3.3-70b-versatile") == 4096
+
+
+def test_unknown_model_gets_default_window(monkeypatch):
+    monkeypatch.setattr(token_budget, "LLM_CONTEXT_WINDOW", 0)
+
+    assert token_budget.context_window("some/unknown-model") == token_budget.DEFAULT_CONTEXT_WINDOW
@@ -0,0 +1,155 @@
+"""
+Tests for the authenticated user cache and its invalidation on commit
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (configures the User relationships)
+from app.database import Base
+from app.models.user import User
+from app.services import user_cache as user_cache_module
+from app.services.user_cache import PENDING_INVALIDATIONS_KEY, UserCache
+
+
+NOW = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def _user(**columns):
+    return User(
+        id=columns.pop("id", None) or uuid.uuid4(),
+        email=columns.pop("email", "tenant@example.com"),
+        hashed_password="hash",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+        tier="free",
+        contracts_analyzed=0,
+        created_at=NOW,
+        updated_at=NOW,
+        **columns,
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Fresh in-process cache behind the ORM event listeners"""
+    cache = UserCache(ttl=60, max_size=10, redis_url=None)
+    monkeypatch.setattr(user_cache_module, "user_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    # The user table and the ones a deletion cascades to
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables[name] for name in ("users", "contracts", "deadlines", "feedback")]
+    )
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_get_returns_a_detached_copy_without_password(cache):
+    user = _user()
+    asyncio.run(cache.set(user, 1000))
+
+    cached = asyncio.run(cache.get(user.id, 1000))
+
+    assert cached is not user
+    assert (cached.id, cached.email, cached.tier) == (user.id, user.email, "free")
+    assert cached.hashed_password is None
+
+
+def test_entries_are_per_token(cache):
+    user = _user()
+    asyncio.run(cache.set(user, 1000))
+
+    assert asyncio.run(cache.get(user.id, 2000)) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_misses(cache):
+    cache.ttl = 0.000001
+    user = _user()
+    asyncio.run(cache.set(user, 1000))
+
+    assert asyncio.run(cache.get(user.id, 1000)) is None
+
+
+def test_least_recently_used_users_are_evicted(cache):
+    cache.max_size = 2
+    first, second, third = _user(), _user(), _user()
+    for user in (first, second):
+        asyncio.run(cache.set(user, 1))
+    asyncio.run(cache.get(first.id, 1))
+    asyncio.run(cache.set(third, 1))
+
+    assert asyncio.run(cache.get(second.id, 1)) is None
+    assert asyncio.run(cache.get(first.id, 1)) is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_disabled_cache_stores_nothing():
+    cache = UserCache(ttl=0, redis_url=None)
+    user = _user()
+    asyncio.run(cache.set(user, 1))
+
+    assert asyncio.run(cache.get(user.id, 1)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_update_invalidates_after_commit(cache, session):
+    user = _user()
+    session.add(user)
+    session.commit()
+    asyncio.run(cache.set(user, 1))
+
+    user.tier = "premium"
+    user.updated_at = NOW
+    session.flush()
+
+    # Still cached until the commit: a concurrent request would cache the old row again
+    assert asyncio.run(cache.get(user.id, 1)) is not None
+    assert session.info[PENDING_INVALIDATIONS_KEY] == {user.id}
+
+    session.commit()
+
+    assert asyncio.run(cache.get(user.id, 1)) is None
+    assert PENDING_INVALIDATIONS_KEY not in session.info
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_delete_invalidates_after_commit(cache, session):
+    user = _user()
+    session.add(user)
+    session.commit()
+    asyncio.run(cache.set(user, 1))
+
+    session.delete(user)
+    session.commit()
+
+    assert asyncio.run(cache.get(user.id, 1)) is None
+
+
+def test_rollback_keeps_the_cached_user(cache, session):
+    user = _user()
+    session.add(user)
+    session.commit()
+    asyncio.run(cache.set(user, 1))
+
+    user.tier = "premium"
+    user.updated_at = NOW
+    session.flush()
+    session.rollback()
+
+    assert asyncio.run(cache.get(user.id, 1)) is not None
+    assert PENDING_INVALIDATIONS_KEY not in session.info
+    assert cache.stats()["invalidations"] == 0
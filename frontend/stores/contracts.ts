@@ -14,7 +14,7 @@ export interface Contract {
   file_size: number
   file_path: string
   mime_type: string
-  extracted_text: string | null
+  extracted_text?: string | null  // detail view only, not in list responses
   page_count: number | null
   detected_language: string | null
   jurisdiction: string | null
@@ -26,9 +26,10 @@ export interface Contract {
 
 export interface ContractListResponse {
   contracts: Contract[]
-  total: number
-  page: number
+  total: number | null
+  page: number | null
   page_size: number
+  next_cursor: string | null
 }
 
 export interface UploadResponse {